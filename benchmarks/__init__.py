@@ -0,0 +1,7 @@
+"""
+Benchmarks of component construction, value access, schema serialization and encoding.
+
+The modules follow the conventions of airspeed velocity (asv): classes with an optional ``setup`` method and
+``params``, whose ``time_*`` methods are timed and ``peakmem_*`` methods measured for peak memory. They can be run with
+asv (see asv.conf.json) or, without any extra dependency, with ``python -m benchmarks``.
+"""
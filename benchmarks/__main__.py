@@ -0,0 +1,114 @@
+"""
+Runs the benchmarks without asv, timing with timeit and measuring peak memory with tracemalloc.
+
+    python -m benchmarks [-k FILTER] [--save results.json] [--compare results.json] [--threshold 1.2]
+
+With --compare, benchmarks slower or using more memory than the saved results by more than the threshold factor are
+reported as regressions and the exit status is 1.
+"""
+import argparse
+import gc
+import importlib
+import inspect
+import json
+import pkgutil
+import sys
+import timeit
+import tracemalloc
+
+import benchmarks
+
+
+def discover(name_filter: str = None):
+    """
+    Yields (name, benchmark class, method name, parameter) for every benchmark, parameter being None for classes without
+    params
+    """
+    for module_info in pkgutil.iter_modules(benchmarks.__path__):
+        if not module_info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module(f'benchmarks.{module_info.name}')
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method_name in sorted(vars(cls)):
+                if not method_name.startswith(('time_', 'peakmem_')):
+                    continue
+                for param in getattr(cls, 'params', [None]):
+                    name = f'{module_info.name[6:]}.{class_name}.{method_name}'
+                    if param is not None:
+                        name += f'({param})'
+                    if name_filter is None or name_filter in name:
+                        yield name, cls, method_name, param
+
+
+def run(cls, method_name: str, param):
+    """
+    :return: the best time per call in seconds, or the peak memory allocated by a call in bytes
+    """
+    args = () if param is None else (param,)
+    instance = cls()
+    if hasattr(instance, 'setup'):
+        instance.setup(*args)
+    method = getattr(instance, method_name)
+
+    if method_name.startswith('peakmem_'):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            method(*args)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    timer = timeit.Timer(lambda: method(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def format_result(name: str, result: float) -> str:
+    if '.peakmem_' in name:
+        return f'{result / 1024:10.1f} KiB'
+    return f'{result * 1e6:10.1f} us'
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-k', dest='name_filter', help='only run benchmarks whose name contains this string')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='compare the results to those saved in this JSON file')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='ratio to the saved result above which a benchmark is reported as a regression')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    for name, cls, method_name, param in discover(args.name_filter):
+        result = run(cls, method_name, param)
+        results[name] = result
+        line = f'{name:<60} {format_result(name, result)}'
+        previous = baseline.get(name)
+        if previous:
+            ratio = result / previous
+            line += f'  {ratio:5.2f}x'
+            if ratio > args.threshold:
+                line += '  REGRESSION'
+                regressions.append(name)
+        print(line, flush=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if regressions:
+        print(f'{len(regressions)} regression(s): {", ".join(regressions)}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+from swecommondm.component_implementations import DataArrayComponent, from_dict
+
+from benchmarks.components import image_array, status_record
+
+
+class ArrayConstruction:
+    params = ['copied', 'compact', 'buffered']
+
+    def time_image_array(self, mode):
+        image_array(192, 108, **{mode: True} if mode != 'copied' else {})
+
+    def peakmem_image_array(self, mode):
+        image_array(192, 108, **{mode: True} if mode != 'copied' else {})
+
+
+class RecordConstruction:
+    def setup(self):
+        self.record = status_record()
+        self.schema = self.record.datastructure_to_dict()
+
+    def time_status_record(self):
+        status_record()
+
+    def time_clone(self):
+        self.record.clone()
+
+    def time_array_of_records(self):
+        array = DataArrayComponent(name='history', label='History', definition='www.test.org/test/history')
+        array.set_component_template_and_size(100, self.record)
+
+    def time_from_dict(self):
+        from_dict(self.schema)
@@ -0,0 +1,33 @@
+from swecommondm.encoding import BinaryEncoding, ByteEncoding, TextEncoding
+
+from benchmarks.components import status_record, status_value
+
+
+class Encoding:
+    params = ['text', 'binary', 'base64']
+
+    def setup(self, encoding):
+        # Binary encodings only support fixed-size leaves
+        record = status_record(text=encoding == 'text')
+        self.codec = {
+            'text': TextEncoding(),
+            'binary': BinaryEncoding(),
+            'base64': BinaryEncoding(ByteEncoding.BASE64),
+        }[encoding].create_codec(record)
+        self.values = [status_value(record, i) for i in range(1000)]
+        self.encoded = self.codec.encode_many(self.values)
+
+    def time_encode_many(self, encoding):
+        self.codec.encode_many(self.values)
+
+    def time_decode_many(self, encoding):
+        self.codec.decode_many(self.encoded)
+
+    def time_stream_decode(self, encoding):
+        decoder = self.codec.stream_decoder()
+        for start in range(0, len(self.encoded), 4096):
+            decoder.feed(self.encoded[start:start + 4096])
+        decoder.flush()
+
+    def peakmem_decode_many(self, encoding):
+        self.codec.decode_many(self.encoded)
@@ -0,0 +1,28 @@
+from benchmarks.components import image_array, status_record
+
+
+class SchemaSerialization:
+    def setup(self):
+        self.record = status_record()
+        self.image = image_array(192, 108, buffered=True)
+
+    def time_record_to_dict(self):
+        self.record.mark_schema_changed()
+        self.record.datastructure_to_dict()
+
+    def time_record_to_dict_cached(self):
+        self.record.datastructure_to_dict()
+
+    def time_record_to_dict_shared(self):
+        self.record.datastructure_to_dict(shared=True)
+
+    def time_record_to_json_cached(self):
+        self.record.datastructure_to_json()
+
+    def time_record_to_json(self):
+        self.record.mark_schema_changed()
+        self.record.datastructure_to_json()
+
+    def time_image_to_dict(self):
+        self.image.mark_schema_changed()
+        self.image.datastructure_to_dict()
@@ -0,0 +1,106 @@
+from swecommondm.component_implementations import CategoryComponent, DataArrayComponent
+
+from benchmarks.components import image_array, location, quantity, status_record, status_value
+
+
+class FlatArrayValues:
+    params = ['copied', 'buffered']
+
+    def setup(self, mode):
+        self.array = DataArrayComponent(name='samples', label='Samples', definition='www.test.org/test/samples')
+        self.array.set_component_template_and_size(10000, quantity(), buffered=mode == 'buffered')
+        self.values = [float(i) for i in range(10000)]
+
+    def time_set_value(self, mode):
+        self.array.set_value(self.values)
+
+    def time_get_value(self, mode):
+        self.array.get_value()
+
+    def time_get_flat_values(self, mode):
+        self.array.get_flat_values()
+
+
+class CategoryArrayValues:
+    def setup(self):
+        self.array = DataArrayComponent(name='flags', label='Flags', definition='www.test.org/test/flags')
+        flag = CategoryComponent(name='flag', label='Flag', definition='www.test.org/test/flag')
+        self.array.set_component_template_and_size(10000, flag, buffered=True)
+        self.values = [f'STATUS_{i % 12}' for i in range(10000)]
+
+    def time_set_value(self):
+        self.array.set_value(self.values)
+
+    def time_get_value(self):
+        self.array.get_value()
+
+    def peakmem_get_columns(self):
+        self.array.get_columns()
+
+
+class TrackValues:
+    def setup(self):
+        self.track = DataArrayComponent(name='track', label='Track', definition='www.test.org/test/track')
+        self.track.set_component_template_and_size(10000, location(), buffered=True)
+        self.coordinates = [(34.7 + i * 1e-5, -86.6, 190.0) for i in range(10000)]
+        self.values = [{'Lat': lat, 'Lon': lon, 'Alt': alt} for (lat, lon, alt) in self.coordinates]
+
+    def time_set_value(self):
+        self.track.set_value(self.values)
+
+    def time_get_value(self):
+        self.track.get_value()
+
+    def time_set_coordinates(self):
+        self.track.set_coordinates(self.coordinates)
+
+    def time_get_coordinates(self):
+        self.track.get_coordinates()
+
+
+class NestedArrayValues:
+    params = ['copied', 'compact', 'buffered']
+
+    def setup(self, mode):
+        self.array = image_array(192, 108, **{mode: True} if mode != 'copied' else {})
+        self.values = [list(range(108)) for _ in range(192)]
+
+    def time_set_value(self, mode):
+        self.array.set_value(self.values)
+
+    def time_get_value(self, mode):
+        self.array.get_value()
+
+    def peakmem_get_value(self, mode):
+        self.array.get_value()
+
+
+class RecordValues:
+    def setup(self):
+        self.record = status_record()
+        self.value = status_value(self.record, 1)
+        self.flat = self.record.get_flat_values()
+
+    def time_set_value(self):
+        self.record.set_value(self.value)
+
+    def time_get_value(self):
+        self.record.get_value()
+
+    def time_set_single_field(self):
+        self.record.set_value({'location.Lat': 35.0})
+
+    def time_flat_values(self):
+        self.record.set_flat_values(self.flat)
+        self.record.get_flat_values()
+
+
+class TrackedRecordValues(RecordValues):
+    # The same updates with change tracking enabled, plus collecting the changes
+    def setup(self):
+        super().setup()
+        self.record.track_changes()
+
+    def time_get_changes(self):
+        self.record.set_value({'value0': 1.0, 'value1': 2.0})
+        self.record.get_changes()
@@ -0,0 +1,50 @@
+from swecommondm.component_implementations import CountComponent, DataArrayComponent, DataRecordComponent, \
+    QuantityComponent, TextComponent, TimeComponent, VectorComponent
+
+
+def quantity(name='value'):
+    return QuantityComponent(name=name, label='Value', definition='www.test.org/test/value', uom='m')
+
+
+def status_record(fields=50, text=True):
+    """
+    A record of `fields` scalars, including a vector of 3 coordinates and, if `text` is set, a Text field
+    """
+    record = DataRecordComponent(name='status', label='Status', definition='www.test.org/test/status')
+    record.add_field(TimeComponent(name='time', label='Time'))
+    if text:
+        record.add_field(TextComponent(name='mode', label='Mode', definition='www.test.org/test/mode'))
+    record.add_field(location())
+    for i in range(fields - len(record.fields) - 2):
+        record.add_field(quantity(f'value{i}'))
+    return record
+
+
+def location():
+    vector = VectorComponent(name='location', label='Location', definition='www.test.org/test/location',
+                             reference_frame='http://www.opengis.net/def/crs/EPSG/0/9705', local_frame='#SENSOR_FRAME')
+    for axis in ('Lat', 'Lon', 'Alt'):
+        vector.add_coord(axis, quantity(axis.lower()))
+    return vector
+
+
+def status_value(record, i=0):
+    value = {'time': 1718236800_000000000 + i * 1_000_000, 'location': {'Lat': 34.7, 'Lon': -86.6, 'Alt': 190.0}}
+    if 'mode' in record.name_to_field_map():
+        value['mode'] = 'nominal'
+    for field in record.fields:
+        if field.name.startswith('value'):
+            value[field.name] = float(i)
+    return value
+
+
+def image_array(rows, columns, **kwargs):
+    """
+    A `rows` x `columns` array of Counts, the shape of the test_da_nested_3 fixture
+    """
+    row = DataArrayComponent(name='row', label='Row', definition='www.test.org/test/row')
+    row.set_component_template_and_size(columns, CountComponent(name='pixel', label='Pixel',
+                                                                definition='www.test.org/test/pixel'), **kwargs)
+    image = DataArrayComponent(name='image', label='Image', definition='www.test.org/test/image')
+    image.set_component_template_and_size(rows, row, **kwargs)
+    return image
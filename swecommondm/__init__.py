@@ -5,14 +5,142 @@
 #   Contact Email:  ian@botts-inc.com
 #   ==============================================================================
 
+import copy
+import itertools
+import json
+import re
 import uuid
+import weakref
 from abc import abstractmethod
-from dataclasses import dataclass, field
+from dataclasses import MISSING, dataclass, field
 from enum import Enum
 from numbers import Real
 from uuid import UUID
 
 
+_uuid_factory = uuid.uuid4
+
+
+def set_uuid_factory(factory=None):
+    """
+    Sets the function used to allocate the UUIDs of components. UUIDs are only allocated the first time a component's
+    get_uuid is called.
+    :param factory: a callable returning a new UUID, None restores the default uuid.uuid4
+    """
+    global _uuid_factory
+    _uuid_factory = factory if factory is not None else uuid.uuid4
+
+
+def sequential_uuid_factory():
+    """
+    Returns a UUID factory that counts up from a random starting point. It is much cheaper than uuid.uuid4, which reads
+    from os.urandom for every UUID, and its UUIDs are still unique within a process and very unlikely to collide across
+    processes. They are not RFC 4122 version 4 UUIDs.
+    """
+    base = uuid.uuid4().int
+    counter = itertools.count()
+    mask = (1 << 128) - 1
+    return lambda: UUID(int=(base + next(counter)) & mask)
+
+
+class _SchemaAttribute:
+    """
+    Descriptor of an attribute that is part of a component's schema. Setting it invalidates the cached schema of the
+    component and of the components enclosing it; other attributes, such as the value, are stored without any hook.
+    Child components and constraints assigned to an attribute declared with `child` are attached to the component, so
+    that their own changes are propagated to it.
+    """
+    __slots__ = ('name', 'default', 'child')
+
+    def __init__(self, default=MISSING, child: bool = False):
+        self.name = None
+        self.default = default
+        self.child = child
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is not None:
+            try:
+                return obj.__dict__[self.name]
+            except KeyError:
+                pass
+        if self.default is MISSING:
+            raise AttributeError(self.name)
+        return self.default
+
+    def __set__(self, obj, value):
+        obj_dict = obj.__dict__
+        obj_dict[self.name] = value
+        if self.child and value is not None:
+            obj._adopt(value)
+        # Nothing to invalidate while a component is being built
+        if obj_dict.get('_parent') is not None or obj_dict.get('_schema_cache') is not None \
+                or obj_dict.get('_flat_access') is not None:
+            obj._schema_changed()
+
+
+def _copy_schema_dict(obj):
+    if obj.__class__ is dict:
+        return {k: _copy_schema_dict(v) for (k, v) in obj.items()}
+    if obj.__class__ is list:
+        return [_copy_schema_dict(v) for v in obj]
+    if obj.__class__ is set:
+        return set(obj)
+    return obj
+
+
+_NEW = object()
+
+
+class ChangeLog:
+    """
+    Records the values changed in a component tree since they were last collected. Scalar components log their new
+    value, keyed by UUID, and buffered arrays the new value of each changed element, keyed by the array's UUID and the
+    element's index. A value set back to the one it had when the changes were last collected is not reported. Matrices
+    and streams only log that they changed, their whole value being read when the changes are collected.
+    """
+    __slots__ = ('values', 'previous', 'changed')
+
+    def __init__(self):
+        self.values = {}
+        self.previous = {}
+        self.changed = {}
+
+    def log(self, key, old, new):
+        """
+        Logs the new value of a component or element, unless it is the value it had when changes were last collected
+        """
+        previous = self.previous
+        if key not in previous:
+            if new == old:
+                return
+            previous[key] = old
+        self.values[key] = new
+
+    def collect(self) -> dict:
+        """
+        Returns the changes logged so far and starts a new log
+        """
+        previous = self.previous
+        changes = {key: value for (key, value) in self.values.items() if previous.get(key, _NEW) != value}
+        for uuid_, component in self.changed.items():
+            changes[uuid_] = component.get_value()
+        self.values = {}
+        self.previous = {}
+        self.changed = {}
+        return changes
+
+
+def _json_default(obj):
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    if isinstance(obj, range):
+        return [obj.start, obj.stop - 1]
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
 class SWEDataTypes(Enum):
     """
         Data types as defined in the SWE Common Data Model.
@@ -29,9 +157,54 @@ class SWEDataTypes(Enum):
     DATA_RECORD = 'DataRecord'
     VECTOR = 'Vector'
     DATA_ARRAY = 'DataArray'
+    MATRIX = 'Matrix'
+    DATA_STREAM = 'DataStream'
 
 
-class AllowedTokens:
+class _Constraint:
+    """
+    Base of the constraints. Setting an attribute or adding or removing an allowed value discards the compiled form of
+    the constraint and the cached schema of the component it is attached to.
+    """
+    _compiled: tuple = None
+    _owner: weakref.ref = None
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name[0] != '_':
+            self._changed()
+
+    def __getstate__(self):
+        # The owner is attached again when the component holding the constraint is unpickled
+        state = self.__dict__.copy()
+        state.pop('_owner', None)
+        return state
+
+    def __deepcopy__(self, memo):
+        # Allowed values are immutable, only the containers holding them need copying
+        clone = object.__new__(type(self))
+        clone_dict = clone.__dict__
+        for k, v in self.__dict__.items():
+            if k != '_owner':
+                clone_dict[k] = v.copy() if isinstance(v, (set, list, dict)) else v
+        return clone
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return {k: v for (k, v) in vars(self).items() if k[0] != '_'} \
+            == {k: v for (k, v) in vars(other).items() if k[0] != '_'}
+
+    __hash__ = None
+
+    def _changed(self):
+        self._compiled = None
+        owner = self._owner() if self._owner is not None else None
+        if owner is not None:
+            owner._schema_changed()
+
+
+class AllowedTokens(_Constraint):
 
     def __init__(self, value: set[str] = None, pattern: str = None):
         """
@@ -56,15 +229,51 @@ class AllowedTokens:
     def add_value(self, value: str):
         if value is not None:
             self.value.add(value)
+            self._changed()
         return self.value
 
     def remove_value(self, value: str):
         if self.value is not None:
             self.value.discard(value)
+            self._changed()
         return self.value
 
+    def _compile(self):
+        if self._compiled is None:
+            tokens = frozenset(self.value) if self.value is not None else None
+            match = re.compile(self.pattern).fullmatch if self.pattern is not None else None
+            self._compiled = (tokens, match)
+        return self._compiled
+
+    def is_valid(self, value: str) -> bool:
+        """
+        Checks a value against the constraint, which is compiled on first use (frozen token set, compiled pattern)
+        """
+        tokens, match = self._compile()
+        if tokens is None and match is None:
+            return True
+        return (tokens is not None and value in tokens) or (match is not None and match(value) is not None)
 
-class AllowedValues:
+    def find_invalid(self, values) -> list[int]:
+        """
+        Checks a whole sequence of values at once. Each distinct value is only checked once.
+        :return: the indices of the values that are not allowed, None values are ignored
+        """
+        tokens, match = self._compile()
+        if tokens is None and match is None:
+            return []
+        table = getattr(values, 'table', None)
+        if table is not None:
+            # Dictionary-encoded columns are checked once per interned value, then by code
+            invalid = {code for (code, v) in enumerate(table.values) if v is not None and not self.is_valid(v)}
+            return [i for (i, c) in enumerate(values.codes) if c in invalid] if invalid else []
+        invalid = {v for v in set(values) if v is not None and not self.is_valid(v)}
+        if not invalid:
+            return []
+        return [i for (i, v) in enumerate(values) if v in invalid]
+
+
+class AllowedValues(_Constraint):
 
     def __init__(self, value: set[Real] = None, interval: range = None, significant_figures: int = None):
         """
@@ -94,56 +303,115 @@ class AllowedValues:
     def add_value(self, value: Real):
         if value is not None:
             self.value.add(value)
+            self._changed()
         return self.value
 
     def remove_value(self, value: Real):
         if self.value is not None:
             self.value.discard(value)
+            self._changed()
         return self.value
 
+    def _compile(self):
+        if self._compiled is None:
+            values = frozenset(self.value) if self.value is not None else None
+            bounds = None
+            if isinstance(self.interval, range):
+                # Like its JSON form, a range interval includes its last value
+                bounds = (self.interval.start, self.interval.stop - 1)
+            elif self.interval is not None:
+                bounds = (self.interval[0], self.interval[1])
+            self._compiled = (values, bounds, self.significant_figures)
+        return self._compiled
+
+    def is_valid(self, value: Real) -> bool:
+        """
+        Checks a value against the constraint, which is compiled on first use (frozen value set, interval bounds)
+        """
+        values, bounds, significant_figures = self._compile()
+        if significant_figures is not None and isinstance(value, float) \
+                and float(f'{value:.{significant_figures}g}') != value:
+            return False
+        if values is None and bounds is None:
+            return True
+        return (values is not None and value in values) or (bounds is not None and bounds[0] <= value <= bounds[1])
+
+    def find_invalid(self, values) -> list[int]:
+        """
+        Checks a whole sequence of values at once. Sequences that are entirely within the interval or the value set
+        are recognised with a single pass of min/max or set in C.
+        :return: the indices of the values that are not allowed, None values are ignored
+        """
+        allowed, bounds, significant_figures = self._compile()
+        if allowed is None and bounds is None and significant_figures is None:
+            return []
+        if significant_figures is None and len(values) > 0:
+            try:
+                if bounds is not None and bounds[0] <= min(values) and max(values) <= bounds[1]:
+                    return []
+                if allowed is not None and set(values) <= allowed:
+                    return []
+            except TypeError:
+                # None values cannot be compared, fall back to checking each value
+                pass
+        is_valid = self.is_valid
+        return [i for (i, v) in enumerate(values) if v is not None and not is_valid(v)]
+
 
 @dataclass(kw_only=True)
 class SWEImpl:
     """
         This class should not be instantiated, just inherited from
     """
-    extension: str = None
+    extension: str = _SchemaAttribute(None)
     """
         The “extension” attribute is used as a container for future extensions.
     """
 
+    def _schema_changed(self):
+        """
+        Called when a schema attribute is set, overridden by components to invalidate their cached schema
+        """
+
 
 @dataclass(kw_only=True)
 class SweIdentifiableImpl(SWEImpl):
     """
         This class should not be instantiated, just inherited from
     """
-    identifier: str = None
+    identifier: str = _SchemaAttribute(None)
     """
         The optional “identifier” attribute allows assigning a unique identifier to the component,
         so that it can be referenced later on. It can be used, for example, when defining the
         unique identifier of a universal constant.
     """
-    label: str
+    label: str = _SchemaAttribute()
     """
         The label attribute is meant to hold a short, descriptive name
     """
-    description: str = ''
+    description: str = _SchemaAttribute('')
     """
        Description can carry any length of plain text 
     """
 
 
+_INSTANCE_STATE = frozenset({'_DataComponentImpl__uuid', '_flat_access', '_change_log', '_parent', '_storage',
+                             '_instance_template'})
+"""
+    Private attributes of a component that are never shared with its clones
+"""
+
+
 @dataclass(kw_only=True)
 class DataComponentImpl(SweIdentifiableImpl):
     """
         This class should not be instantiated, just inherited from
     """
-    name: str
+    name: str = _SchemaAttribute()
     """
         The name attribute is meant to hold a short, descriptive name
     """
-    definition: str
+    definition: str = _SchemaAttribute()
     """
         The “definition” attribute identifies the property (often an observed property in our
         context) that the data component represents by using a scoped name. It should map to a
@@ -152,13 +420,13 @@ class DataComponentImpl(SweIdentifiableImpl):
         eventually illustrated by pictures and/or diagrams as well as additional semantic information
         such as relationships to units and other concepts, ontological mappings, etc.
     """
-    optional: bool = False
+    optional: bool = _SchemaAttribute(False)
     """
         The “optional” attribute is an optional flag indicating if the component value can be
         omitted in the data stream. It is only meaningful if the component is used as a schema
         descriptor (i.e. not for a component containing an inline value). It is ‘false’ by default.
     """
-    updatable: bool = False
+    updatable: bool = _SchemaAttribute(False)
     """
         The “updatable” attribute is an optional flag indicating if the component value is fixed or
         can be updated. It is only applicable if the data component is used to define the input of a
@@ -171,15 +439,124 @@ class DataComponentImpl(SweIdentifiableImpl):
         DataComponentImpl to use a default value for this attribute. It is name swe_type here to avoid conflicts with
         the python type() function.
     """
-    # __uuid: UUID = uuid.uuid4()
-    __uuid: UUID = field(default_factory=uuid.uuid4, init=False)
+    __uuid: UUID = field(default=None, init=False)
     """
-    Used to uniquely identify components. This field should not be set by the user, it is automatically generated.
+    Used to uniquely identify components. This field should not be set by the user, it is automatically generated the
+    first time get_uuid is called, using the factory set with set_uuid_factory.
     Not part of the OGC specification. It is provided to help other libraries identify specific implementations of
     components.
     """
 
-    def datastructure_to_dict(self):
+    def __deepcopy__(self, memo):
+        """
+        Copies are new components, so the UUID of the original is not carried over
+        """
+        cls = type(self)
+        clone = cls.__new__(cls)
+        memo[id(self)] = clone
+        clone_dict = clone.__dict__
+        for k, v in self.__dict__.items():
+            if k not in _INSTANCE_STATE and k != '_schema_cache':
+                clone_dict[k] = copy.deepcopy(v, memo)
+        clone._adopt_children()
+        return clone
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        constraint = state.get('constraint')
+        if constraint is not None and constraint._owner is None:
+            self._adopt(constraint)
+
+    _coerce_value = None
+    """
+    Function converting the values given to set_value to the form the component stores, also used by its
+    ComponentInstances, or None if values are stored as given
+    """
+
+    _schema_cache: tuple = field(default=None, init=False, repr=False, compare=False)
+    _validate: bool = field(default=False, init=False, repr=False, compare=False)
+    _flat_access: tuple = field(default=None, init=False, repr=False, compare=False)
+    _change_log: ChangeLog = field(default=None, init=False, repr=False, compare=False)
+    _parent: 'DataComponentImpl' = field(default=None, init=False, repr=False, compare=False)
+
+    def _children(self):
+        """
+        Returns the child components whose schema is part of this component's schema
+        """
+        return ()
+
+    def _adopt(self, child):
+        """
+        Attaches a child component or constraint, so that changes to its schema invalidate this component's
+        """
+        if isinstance(child, DataComponentImpl):
+            child.__dict__['_parent'] = self
+        elif isinstance(child, ComponentInstance):
+            child._parent = self
+        elif isinstance(child, _Constraint):
+            object.__setattr__(child, '_owner', weakref.ref(self))
+
+    def _adopt_children(self):
+        for child in self._children():
+            self._adopt(child)
+        constraint = self.__dict__.get('constraint')
+        if constraint is not None:
+            self._adopt(constraint)
+
+    def _invalidate_schema(self):
+        """
+        Discards the caches derived from the component's schema
+        """
+        self_dict = self.__dict__
+        self_dict['_schema_cache'] = None
+        self_dict['_flat_access'] = None
+        self_dict.pop('_instance_template', None)
+
+    def _schema_changed(self):
+        component = self
+        while component is not None:
+            component._invalidate_schema()
+            component = component._parent
+
+    def mark_schema_changed(self):
+        """
+        Invalidates the cached schema of the component and of the components enclosing it. Setting a schema attribute,
+        modifying a constraint or adding a field, coordinate or array element does so already, this only needs to be
+        called after modifying the fields, coordinates or components of a component in place.
+        """
+        self._adopt_children()
+        self._schema_changed()
+
+    def _get_schema_dict(self):
+        cache = self._schema_cache
+        if cache is None:
+            cache = self._schema_cache = (self._schema_to_dict(), None)
+        return cache[0]
+
+    def datastructure_to_dict(self, shared: bool = False):
+        """
+        Returns the schema of the component as a dictionary. The schema is built once and cached until a schema
+        attribute of the component or of one of its children changes. Copying the cached dictionary costs nearly as
+        much as building it, so callers that only read the schema should pass `shared`, and callers that publish it
+        should use datastructure_to_json, which caches the encoded schema too.
+        :param shared: return the cached dictionary itself rather than a copy. It must not be modified.
+        """
+        schema_dict = self._get_schema_dict()
+        return schema_dict if shared else _copy_schema_dict(schema_dict)
+
+    def datastructure_to_json(self) -> bytes:
+        """
+        Returns the schema of the component as UTF-8 encoded JSON. The encoded schema is cached along with the
+        dictionary, so until the schema changes a call costs nothing: this is the path to use to publish a schema.
+        """
+        schema_dict = self._get_schema_dict()
+        schema_json = self._schema_cache[1]
+        if schema_json is None:
+            schema_json = json.dumps(schema_dict, default=_json_default).encode()
+            self._schema_cache = (schema_dict, schema_json)
+        return schema_json
+
+    def _schema_to_dict(self):
         schema_dict = dict([
             ('name', self.name),
             ('type', self.swe_type.value),
@@ -189,11 +566,195 @@ class DataComponentImpl(SweIdentifiableImpl):
         ])
         return schema_dict
 
+    def enable_validation(self, enabled: bool = True):
+        """
+        Turns checking of new values against the component's constraint in set_value on or off. Composite components
+        apply the setting to their children.
+        """
+        self._validate = enabled
+
+    def check_value(self, value):
+        """
+        Raises a ValueError if the value is not allowed by the component's constraint
+        """
+        constraint = getattr(self, 'constraint', None)
+        if constraint is not None and value is not None and not constraint.is_valid(value):
+            raise ValueError(f'{value!r} is not an allowed value for {self.name}')
+
+    def clone(self):
+        """
+        Returns a new component with the same schema and value as this one. Unlike a deep copy, the clone shares the
+        immutable schema attributes of this component (strings, numbers...) and only copies its values, constraint and
+        codespace, so cloning a record costs about as much as its value slots. Changing the schema of either component
+        does not affect the other.
+        """
+        return self._clone(compact=False)
+
+    def _clone(self, compact: bool):
+        cls = type(self)
+        clone = cls.__new__(cls)
+        clone_dict = clone.__dict__
+        for k, v in self.__dict__.items():
+            if k not in _INSTANCE_STATE:
+                clone_dict[k] = v
+        # Constraints and codespaces can be modified in place, and are small enough to copy
+        for k in ('constraint', 'codespace'):
+            if clone_dict.get(k) is not None:
+                clone_dict[k] = copy.deepcopy(clone_dict[k])
+        self._clone_children(clone, compact)
+        clone._adopt_children()
+        return clone
+
+    def _clone_children(self, clone, compact: bool):
+        """
+        Gives a clone its own copies of the children and buffers holding values. Called by clone, which only copies the
+        component's attributes. With `compact`, child components are created with their create_instance.
+        """
+
+    def _flat_segments(self, path: str) -> list:
+        """
+        Returns the segments of the component's flat values: ``(path, component)`` for a scalar component, or
+        ``(path, swe_type, count, get, set)`` where get returns the `count` values of the segment and set writes them.
+        Composite components concatenate the segments of their children.
+        """
+        return [(path, self)]
+
+    def _compile_flat_access(self):
+        # Consecutive scalar components are grouped in runs so that they are read in a single list comprehension
+        plan = []
+        pieces = []
+        offset = 0
+        for segment in self._flat_segments(''):
+            if len(segment) == 2:
+                path, component = segment
+                swe_type, count = component.swe_type, 1
+                if pieces and pieces[-1][0] is not None:
+                    pieces[-1][0].append(component)
+                else:
+                    pieces.append(([component], None, None, offset))
+            else:
+                path, swe_type, count, get, set_ = segment
+                pieces.append((None, get, set_, offset))
+            plan.append((path, swe_type, offset, count))
+            offset += count
+        size = offset
+
+        if len(pieces) == 1 and pieces[0][0] is not None:
+            components = pieces[0][0]
+
+            def get_flat_values():
+                return tuple([c.value for c in components])
+        else:
+            def get_flat_values():
+                out = []
+                for run, get_segment, _, _ in pieces:
+                    out.extend([c.value for c in run] if run is not None else get_segment())
+                return tuple(out)
+
+        ends = [piece[3] for piece in pieces[1:]] + [size]
+
+        def set_flat_values(values):
+            if len(values) != size:
+                raise ValueError(f'Expected {size} values, got {len(values)}')
+            for (run, _, set_segment, start), end in zip(pieces, ends):
+                if run is not None:
+                    for c, v in zip(run, values[start:end]):
+                        c.set_value(v)
+                else:
+                    set_segment(values[start:end])
+
+        return plan, get_flat_values, set_flat_values
+
+    def _get_flat_access(self):
+        access = self._flat_access
+        if access is None:
+            access = self._flat_access = self._compile_flat_access()
+        return access
+
+    def get_flat_plan(self) -> list[tuple[str, SWEDataTypes, int, int]]:
+        """
+        Returns the layout of get_flat_values as (path, swe_type, offset, count) tuples, one per scalar leaf. The values
+        of a buffered array or a matrix form a single entry holding all of their values in element order, with the type
+        of its leaves, or DataArray if its elements have several leaves. The plan is compiled once per schema, until the
+        schema changes.
+        """
+        return self._get_flat_access()[0]
+
+    def get_flat_values(self) -> tuple:
+        """
+        Returns the values of all scalar leaves of the component in element order, the order in which they are encoded,
+        without building nested values
+        """
+        return self._get_flat_access()[1]()
+
+    def set_flat_values(self, values):
+        """
+        Sets the values of all scalar leaves of the component from a flat sequence or buffer laid out as get_flat_plan
+        describes
+        """
+        self._get_flat_access()[2](values)
+
     def get_uuid(self):
+        if self.__uuid is None:
+            self.__uuid = _uuid_factory()
         return self.__uuid
 
     def get_uuid_value_map(self):
-        return {self.__uuid: self.get_value()}
+        return {self.get_uuid(): self.get_value()}
+
+    def _attach_change_log(self, change_log):
+        """
+        Sets the log the component records its changes to. Composite components also set it on their children.
+        """
+        self._change_log = change_log
+
+    def _log_value(self, value):
+        self._change_log.log(self.get_uuid(), self.value, value)
+
+    def _mark_changed(self):
+        change_log = self._change_log
+        if change_log is not None:
+            change_log.changed[self.get_uuid()] = self
+
+    def track_changes(self, enabled: bool = True):
+        """
+        Starts recording the values set on this component and its children, or stops. Values assigned to the `value`
+        attribute or written directly into buffers (see get_buffer) are not recorded.
+        """
+        self._attach_change_log(ChangeLog() if enabled else None)
+
+    def get_changes(self) -> dict:
+        """
+        Returns the values changed since change tracking was enabled or the changes were last collected, as a map of
+        component UUIDs to values like get_uuid_value_map, and starts recording again. Changed elements of buffered
+        arrays are keyed by the array's UUID and their index instead. The cost depends on the number of changed
+        components, not on the size of the tree.
+        """
+        if self._change_log is None:
+            raise ValueError(f'Changes of {self.name} are not tracked, call track_changes first')
+        return self._change_log.collect()
+
+    def create_instance(self):
+        """
+        Returns a new component with the same schema as this one, e.g. an element of a DataArray using this component as
+        its template. Scalar components return a ComponentInstance sharing their metadata, composite components a clone
+        whose children are instances of copies of this component's children (see _snapshot_instance).
+        """
+        return ComponentInstance(self)
+
+    def _snapshot_instance(self):
+        """
+        Returns a ComponentInstance of a copy of this component's schema, for the children of composite instances. The
+        copy is shared by all instances taken until the schema changes, so changes to this component, whose parent is
+        not the instance's, cannot leave the cached schema of the instance stale.
+        """
+        self_dict = self.__dict__
+        template = self_dict.get('_instance_template')
+        if template is None:
+            template = self_dict['_instance_template'] = self.clone()
+        instance = ComponentInstance(template, self.value)
+        instance._validate = self._validate
+        return instance
 
     @abstractmethod
     def get_value(self):
@@ -204,6 +765,145 @@ class DataComponentImpl(SweIdentifiableImpl):
         raise NotImplementedError
 
 
+class ComponentInstance:
+    """
+    Compact instance of a scalar component template. It only stores its own value and UUID, every other attribute is
+    read from the template, which is shared by all of its instances. Setting a schema attribute on an instance gives it
+    a private copy of the template first, so the change does not affect the other instances. Validation is enabled per
+    instance.
+
+    Instances are accepted wherever a component is, e.g. as record fields or array elements. Only the attributes and
+    methods common to the scalar components are forwarded to the template; use get_template for any other.
+    """
+    __slots__ = ('_template', 'value', '_uuid', '_change_log', '_parent', '_owns_template', '_validate')
+
+    def __init__(self, template: DataComponentImpl, value=None):
+        self._template = template
+        self.value = value if value is not None else template.value
+        self._uuid = None
+        self._change_log = None
+        self._parent = None
+        self._owns_template = False
+        self._validate = template._validate
+
+    def _own_template(self) -> DataComponentImpl:
+        """
+        Returns the template, copying it first if it is shared with other instances
+        """
+        if not self._owns_template:
+            self._template = self._template.clone()
+            self._owns_template = True
+        return self._template
+
+    def _schema_changed(self):
+        if self._parent is not None:
+            self._parent._schema_changed()
+
+    def _copy(self, value) -> 'ComponentInstance':
+        # The template is shared again, so it must be copied before either instance modifies it
+        self._owns_template = False
+        instance = ComponentInstance(self._template, value)
+        instance._validate = self._validate
+        return instance
+
+    def __deepcopy__(self, memo):
+        return self._copy(copy.deepcopy(self.value, memo))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._template!r}, value={self.value!r})'
+
+    def _flat_segments(self, path: str) -> list:
+        return [(path, self)]
+
+    def get_flat_values(self) -> tuple:
+        return (self.value,)
+
+    def set_flat_values(self, values):
+        if len(values) != 1:
+            raise ValueError(f'Expected 1 value, got {len(values)}')
+        self.set_value(values[0])
+
+    def get_template(self) -> DataComponentImpl:
+        return self._template
+
+    def get_uuid(self):
+        if self._uuid is None:
+            self._uuid = _uuid_factory()
+        return self._uuid
+
+    def get_uuid_value_map(self):
+        return {self.get_uuid(): self.value}
+
+    def _attach_change_log(self, change_log):
+        self._change_log = change_log
+
+    track_changes = DataComponentImpl.track_changes
+    get_changes = DataComponentImpl.get_changes
+
+    def create_instance(self):
+        return self._copy(None)
+
+    def clone(self):
+        return self._copy(self.value)
+
+    def enable_validation(self, enabled: bool = True):
+        self._validate = enabled
+
+    def get_value(self):
+        return self.value
+
+    def set_value(self, value):
+        template = self._template
+        if template._coerce_value is not None:
+            value = template._coerce_value(value)
+        if self._validate:
+            template.check_value(value)
+        if self._change_log is not None:
+            self._change_log.log(self.get_uuid(), self.value, value)
+        self.value = value
+
+
+def _template_attribute(name: str, writable: bool) -> property:
+    def get(self):
+        return getattr(self._template, name)
+
+    if not writable:
+        return property(get)
+
+    def set_(self, value):
+        setattr(self._own_template(), name, value)
+        self._schema_changed()
+
+    return property(get, set_)
+
+
+def _template_method(name: str, modifies_schema: bool):
+    def method(self, *args, **kwargs):
+        result = getattr(self._own_template() if modifies_schema else self._template, name)(*args, **kwargs)
+        if modifies_schema:
+            self._schema_changed()
+        return result
+
+    method.__name__ = name
+    method.__qualname__ = f'ComponentInstance.{name}'
+    return method
+
+
+# Explicit forwarding, rather than __getattr__ and __setattr__ hooks, keeps reading and setting values as fast as on
+# any other slotted object
+for _name in ('extension', 'identifier', 'label', 'description', 'name', 'definition', 'optional', 'updatable', 'uom',
+              'constraint', 'codespace', 'reference_time', 'local_frame'):
+    setattr(ComponentInstance, _name, _template_attribute(_name, writable=True))
+for _name in ('swe_type', '_dictionary_encoded'):
+    setattr(ComponentInstance, _name, _template_attribute(_name, writable=False))
+for _name in ('_get_schema_dict', 'datastructure_to_dict', 'datastructure_to_json', 'check_value', 'get_flat_plan',
+              'get_iso_value'):
+    setattr(ComponentInstance, _name, _template_method(_name, modifies_schema=False))
+for _name in ('set_allowed_values', 'add_allowed_value', 'enable_dictionary_encoding'):
+    setattr(ComponentInstance, _name, _template_method(_name, modifies_schema=True))
+del _name
+
+
 """ Basic Data Types:
     * Boolean (Unimplemented)
     * Text
@@ -220,7 +920,7 @@ class DataComponentImpl(SweIdentifiableImpl):
 
 """ Block Components:
     * DataArray
-    * Matrix (unimplemented)
-    * DataStream (unimplemented)
+    * Matrix
+    * DataStream
 """
 
@@ -0,0 +1,748 @@
+"""
+Columnar storage for template-backed components.
+
+Rather than keeping one deep copy of a component template per element, a buffered component keeps a single template
+and stores the values of its scalar leaves in contiguous columns. Components are only inspected through their
+``swe_type`` and structural attributes here so that this module does not depend on the concrete implementations.
+"""
+import sys
+from array import array
+from collections.abc import Mapping, MutableSequence, Sequence
+
+from swecommondm import SWEDataTypes
+from swecommondm.iso8601 import parse_iso8601
+
+BUFFER_TYPECODES = {
+    SWEDataTypes.BOOLEAN: 'b',
+    SWEDataTypes.COUNT: 'q',
+    SWEDataTypes.QUANTITY: 'd',
+    SWEDataTypes.TIME: 'q',
+}
+"""
+    ``array.array`` typecodes for scalar types that can be stored in a typed buffer. Category values, and those of Text
+    components with dictionary encoding enabled, are stored in DictionaryColumns; other Text values in plain lists.
+"""
+
+
+_TYPESTRS = {
+    'b': 'i1',
+    'q': 'i8',
+    'd': 'f8',
+}
+
+
+def column_typecode(column):
+    """
+    Returns the typecode of a typed column, an array.array or a memoryview over mapped storage (see
+    swecommondm.storage.MappedColumns), or None for a list or DictionaryColumn
+    """
+    if isinstance(column, array):
+        return column.typecode
+    if isinstance(column, memoryview):
+        return column.format
+    return None
+
+
+def copy_column(column, start: int = None, stop: int = None):
+    """
+    Returns an in-memory copy of ``column[start:stop]``. Slicing a mapped column would only return a view of the same
+    storage, so its values are copied into an array.array.
+    """
+    if isinstance(column, memoryview):
+        return array(column.format, column[start:stop].tobytes())
+    if isinstance(column, DictionaryColumn):
+        return column[start:stop].copy()
+    return column[start:stop]
+
+
+def array_interface(column: array, shape: tuple[int, ...], boolean: bool = False) -> dict:
+    """
+    Returns a NumPy array interface (version 3) describing a typed column with the given shape. The column is passed
+    as a buffer, so it cannot be resized while NumPy arrays use it.
+    """
+    if boolean:
+        typestr = '|b1'
+    else:
+        typestr = ('<' if sys.byteorder == 'little' else '>') + _TYPESTRS[column_typecode(column)]
+    return {'version': 3, 'shape': shape, 'typestr': typestr, 'data': memoryview(column)}
+
+
+def join_path(prefix: str, name: str) -> str:
+    return name if not prefix else f'{prefix}.{name}'
+
+
+def array_element_template(array_comp):
+    """
+    Returns the template of a DataArrayComponent's elements, falling back to its first component for arrays that were
+    populated with add_component.
+    """
+    template = getattr(array_comp, 'element_type', None)
+    if template is None and len(array_comp.components) > 0:
+        template = array_comp.components[0]
+    return template
+
+
+def fill_value(leaf):
+    """
+    The value stored in a new or cleared slot of a leaf's column: the leaf template's value, or 0 for typed columns when
+    the template has no value
+    """
+    if leaf.value is None and leaf.swe_type in BUFFER_TYPECODES:
+        return 0
+    return leaf.value
+
+
+MISSING_CODE = 0
+"""
+    Code of a missing (None) value in every ValueTable
+"""
+
+
+class ValueTable:
+    """
+    Interned values of dictionary-encoded columns. Each distinct value is stored once and identified by its index, its
+    code, which never changes, so columns sliced from one another can share their table. Code 0 is reserved for
+    missing values: ``values[0]`` is always None and is not counted as one of the values of the table.
+    """
+    __slots__ = ('values', 'codes')
+
+    def __init__(self, values=()):
+        self.values: list = [None]
+        self.codes: dict = {None: MISSING_CODE}
+        for value in values:
+            self.intern(value)
+
+    def __len__(self):
+        return len(self.values) - 1
+
+    def __reduce__(self):
+        return ValueTable, (self.values[1:],)
+
+    def intern(self, value) -> int:
+        """
+        Returns the code of a value, adding it to the table if it is new
+        """
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+_SMALL_CODES = 'H'
+_LARGE_CODES = 'l'
+_COMPACTION_SLACK = 1024
+
+
+class DictionaryColumn(MutableSequence):
+    """
+    List-like column of repeated values, stored as integer codes into a ValueTable. Codes are unsigned 16-bit integers
+    until the table outgrows them. Reading an item returns the interned value, so a column of a dozen distinct tokens
+    holds a dozen strings however long it is, and counting or finding a value compares codes rather than strings.
+    """
+    __slots__ = ('table', 'codes')
+
+    def __init__(self, table: ValueTable = None, codes: array = None):
+        self.table = table if table is not None else ValueTable()
+        self.codes = codes if codes is not None else array(_SMALL_CODES)
+
+    @classmethod
+    def filled(cls, table: ValueTable, value, length: int):
+        code = table.intern(value)
+        column = cls(table)
+        column.codes = array(column._typecode(code), [code]) * length
+        return column
+
+    def __reduce__(self):
+        return DictionaryColumn, (self.table, self.codes)
+
+    def _typecode(self, largest_code: int) -> str:
+        if largest_code > 0xFFFF and self.codes.typecode == _SMALL_CODES:
+            self.codes = array(_LARGE_CODES, self.codes)
+        return self.codes.typecode
+
+    def _encode(self, values) -> array:
+        if isinstance(values, DictionaryColumn) and values.table is self.table:
+            codes = values.codes
+        else:
+            intern = self.table.intern
+            codes = [intern(v) for v in values]
+        return array(self._typecode(len(self.table)), codes)
+
+    def copy(self) -> 'DictionaryColumn':
+        """
+        Returns a copy of the column with a table of its own, holding only the values the column uses, in the order of
+        their codes in this column's table
+        """
+        used = sorted(set(self.codes) - {MISSING_CODE})
+        recoded = dict(zip(used, range(1, len(used) + 1)))
+        recoded[MISSING_CODE] = MISSING_CODE
+        values = self.table.values
+        column = DictionaryColumn(ValueTable(values[c] for c in used))
+        column.codes = array(column._typecode(len(used)), map(recoded.__getitem__, self.codes))
+        return column
+
+    def compact(self):
+        """
+        Drops the values of the table no longer used by the column. Other columns sharing the table keep the old one.
+        """
+        compacted = self.copy()
+        self.table, self.codes = compacted.table, compacted.codes
+
+    def _compact_if_sparse(self):
+        # Overwritten values stay in the table, so a long-lived column of ever-changing text would grow it without
+        # bound: recode it once the table holds far more values than the column has items
+        if len(self.table) > 2 * len(self.codes) + _COMPACTION_SLACK:
+            self.compact()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DictionaryColumn(self.table, self.codes[index])
+        return self.table.values[self.codes[index]]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self.codes[index] = self._encode(value)
+        else:
+            code = self.table.intern(value)
+            self._typecode(code)
+            self.codes[index] = code
+        self._compact_if_sparse()
+
+    def __delitem__(self, index):
+        del self.codes[index]
+
+    def insert(self, index: int, value):
+        code = self.table.intern(value)
+        self._typecode(code)
+        self.codes.insert(index, code)
+        self._compact_if_sparse()
+
+    def extend(self, values):
+        codes = self._encode(values)
+        self.codes.extend(codes)
+        self._compact_if_sparse()
+
+    def __iter__(self):
+        return map(self.table.values.__getitem__, self.codes)
+
+    def __add__(self, other):
+        column = self.copy()
+        column.extend(other)
+        return column
+
+    def __eq__(self, other):
+        if isinstance(other, DictionaryColumn) and other.table is self.table:
+            return self.codes == other.codes
+        if isinstance(other, Sequence) and not isinstance(other, (str, bytes)):
+            return len(self) == len(other) and all(a == b for (a, b) in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'DictionaryColumn({self.tolist()!r})'
+
+    def tolist(self) -> list:
+        return list(self)
+
+    def code_of(self, value):
+        """
+        Returns the code of a value, or None if no value of the column's table is equal to it
+        """
+        return self.table.codes.get(value)
+
+    def __contains__(self, value):
+        code = self.code_of(value)
+        return code is not None and code in self.codes
+
+    def count(self, value) -> int:
+        code = self.code_of(value)
+        return 0 if code is None else self.codes.count(code)
+
+    def indices(self, value) -> list[int]:
+        """
+        Returns the positions of the items equal to `value`, comparing codes
+        """
+        code = self.code_of(value)
+        if code is None:
+            return []
+        return [i for (i, c) in enumerate(self.codes) if c == code]
+
+
+def is_dictionary_encoded(leaf) -> bool:
+    """
+    Whether the values of a leaf are stored in a DictionaryColumn: Category leaves, and Text leaves with dictionary
+    encoding enabled
+    """
+    return leaf.swe_type is SWEDataTypes.CATEGORY or getattr(leaf, '_dictionary_encoded', False)
+
+
+def new_column(leaf, length: int):
+    """
+    Creates a column holding `length` copies of the leaf template's value. The table of a dictionary-encoded column
+    starts with the tokens allowed by the leaf's constraint, if any, so their codes follow their sorted order.
+    """
+    typecode = BUFFER_TYPECODES.get(leaf.swe_type)
+    if typecode is not None:
+        return array(typecode, [fill_value(leaf)]) * length
+    if is_dictionary_encoded(leaf):
+        tokens = getattr(getattr(leaf, 'constraint', None), 'value', None)
+        return DictionaryColumn.filled(ValueTable(sorted(tokens) if tokens else ()), leaf.value, length)
+    return [leaf.value] * length
+
+
+class BufferLayout:
+    """
+    Compiled description of how a component template maps onto a set of leaf columns.
+
+    Each scalar leaf of the template is stored in its own column keyed by its dotted path (record field names and vector
+    axis ids, array levels do not add to the path). An instance of the template at position `pos` finds its scalar
+    leaves at ``column[pos]``; a fixed-size array inside the template multiplies the position by its size, so a
+    1920x1080 grid of counts is a single column of 1920 * 1080 integers. A Matrix is laid out like nested arrays, one
+    level per dimension, over the cells of its element type.
+    """
+
+    def __init__(self, template, prefix: str = '', shape: tuple[int, ...] = None):
+        """
+        :param shape: for the inner levels of a Matrix template, the dimensions left to lay out
+        """
+        self.template = template
+        self.prefix = prefix
+        self.swe_type = template.swe_type
+        self.children: dict[str, BufferLayout] = {}
+        self.element: BufferLayout = None
+        self.size = 1
+        self.key: str = None
+        self.typecode: str = None
+        self.leaves: list[tuple[str, object, int]] = []
+        """
+            (column key, leaf template, number of values per template instance) for every scalar leaf
+        """
+
+        if self.swe_type is SWEDataTypes.DATA_RECORD:
+            for f in template.fields:
+                self._add_child(f.name, f)
+        elif self.swe_type is SWEDataTypes.VECTOR:
+            for axis, coord in template.coordinates.items():
+                self._add_child(axis, coord)
+        elif self.swe_type is SWEDataTypes.DATA_ARRAY:
+            self.size = template.element_count.value
+            self.element = BufferLayout(array_element_template(template), prefix)
+            self.leaves = [(key, leaf, width * self.size) for (key, leaf, width) in self.element.leaves]
+        elif self.swe_type is SWEDataTypes.MATRIX:
+            if shape is None:
+                shape = template.shape
+            self.size = shape[0]
+            if len(shape) > 1:
+                self.element = BufferLayout(template, prefix, shape[1:])
+            else:
+                self.element = BufferLayout(template.element_type, prefix)
+            self.leaves = [(key, leaf, width * self.size) for (key, leaf, width) in self.element.leaves]
+        else:
+            self.key = prefix
+            self.typecode = BUFFER_TYPECODES.get(self.swe_type)
+            self.leaves = [(prefix, template, 1)]
+
+    def _add_child(self, name, child_template):
+        child = BufferLayout(child_template, join_path(self.prefix, name))
+        self.children[name] = child
+        self.leaves.extend(child.leaves)
+
+    def allocate(self, count: int = 1):
+        """
+        Creates the columns for `count` instances of the template, filled with the leaf templates' values
+        """
+        return {key: new_column(leaf, width * count) for (key, leaf, width) in self.leaves}
+
+    def extend(self, columns, count: int = 1):
+        """
+        Appends `count` default instances of the template to existing columns
+        """
+        for (key, leaf, width) in self.leaves:
+            column = columns[key]
+            if isinstance(column, memoryview):
+                raise TypeError(f'Column "{key}" is mapped from a file and cannot be extended')
+            column.extend(new_column(leaf, width * count))
+
+    def read(self, columns, pos: int):
+        """
+        Reads the value of the template instance at `pos`, shaped as the template's own get_value would return it
+        """
+        if self.key is not None:
+            value = columns[self.key][pos]
+            return bool(value) if self.swe_type is SWEDataTypes.BOOLEAN else value
+
+        if self.element is not None:
+            element = self.element
+            start = pos * self.size
+            if element.key is None:
+                return [element.read(columns, i) for i in range(start, start + self.size)]
+            values = columns[element.key][start:start + self.size]
+            if element.swe_type is SWEDataTypes.BOOLEAN:
+                return [bool(v) for v in values]
+            return values if values.__class__ is list else values.tolist()
+
+        return {name: child.read(columns, pos) for (name, child) in self.children.items()}
+
+    def write(self, columns, pos: int, value, skip_none: bool = False):
+        """
+        Writes a value shaped as the template's set_value would accept it to the template instance at `pos`. Typed
+        columns have no way to mark a value as missing, so writing None to one raises a TypeError rather than storing a
+        value that could not be told apart from a real one.
+        :param skip_none: leave the columns unchanged where `value` holds None instead, e.g. to keep the defaults of a
+            newly allocated slot for the unset leaves of a component
+        """
+        if value is None and skip_none:
+            return
+
+        if self.key is not None:
+            if value.__class__ is str and self.swe_type is SWEDataTypes.TIME:
+                value = parse_iso8601(value)
+            elif value is None and self.typecode is not None:
+                raise TypeError(f'{self.key or self.template.name} is stored in a typed column, which cannot hold None')
+            columns[self.key][pos] = value
+
+        elif self.element is not None:
+            element = self.element
+            if len(value) > self.size:
+                raise IndexError(f'{len(value)} values given for a DataArray of {self.size} elements')
+            start = pos * self.size
+            if element.key is None or skip_none:
+                for i, v in enumerate(value, start):
+                    element.write(columns, i, v, skip_none)
+            else:
+                if element.swe_type is SWEDataTypes.TIME:
+                    value = [parse_iso8601(v) if v.__class__ is str else v for v in value]
+                if element.typecode is not None:
+                    value = array(element.typecode, value)
+                columns[element.key][start:start + len(value)] = value
+
+        elif self.swe_type is SWEDataTypes.VECTOR and not isinstance(value, Mapping):
+            # Vector coordinates in axis order
+            if len(value) != len(self.children):
+                raise ValueError(f'{self.template.name} has {len(self.children)} axes, got {len(value)} coordinates')
+            for child, v in zip(self.children.values(), value):
+                child.write(columns, pos, v, skip_none)
+
+        else:
+            children = self.children
+            for k, v in value.items():
+                child = children.get(k)
+                if child is not None:
+                    child.write(columns, pos, v, skip_none)
+
+    def leaf_shape(self, key: str):
+        """
+        Returns the sizes of the arrays enclosing a leaf within the template, outermost first, or None if the template
+        has no such leaf
+        """
+        if self.key is not None:
+            return () if self.key == key else None
+        if self.element is not None:
+            inner = self.element.leaf_shape(key)
+            return None if inner is None else (self.size,) + inner
+        for child in self.children.values():
+            shape = child.leaf_shape(key)
+            if shape is not None:
+                return shape
+        return None
+
+    def scalar_count(self) -> int:
+        """
+        The number of scalar values in one instance of the template
+        """
+        return sum(width for (_, _, width) in self.leaves)
+
+    def compile_flatten(self):
+        """
+        Compiles a function ``flatten(value, out)`` that appends the scalar values of a template value to the list
+        `out` in element order, i.e. the order in which they appear in an encoded block.
+        """
+        if self.key is not None:
+            return lambda value, out: out.append(value)
+
+        if self.element is not None:
+            if self.element.key is not None:
+                return lambda values, out: out.extend(values)
+            flatten_element = self.element.compile_flatten()
+
+            def flatten_array(values, out):
+                for v in values:
+                    flatten_element(v, out)
+
+            return flatten_array
+
+        children = [(name, child.compile_flatten()) for (name, child) in self.children.items()]
+
+        def flatten_record(value, out):
+            for name, flatten_child in children:
+                flatten_child(value.get(name), out)
+
+        return flatten_record
+
+    def compile_unflatten(self):
+        """
+        Compiles the inverse of compile_flatten, a function ``unflatten(values, i)`` that rebuilds a template value from
+        the flat sequence `values` starting at index `i`, and returns it along with the index following it.
+        """
+        if self.key is not None:
+            if self.swe_type is SWEDataTypes.BOOLEAN:
+                return lambda values, i: (bool(values[i]), i + 1)
+            return lambda values, i: (values[i], i + 1)
+
+        if self.element is not None:
+            size = self.size
+            if self.element.key is not None:
+                if self.element.swe_type is SWEDataTypes.BOOLEAN:
+                    return lambda values, i: ([bool(v) for v in values[i:i + size]], i + size)
+                return lambda values, i: (list(values[i:i + size]), i + size)
+            unflatten_element = self.element.compile_unflatten()
+
+            def unflatten_array(values, i):
+                elements = []
+                for _ in range(size):
+                    element, i = unflatten_element(values, i)
+                    elements.append(element)
+                return elements, i
+
+            return unflatten_array
+
+        children = [(name, child.compile_unflatten()) for (name, child) in self.children.items()]
+
+        def unflatten_record(values, i):
+            value = {}
+            for name, unflatten_child in children:
+                value[name], i = unflatten_child(values, i)
+            return value, i
+
+        return unflatten_record
+
+    def child(self, key, pos: int):
+        """
+        Returns the layout and position of a field, axis or array element of the template instance at `pos`
+        """
+        if self.element is not None:
+            if key < 0:
+                key += self.size
+            if not 0 <= key < self.size:
+                raise IndexError('DataArray index out of range')
+            return self.element, pos * self.size + key
+        return self.children[key], pos
+
+
+class BufferView:
+    """
+    Lightweight stand-in for a component stored in a buffer. Values are read from and written to the buffer's columns,
+    all other schema attributes are those of the template.
+    """
+    __slots__ = ('_layout', '_columns', '_pos', '_owner', '_index')
+
+    def __init__(self, layout: BufferLayout, columns, pos: int, owner=None, index: int = None):
+        """
+        :param owner: the component owning the buffer, notified of writes through the view
+        :param index: the index of the element of the owner that the view belongs to
+        """
+        self._layout = layout
+        self._columns = columns
+        self._pos = pos
+        self._owner = owner
+        self._index = index
+
+    def __getattr__(self, item):
+        return getattr(self._layout.template, item)
+
+    def __getitem__(self, key):
+        """
+        Returns a view of a field (by name), vector axis (by axis id) or array element (by index)
+        """
+        layout, pos = self._layout.child(key, self._pos)
+        return BufferView(layout, self._columns, pos, self._owner, self._index)
+
+    def get_value(self):
+        return self._layout.read(self._columns, self._pos)
+
+    @property
+    def value(self):
+        return self._layout.read(self._columns, self._pos)
+
+    @value.setter
+    def value(self, value):
+        self.set_value(value)
+
+    def get_uuid(self) -> tuple:
+        """
+        Returns the key the owner's change log records the element under: the owner's UUID and the element index. The
+        fields of an element live in its columns and have no identity of their own.
+        """
+        owner = self._owner
+        if owner is None or self._layout is not owner._buffer_layout.element:
+            raise TypeError(f'{self._layout.template.name} is part of a buffered element and has no UUID of its own')
+        return owner.get_uuid(), self._index
+
+    def get_uuid_value_map(self) -> dict:
+        return {self.get_uuid(): self.get_value()}
+
+    def get_coordinates(self) -> tuple:
+        """
+        Returns the coordinates of a Vector in axis order
+        """
+        return tuple(axis.read(self._columns, self._pos) for axis in self._layout.children.values())
+
+    def set_value(self, value):
+        owner = self._owner
+        if owner is None:
+            self._layout.write(self._columns, self._pos, value)
+            return
+        if owner._validate:
+            self._layout.template.check_value(value)
+        if owner._change_log is None:
+            self._layout.write(self._columns, self._pos, value)
+            return
+        old = owner._buffer_layout.element.read(self._columns, self._index)
+        self._layout.write(self._columns, self._pos, value)
+        owner._log_element(self._index, old)
+
+
+class BufferedComponentList(Sequence):
+    """
+    Read-only sequence of views over the elements of a buffered DataArrayComponent
+    """
+
+    def __init__(self, array_comp):
+        self._array = array_comp
+
+    def __len__(self):
+        return self._array.element_count.value
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        layout, pos = self._array._buffer_layout.child(index, 0)
+        return BufferView(layout, self._array._columns, pos, self._array, pos)
+
+
+def c_strides(shape: tuple[int, ...]) -> tuple[int, ...]:
+    """
+    Returns the row-major strides, in items, of a buffer with the given shape
+    """
+    strides = []
+    stride = 1
+    for n in reversed(shape):
+        strides.append(stride)
+        stride *= n
+    return tuple(reversed(strides))
+
+
+class StridedView:
+    """
+    View over part of a flat typed buffer, described by an offset, a shape and strides counted in items. Indexing with
+    integers and slices returns narrower views (or a single value) without copying anything.
+    """
+    __slots__ = ('buffer', 'offset', 'shape', 'strides', 'boolean', 'owner')
+
+    def __init__(self, buffer, offset: int, shape: tuple[int, ...], strides: tuple[int, ...], boolean: bool = False,
+                 owner=None):
+        """
+        :param owner: the component owning the buffer, notified of writes through the view that change its values
+        """
+        self.buffer = buffer
+        self.offset = offset
+        self.shape = shape
+        self.strides = strides
+        self.boolean = boolean
+        self.owner = owner
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _locate(self, index):
+        if not isinstance(index, tuple):
+            index = (index,)
+        if len(index) > len(self.shape):
+            raise IndexError(f'Too many indices for a view with {len(self.shape)} dimensions')
+
+        offset = self.offset
+        shape = []
+        strides = []
+        for dim, (n, stride) in enumerate(zip(self.shape, self.strides)):
+            i = index[dim] if dim < len(index) else slice(None)
+            if isinstance(i, slice):
+                start, stop, step = i.indices(n)
+                offset += start * stride
+                shape.append(len(range(start, stop, step)))
+                strides.append(stride * step)
+            else:
+                if i < 0:
+                    i += n
+                if not 0 <= i < n:
+                    raise IndexError('Matrix index out of range')
+                offset += i * stride
+        return offset, tuple(shape), tuple(strides)
+
+    def __getitem__(self, index):
+        offset, shape, strides = self._locate(index)
+        if not shape:
+            value = self.buffer[offset]
+            return bool(value) if self.boolean else value
+        return StridedView(self.buffer, offset, shape, strides, self.boolean, self.owner)
+
+    def _tracked(self) -> bool:
+        return self.owner is not None and self.owner._change_log is not None
+
+    def _check(self, values):
+        if self.owner is not None and self.owner._validate:
+            self.owner._check_values(values)
+
+    def __setitem__(self, index, value):
+        offset, shape, strides = self._locate(index)
+        if shape:
+            StridedView(self.buffer, offset, shape, strides, self.boolean, self.owner).set_value(value)
+            return
+        self._check((value,))
+        if self._tracked():
+            old = self.buffer[offset]
+            self.buffer[offset] = value
+            if self.buffer[offset] != old:
+                self.owner._mark_changed()
+        else:
+            self.buffer[offset] = value
+
+    def _span(self) -> slice:
+        # Slice of the buffer covering the items of a one-dimensional view
+        n, stride = self.shape[0], self.strides[0]
+        stop = self.offset + n * stride
+        return slice(self.offset, stop if stop >= 0 else None, stride)
+
+    def tolist(self) -> list:
+        if len(self.shape) == 1:
+            values = self.buffer[self._span()].tolist()
+            return [bool(v) for v in values] if self.boolean else values
+        return [self[i].tolist() for i in range(self.shape[0])]
+
+    def get_value(self) -> list:
+        return self.tolist()
+
+    def set_value(self, values):
+        """
+        Sets the values of the view from nested sequences matching its shape
+        """
+        if len(values) != self.shape[0]:
+            raise ValueError(f'Expected {self.shape[0]} values, got {len(values)}')
+        if len(self.shape) == 1:
+            span = self._span()
+            values = array(self.buffer.typecode, values)
+            self._check(values)
+            if self._tracked():
+                old = self.buffer[span]
+                self.buffer[span] = values
+                if self.buffer[span] != old:
+                    self.owner._mark_changed()
+            else:
+                self.buffer[span] = values
+        else:
+            for i, v in enumerate(values):
+                self[i].set_value(v)
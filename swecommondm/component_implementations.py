@@ -1,8 +1,38 @@
-import copy
+import json
+import math
+import numbers
 import time
+from array import array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain
 
-from swecommondm import AllowedTokens, AllowedValues, DataComponentImpl, SWEDataTypes
+from swecommondm import AllowedTokens, AllowedValues, ComponentInstance, DataComponentImpl, SWEDataTypes, \
+    _json_default, _SchemaAttribute
+from swecommondm.buffers import BUFFER_TYPECODES, BufferLayout, BufferedComponentList, StridedView, array_interface, \
+    c_strides, column_typecode, copy_column, join_path, new_column
+from swecommondm.encoding import AbstractEncoding, encoding_from_dict
+from swecommondm.iso8601 import format_iso8601, parse_iso8601, parse_time_number, time_unit_scale
+
+
+def _copy_child(child, compact: bool):
+    """
+    Copies a child component along with its value, as a compact instance of it if `compact` is set
+    """
+    if compact and not isinstance(child, ComponentInstance):
+        if type(child).create_instance is DataComponentImpl.create_instance:
+            # Scalar children share a copy of their schema rather than the child itself, see _snapshot_instance
+            return child._snapshot_instance()
+        return child.create_instance()
+    return child.clone()
+
+
+def _component_class(component) -> type:
+    """
+    The class of a component, or of the template of a ComponentInstance
+    """
+    return type(component.get_template()) if isinstance(component, ComponentInstance) else type(component)
 
 
 @dataclass(kw_only=True)
@@ -26,6 +56,8 @@ class BooleanComponent(DataComponentImpl):
         return self.value
 
     def set_value(self, value):
+        if self._change_log is not None:
+            self._log_value(value)
         self.value = value
 
 
@@ -43,12 +75,20 @@ class TextComponent(DataComponentImpl):
         value: The latest value of the component
         swe_type: SWEDataTypes.TEXT
     """
-    constraint: AllowedTokens = None
+    constraint: AllowedTokens = _SchemaAttribute(None, child=True)
     value: str = None
     swe_type: SWEDataTypes = SWEDataTypes.TEXT
+    _dictionary_encoded: bool = field(default=False, init=False, repr=False, compare=False)
+
+    def enable_dictionary_encoding(self, enabled: bool = True):
+        """
+        Stores the values of this component in array and stream buffers as codes into a table of distinct values, as is
+        always done for Categories. Meant for low-cardinality text, it applies to buffers created afterwards.
+        """
+        self._dictionary_encoded = enabled
 
-    def datastructure_to_dict(self):
-        schema_dict = super().datastructure_to_dict()
+    def _schema_to_dict(self):
+        schema_dict = super()._schema_to_dict()
 
         if self.constraint is not None:
             schema_dict['constraint'] = self.constraint.datastructure_to_dict()
@@ -59,6 +99,10 @@ class TextComponent(DataComponentImpl):
         return self.value
 
     def set_value(self, value):
+        if self._validate:
+            self.check_value(value)
+        if self._change_log is not None:
+            self._log_value(value)
         self.value = value
 
 
@@ -79,8 +123,8 @@ class CategoryComponent(DataComponentImpl):
         value: The latest value of the component
         swe_type: SWEDataTypes.CATEGORY
     """
-    codespace: dict = None
-    constraint: AllowedTokens = None
+    codespace: dict = _SchemaAttribute(None)
+    constraint: AllowedTokens = _SchemaAttribute(None, child=True)
     swe_type: SWEDataTypes = SWEDataTypes.CATEGORY
     value: str = None
 
@@ -88,12 +132,16 @@ class CategoryComponent(DataComponentImpl):
         self.constraint = allowed_values
 
     def add_allowed_value(self, allowed_value: str):
-        self.constraint.add_allowed_value(allowed_value)
+        self.constraint.add_value(allowed_value)
 
     def get_value(self):
         return self.value
 
     def set_value(self, value):
+        if self._validate:
+            self.check_value(value)
+        if self._change_log is not None:
+            self._log_value(value)
         self.value = value
 
 
@@ -105,11 +153,11 @@ class CountComponent(DataComponentImpl):
     """
 
     swe_type: SWEDataTypes = SWEDataTypes.COUNT
-    constraint: AllowedValues = None
+    constraint: AllowedValues = _SchemaAttribute(None, child=True)
     value: int = None
 
-    def datastructure_to_dict(self):
-        schema_dict = super().datastructure_to_dict()
+    def _schema_to_dict(self):
+        schema_dict = super()._schema_to_dict()
 
         if self.constraint is not None:
             schema_dict['constraint'] = self.constraint.datastructure_to_dict()
@@ -120,12 +168,16 @@ class CountComponent(DataComponentImpl):
         self.constraint = allowed_values
 
     def add_allowed_value(self, allowed_value: int):
-        self.constraint.add_allowed_value(allowed_value)
+        self.constraint.add_value(allowed_value)
 
     def get_value(self):
         return self.value
 
     def set_value(self, value):
+        if self._validate:
+            self.check_value(value)
+        if self._change_log is not None:
+            self._log_value(value)
         self.value = value
 
 
@@ -135,13 +187,13 @@ class QuantityComponent(DataComponentImpl):
     The “Quantity” class is used to specify a component with a continuous numerical
     representation
     """
-    uom: str = None
-    constraint: AllowedValues = None
+    uom: str = _SchemaAttribute(None)
+    constraint: AllowedValues = _SchemaAttribute(None, child=True)
     value: float = None
     swe_type: SWEDataTypes = SWEDataTypes.QUANTITY
 
-    def datastructure_to_dict(self):
-        schema_dict = super().datastructure_to_dict()
+    def _schema_to_dict(self):
+        schema_dict = super()._schema_to_dict()
 
         if self.uom is not None:
             schema_dict['uom'] = {'code': self.uom}
@@ -155,12 +207,16 @@ class QuantityComponent(DataComponentImpl):
         self.constraint = allowed_values
 
     def add_allowed_value(self, allowed_value: int):
-        self.constraint.add_allowed_value(allowed_value)
+        self.constraint.add_value(allowed_value)
 
     def get_value(self):
         return self.value
 
     def set_value(self, value):
+        if self._validate:
+            self.check_value(value)
+        if self._change_log is not None:
+            self._log_value(value)
         self.value = value
 
 
@@ -170,18 +226,40 @@ class TimeComponent(DataComponentImpl):
     The “Time” class is used to specify a component with a date-time representation and
     whose value is projected along the axis of a temporal reference frame. This class is also
     necessary to specify that a time value is expressed in a calendar system.
+
+    Values are stored as integer nanoseconds since the Unix epoch, also in array and stream buffers, so that high-rate
+    timestamps keep their precision. ISO-8601 strings are converted when set, and get_iso_value formats the value back.
+    Text encodings write values as ISO-8601 date-times, or as numbers when the uom is a unit of time such as "s".
     """
 
-    definition: str = 'http://www.opengis.net/def/property/OGC/0/SamplingTime'
-    reference_time: int = None
-    local_frame: int = time.gmtime(0)
-    uom: str = 'http://www.opengis.net/def/uom/ISO-8601/0/Gregorian'
-    constraint: AllowedValues = None
-    value: float = None
+    definition: str = _SchemaAttribute('http://www.opengis.net/def/property/OGC/0/SamplingTime')
+    reference_time: int = _SchemaAttribute(None)
+    local_frame: int = _SchemaAttribute(time.gmtime(0))
+    uom: str = _SchemaAttribute('http://www.opengis.net/def/uom/ISO-8601/0/Gregorian')
+    constraint: AllowedValues = _SchemaAttribute(None, child=True)
+    value: int = None
     swe_type: SWEDataTypes = SWEDataTypes.TIME
 
-    def datastructure_to_dict(self):
-        schema_dict = super().datastructure_to_dict()
+    def __post_init__(self):
+        self.value = self._coerce_value(self.value)
+
+    @staticmethod
+    def _coerce_value(value):
+        """
+        Converts ISO-8601 strings to epoch nanoseconds. Other values must already be integers, as in array and stream
+        buffers: a float such as epoch seconds would otherwise be taken for nanoseconds.
+        """
+        if value is None or value.__class__ is int:
+            return value
+        if isinstance(value, str):
+            return parse_iso8601(value)
+        if isinstance(value, numbers.Integral):
+            return int(value)
+        raise TypeError(f'Time values are integer nanoseconds since the epoch or ISO-8601 strings, not '
+                        f'{type(value).__name__} {value!r}. Convert epoch seconds with round(seconds * NANOSECONDS).')
+
+    def _schema_to_dict(self):
+        schema_dict = super()._schema_to_dict()
 
         if self.uom is not None:
             schema_dict['uom'] = {'code': self.uom}
@@ -194,7 +272,26 @@ class TimeComponent(DataComponentImpl):
     def get_value(self):
         return self.value
 
+    def check_value(self, value):
+        if isinstance(value, str):
+            value = parse_iso8601(value)
+        super().check_value(value)
+
+    def get_iso_value(self) -> str:
+        """
+        Returns the value as a UTC ISO-8601 date-time, or None if it is not set
+        """
+        return format_iso8601(self.value) if self.value is not None else None
+
     def set_value(self, value):
+        """
+        :param value: integer nanoseconds since the epoch, or an ISO-8601 date-time
+        """
+        value = self._coerce_value(value)
+        if self._validate:
+            self.check_value(value)
+        if self._change_log is not None:
+            self._log_value(value)
         self.value = value
 
 
@@ -204,6 +301,8 @@ class TimeComponent(DataComponentImpl):
 class DataRecordComponent(DataComponentImpl):
     swe_type: SWEDataTypes = SWEDataTypes.DATA_RECORD
     fields: list[DataComponentImpl] = field(default_factory=list)
+    _field_index: dict = field(default=None, init=False, repr=False, compare=False)
+    _flat_field_map: tuple = field(default=None, init=False, repr=False, compare=False)
 
     # def __init__(self, name, label, definition, description=None):
     #     self.name = name
@@ -213,17 +312,35 @@ class DataRecordComponent(DataComponentImpl):
     #     self.type = SWEDataTypes.DATA_RECORD
     #     self.fields = []
 
+    def __post_init__(self):
+        for field in self.fields:
+            self._adopt(field)
+
     def add_field(self, field):
-        if issubclass(type(field), DataComponentImpl):
+        if isinstance(field, (DataComponentImpl, ComponentInstance)):
             self.fields.append(field)
+            self._adopt(field)
+            if self._validate:
+                field.enable_validation()
+            if self._change_log is not None:
+                field._attach_change_log(self._change_log)
+            self._schema_changed()
             return field
 
-    def datastructure_to_dict(self):
-        schema_dict = super().datastructure_to_dict()
+    def _children(self):
+        return self.fields
+
+    def _invalidate_schema(self):
+        super()._invalidate_schema()
+        self._field_index = None
+        self._flat_field_map = None
+
+    def _schema_to_dict(self):
+        schema_dict = super()._schema_to_dict()
 
         field_dicts = []
         for field in self.fields:
-            field_dicts.append(field.datastructure_to_dict())
+            field_dicts.append(field._get_schema_dict())
 
         schema_dict['fields'] = field_dicts
 
@@ -232,45 +349,123 @@ class DataRecordComponent(DataComponentImpl):
     def get_fields(self):
         return self.fields
 
+    def enable_validation(self, enabled: bool = True):
+        super().enable_validation(enabled)
+        for field in self.fields:
+            field.enable_validation(enabled)
+
+    def _attach_change_log(self, change_log):
+        super()._attach_change_log(change_log)
+        for field in self.fields:
+            field._attach_change_log(change_log)
+
+    def _flat_segments(self, path: str) -> list:
+        return [segment for field in self.fields for segment in field._flat_segments(join_path(path, field.name))]
+
+    def _clone_children(self, clone, compact: bool):
+        clone_dict = clone.__dict__
+        clone_dict['fields'] = [_copy_child(field, compact) for field in self.fields]
+        clone_dict['_field_index'] = None
+        clone_dict['_flat_field_map'] = None
+
+    def create_instance(self):
+        return self._clone(compact=True)
+
     def get_num_fields(self):
         return len(self.fields)
 
+    def _get_field_index(self):
+        if self._field_index is None:
+            self._field_index = {field.name: field for field in self.fields}
+        return self._field_index
+
+    def get_field(self, path: str):
+        """
+        Returns the field at the given path. Nested fields are addressed with dotted paths such as "location.lat", where
+        each segment is a field name, or an axis id for the coordinates of a Vector.
+        :param path: field name or dotted path
+        :return: the field, or None if there is no field at that path
+        """
+        index = self._get_field_index()
+        field = index.get(path)
+        if field is not None or '.' not in path:
+            return field
+
+        name, rest = path.split('.', 1)
+        field = index.get(name)
+        if isinstance(field, DataRecordComponent):
+            return field.get_field(rest)
+        if isinstance(field, VectorComponent):
+            return field.coordinates.get(rest)
+        return None
+
     def flat_id_to_field_map(self):
         """
-        Returns a dictionary mapping the UUID of each field to the field itself.
+        Returns a dictionary mapping the UUID of each field to the field itself. The map is cached until the schema of
+        this record or of one of its nested records changes, and should not be modified.
         :return:
         """
+        cached = self._flat_field_map
+        if cached is not None and all(r.flat_id_to_field_map() is m for (r, m) in cached[1]):
+            return cached[0]
+
         field_map = {}
+        nested_maps = []
         for f in self.fields:
             if isinstance(f, DataRecordComponent):
-                field_map.update(f.flat_id_to_field_map())
+                nested_map = f.flat_id_to_field_map()
+                nested_maps.append((f, nested_map))
+                field_map.update(nested_map)
             else:
                 field_map[f.get_uuid()] = f
+        self._flat_field_map = (field_map, nested_maps)
         return field_map
 
     def name_to_field_map(self):
-        return {field.name: field for field in self.fields}
+        """
+        Returns a dictionary mapping the name of each field to the field itself. The map is cached until the schema of
+        the record changes, and should not be modified.
+        :return:
+        """
+        return self._get_field_index()
 
     def get_value(self):
-        return {name: value for name, value in zip([field.name for field in self.fields],
-                                                   [field.get_value() for field in self.fields])}
+        return {name: field.get_value() for (name, field) in self._get_field_index().items()}
+
+    def _resolve_fields(self, value) -> list:
+        index = self._get_field_index()
+        resolved = []
+        for k, v in value.items():
+            field = index.get(k)
+            if field is None and '.' in k:
+                field = self.get_field(k)
+            if field is not None:
+                resolved.append((field, v))
+        return resolved
+
+    def check_value(self, value):
+        for field, v in self._resolve_fields(value):
+            field.check_value(v)
 
     def set_value(self, value):
         """
-
-        :param value: dictionary of field names to values
+        Sets the values of the fields. With validation enabled, every value is checked before any field is set, so an
+        invalid value leaves the record unchanged.
+        :param value: dictionary of field names, or dotted paths to nested fields, to values
         :return:
         """
-        for k, v in value.items():
-            for field in self.fields:
-                if field.name == k:
-                    field.set_value(v)
+        resolved = self._resolve_fields(value)
+        if self._validate:
+            for field, v in resolved:
+                field.check_value(v)
+        for field, v in resolved:
+            field.set_value(v)
 
 
 class VectorComponent(DataComponentImpl):
-    referenceFrame: str
-    localFrame: str
-    coordinates: dict[DataComponentImpl]
+    referenceFrame: str = _SchemaAttribute()
+    localFrame: str = _SchemaAttribute()
+    coordinates: dict[DataComponentImpl] = _SchemaAttribute()
     swe_type = SWEDataTypes.VECTOR
 
     def __init__(self, name, label, definition, reference_frame, local_frame, description=None):
@@ -284,9 +479,39 @@ class VectorComponent(DataComponentImpl):
 
     def add_coord(self, axis_id: str, coordinate):
         self.coordinates[axis_id] = coordinate
-
-    def datastructure_to_dict(self):
-        schema_dict = super().datastructure_to_dict()
+        self._adopt(coordinate)
+        if self._validate:
+            coordinate.enable_validation()
+        if self._change_log is not None:
+            coordinate._attach_change_log(self._change_log)
+        self._schema_changed()
+
+    def _children(self):
+        return self.coordinates.values()
+
+    def enable_validation(self, enabled: bool = True):
+        super().enable_validation(enabled)
+        for coord in self.coordinates.values():
+            coord.enable_validation(enabled)
+
+    def _attach_change_log(self, change_log):
+        super()._attach_change_log(change_log)
+        for coord in self.coordinates.values():
+            coord._attach_change_log(change_log)
+
+    def _flat_segments(self, path: str) -> list:
+        return [segment for (axis, coord) in self.coordinates.items()
+                for segment in coord._flat_segments(join_path(path, axis))]
+
+    def _clone_children(self, clone, compact: bool):
+        clone.__dict__['coordinates'] = {axis: _copy_child(coord, compact)
+                                         for (axis, coord) in self.coordinates.items()}
+
+    def create_instance(self):
+        return self._clone(compact=True)
+
+    def _schema_to_dict(self):
+        schema_dict = super()._schema_to_dict()
         schema_dict['referenceFrame'] = self.referenceFrame
         schema_dict['localFrame'] = self.localFrame
 
@@ -308,18 +533,45 @@ class VectorComponent(DataComponentImpl):
     def get_value(self):
         return {axis: coord.get_value() for (axis, coord) in self.coordinates.items()}
 
+    def get_coordinates(self) -> tuple:
+        """
+        Returns the value as a tuple of coordinates in axis order, e.g. (lat, lon, alt)
+        """
+        return tuple(coord.get_value() for coord in self.coordinates.values())
+
+    def _pair_coordinates(self, value) -> list:
+        if isinstance(value, dict):
+            return [(coord, value[axis]) for (axis, coord) in self.coordinates.items()]
+        if len(value) != len(self.coordinates):
+            raise ValueError(f'{self.name} has {len(self.coordinates)} axes, got {len(value)} coordinates')
+        return list(zip(self.coordinates.values(), value))
+
+    def check_value(self, value):
+        for coord, v in self._pair_coordinates(value):
+            coord.check_value(v)
+
     def set_value(self, value):
-        for axis, coord in self.coordinates.items():
-            coord.set_value(value[axis])
+        """
+        :param value: dictionary of axis ids to coordinates, or a sequence of coordinates in axis order
+        """
+        pairs = self._pair_coordinates(value)
+        if self._validate:
+            for coord, v in pairs:
+                coord.check_value(v)
+        for coord, v in pairs:
+            coord.set_value(v)
 
 
 # Block Components
 class DataArrayComponent(DataComponentImpl):
     swe_type = SWEDataTypes.DATA_ARRAY
-    element_type: DataComponentImpl
-    element_count: CountComponent  # This should be able to be set to another output that is Type=COUNT
+    element_type: DataComponentImpl = _SchemaAttribute(child=True)
+    # This should be able to be set to another output that is Type=COUNT
+    element_count: CountComponent = _SchemaAttribute(child=True)
     components: list[DataComponentImpl]
     values: list
+    _buffer_layout: BufferLayout = None
+    _columns: dict = None
 
     def __init__(self, name, label, definition, description=None):
         """
@@ -340,30 +592,237 @@ class DataArrayComponent(DataComponentImpl):
                                             value=0)
 
     def add_component(self, new_comp):
-        if self.element_count.value is 0:
-            self.components.append(new_comp)
+        if self._buffer_layout is not None:
+            if not issubclass(_component_class(new_comp), _component_class(self.element_type)):
+                raise TypeError('Component type does not match existing components')
+            if self._validate:
+                self.element_type.check_value(new_comp.get_value())
+            element = self._buffer_layout.element
+            index = self.element_count.value
+            element.extend(self._columns)
+            element.write(self._columns, index, new_comp.get_value(), skip_none=True)
             self.element_count.value += 1
-        elif isinstance(new_comp, type(self.components[0])):
+            self._buffer_layout = BufferLayout(self)
+            if self._change_log is not None:
+                self._change_log.values[(self.get_uuid(), index)] = element.read(self._columns, index)
+        elif self.element_count.value == 0 \
+                or issubclass(_component_class(new_comp), _component_class(self.components[0])):
             self.components.append(new_comp)
+            self._adopt(new_comp)
+            if self._validate:
+                new_comp.enable_validation()
             self.element_count.value += 1
+            if self._change_log is not None:
+                new_comp._attach_change_log(self._change_log)
+                self._change_log.values[new_comp.get_uuid()] = new_comp.get_value()
         else:
             raise TypeError('Component type does not match existing components')
+        self._schema_changed()
 
-    def set_component_template_and_size(self, size, comp_template):
+    def set_component_template_and_size(self, size, comp_template, buffered=False, compact=False, storage=None):
         """
         Set the component template and size of the array.
-        WARNING: This can take a long time for large and complex templates/sizes.
+        WARNING: This can take a long time for large and complex templates/sizes unless `buffered` or `compact` is set.
         :param size:
         :param comp_template:
+        :param buffered: when True, only the template is kept and element values are stored in contiguous columns, one
+            per scalar leaf of the template. `components` then holds lightweight views over those columns.
+        :param compact: when True, elements are created with the template's create_instance rather than cloned, so
+            scalar elements, and the scalar leaves of composite elements, are ComponentInstances that only store their
+            value and share the template's metadata.
+        :param storage: a column backend such as swecommondm.storage.MappedColumns holding the columns of a buffered
+            array, e.g. in a memory-mapped file. `size` may then be None to use the number of elements already stored.
         :return:
         """
         self.element_type = comp_template
-        for i in range(size):
-            # TODO: Instead of copying the template, consider spoofing the output to appear as the template dictates,
-            #  but use a basic datastructure
-            self.add_component(copy.deepcopy(comp_template))
+        if buffered or storage is not None:
+            columns = None
+            if storage is not None:
+                columns = storage.open(BufferLayout(comp_template), size)
+                size = storage.count
+            self.element_count.value = size
+            self._buffer_layout = BufferLayout(self)
+            self._columns = columns if columns is not None else self._buffer_layout.allocate()
+            self.components = BufferedComponentList(self)
+            self._schema_changed()
+            return
+        # Elements share the template's schema attributes and only get their own values
+        if compact:
+            elements = [comp_template.create_instance() for _ in range(size)]
+        else:
+            elements = [comp_template.clone() for _ in range(size)]
+        if elements and self.components \
+                and not issubclass(_component_class(elements[0]), _component_class(self.components[0])):
+            raise TypeError('Component type does not match existing components')
+        for element in elements:
+            self._adopt(element)
+            if self._validate:
+                element.enable_validation()
+        if self._change_log is not None:
+            for element in elements:
+                element._attach_change_log(self._change_log)
+        self.components.extend(elements)
+        self.element_count.value += size
+        self._schema_changed()
+
+    def is_buffered(self):
+        return self._buffer_layout is not None
+
+    def _tracked_elements(self):
+        # The element values of a buffered array before a write, only read when changes are tracked
+        return self._buffer_layout.read(self._columns, 0) if self._change_log is not None else None
+
+    def _log_elements(self, before: list):
+        """
+        Logs the elements of a buffered array whose values differ from `before`, keyed by the array's UUID and their
+        index, so a write logs only the elements it changed
+        """
+        log = self._change_log
+        uuid_ = self.get_uuid()
+        for i, (old, new) in enumerate(zip(before, self._buffer_layout.read(self._columns, 0))):
+            if old != new:
+                log.log((uuid_, i), old, new)
+
+    def _log_element(self, index: int, old):
+        self._change_log.log((self.get_uuid(), index), old, self._buffer_layout.element.read(self._columns, index))
+
+    def enable_validation(self, enabled: bool = True):
+        """
+        Turns checking of new values against the constraints of the element template on or off. Buffered arrays check
+        the values passed to set_value, set_columns, set_coordinates and element views before storing any of them.
+        """
+        super().enable_validation(enabled)
+        if self._buffer_layout is None:
+            for comp in self.components:
+                comp.enable_validation(enabled)
+
+    def _attach_change_log(self, change_log):
+        super()._attach_change_log(change_log)
+        if self._buffer_layout is None:
+            for comp in self.components:
+                comp._attach_change_log(change_log)
+
+    def _children(self):
+        children = [self.element_count]
+        if 'element_type' in self.__dict__:
+            children.append(self.element_type)
+        if self._buffer_layout is None:
+            children.extend(self.components)
+        return children
+
+    def _clone_children(self, clone, compact: bool):
+        clone_dict = clone.__dict__
+        clone_dict['element_count'] = self.element_count.clone()
+        if 'element_type' in self.__dict__:
+            clone_dict['element_type'] = self.element_type.clone()
+        if self._buffer_layout is not None:
+            clone_dict['_buffer_layout'] = BufferLayout(clone)
+            clone_dict['_columns'] = {key: copy_column(column) for (key, column) in self._columns.items()}
+            clone_dict['components'] = BufferedComponentList(clone)
+        else:
+            clone_dict['components'] = [_copy_child(comp, compact) for comp in self.components]
+
+    def _flat_segments(self, path: str) -> list:
+        layout = self._buffer_layout
+        if layout is None:
+            return [segment for (i, comp) in enumerate(self.components)
+                    for segment in comp._flat_segments(join_path(path, str(i)))]
+
+        # The values of a buffered array form a single segment read from its columns
+        unflatten = layout.compile_unflatten()
+        leaves = layout.leaves
+        booleans = [leaf.swe_type is SWEDataTypes.BOOLEAN for (_, leaf, _) in leaves]
+        if len(leaves) == 1 or all(width == layout.size for (_, _, width) in leaves):
+            # Element order interleaves the columns, one value of each per element
+            keys = [key for (key, _, _) in leaves]
+            stride = len(keys)
+
+            def get():
+                columns = [map(bool, self._columns[key]) if boolean else self._columns[key]
+                           for (key, boolean) in zip(keys, booleans)]
+                return columns[0] if stride == 1 else chain.from_iterable(zip(*columns))
+
+            def set_(values):
+                parts = {key: values[i::stride] if stride > 1 else values for (i, key) in enumerate(keys)}
+                if self._validate:
+                    self._check_columns(parts)
+                before = self._tracked_elements()
+                for key, part in parts.items():
+                    column = self._columns[key]
+                    typecode = column_typecode(column)
+                    column[:] = array(typecode, part) if typecode is not None else list(part)
+                if before is not None:
+                    self._log_elements(before)
+        else:
+            flatten = layout.compile_flatten()
+
+            def get():
+                out = []
+                flatten(self.get_value(), out)
+                return out
+
+            def set_(values):
+                self.set_value(unflatten(values, 0)[0])
+
+        swe_type = leaves[0][1].swe_type if len(leaves) == 1 else SWEDataTypes.DATA_ARRAY
+        return [(path, swe_type, layout.scalar_count(), get, set_)]
+
+    def _find_invalid(self, layout: BufferLayout, columns, count: int) -> dict[str, list[int]]:
+        invalid = {}
+        for (key, leaf, width) in layout.element.leaves:
+            constraint = getattr(leaf, 'constraint', None)
+            if constraint is not None:
+                column = columns[key]
+                indices = constraint.find_invalid(column if len(column) == count * width else column[:count * width])
+                if indices:
+                    invalid[key] = indices
+        return invalid
+
+    def _check_columns(self, columns: dict):
+        """
+        Raises a ValueError for the first value of the given leaf columns that is not allowed by its leaf's constraint
+        """
+        layout = self._buffer_layout if self._buffer_layout is not None else BufferLayout(self)
+        for (key, leaf, _) in layout.element.leaves:
+            constraint = getattr(leaf, 'constraint', None)
+            values = columns.get(key)
+            if constraint is not None and values is not None:
+                if leaf.swe_type is SWEDataTypes.TIME:
+                    values = [parse_iso8601(v) if isinstance(v, str) else v for v in values]
+                indices = constraint.find_invalid(values)
+                if indices:
+                    raise ValueError(f'{values[indices[0]]!r} is not an allowed value for "{key}" of {self.name}')
+
+    def check_value(self, value):
+        """
+        Raises a ValueError if any element value is not allowed by the constraints of the element template. The values
+        of scalar elements are checked as a single column.
+        """
+        layout = self._buffer_layout
+        if layout is not None:
+            if layout.element.key is not None:
+                self._check_columns({layout.element.key: value})
+            else:
+                check_element = self.element_type.check_value
+                for v in value:
+                    check_element(v)
+        else:
+            for comp, v in zip(self.components, value):
+                comp.check_value(v)
+
+    def find_invalid_values(self) -> dict[str, list[int]]:
+        """
+        Checks the values of all elements against the constraints of the element template, one column at a time
+        :return: dictionary of leaf paths to the indices within their column (see get_columns) of values that are not
+            allowed
+        """
+        layout = self._buffer_layout if self._buffer_layout is not None else BufferLayout(self)
+        columns = self._columns if self._buffer_layout is not None else self.get_columns()
+        return self._find_invalid(layout, columns, self.element_count.value)
 
     def get_value(self):
+        if self._buffer_layout is not None:
+            return self._buffer_layout.read(self._columns, 0)
         new_list = [value for value in map(lambda x: x.get_value(), self.components)]
         return new_list
 
@@ -373,32 +832,723 @@ class DataArrayComponent(DataComponentImpl):
         be complex if the DataArray contains nested composite types (eq. DataRecords, DataArrays, or Vectors).
         :param values:
         """
-        if type(self.element_type) in [DataRecordComponent, DataArrayComponent, VectorComponent]:
-            for i in range(len(values)):
-                self.components[i].set_value(values[i])
+        if self._validate:
+            self.check_value(values)
+        if self._buffer_layout is not None:
+            before = self._tracked_elements()
+            self._buffer_layout.write(self._columns, 0, values)
+            if before is not None:
+                self._log_elements(before)
         else:
             for i in range(len(values)):
                 self.components[i].set_value(values[i])
 
-    def datastructure_to_dict(self):
-        schema_dict = super().datastructure_to_dict()
+    def get_columns(self) -> dict:
+        """
+        Returns the values of the elements column by column: one sequence per scalar leaf of the element template, keyed
+        by its dotted path within the element ('' for an array of scalars). A leaf inside a nested array holds the
+        values of all of its elements, element after element. Numeric columns are array.array objects, Category and
+        dictionary-encoded Text columns DictionaryColumns, the others lists. Buffered arrays return copies of their
+        columns without visiting each element.
+        """
+        if self._buffer_layout is not None:
+            return {key: copy_column(column) for (key, column) in self._columns.items()}
+        layout = BufferLayout(self)
+        columns = layout.allocate()
+        layout.write(columns, 0, self.get_value())
+        return columns
+
+    def set_columns(self, columns):
+        """
+        Sets the values of the elements column by column, the inverse of get_columns. Each column is assigned in bulk
+        for buffered arrays. Leaves without a column keep their values.
+        :param columns: dictionary of leaf paths to sequences of values (lists, array.array or NumPy arrays), or a NumPy
+            structured array whose field names are leaf paths
+        """
+        names = getattr(getattr(columns, 'dtype', None), 'names', None)
+        if names is not None:
+            columns = {name: columns[name] for name in names}
+
+        layout = self._buffer_layout if self._buffer_layout is not None else BufferLayout(self)
+        target = self._columns if self._buffer_layout is not None else self.get_columns()
+        # Every column is converted and checked before any is assigned
+        converted = {}
+        for key, values in columns.items():
+            if key not in target:
+                raise KeyError(f'The elements of {self.name} have no leaf "{key}"')
+            column = target[key]
+            typecode = column_typecode(column)
+            if hasattr(values, 'ravel'):
+                values = values.ravel()
+                if typecode is not None and values.dtype.kind in 'biuf':
+                    # Converted by NumPy and copied as bytes rather than one Python number at a time
+                    values = values.astype(typecode, copy=False).tobytes()
+                    if len(values) != len(column) * column.itemsize:
+                        raise ValueError(f'Column "{key}" needs {len(column)} values, '
+                                         f'got {len(values) // column.itemsize}')
+                    converted[key] = array(typecode, values)
+                    continue
+                values = values.tolist()
+            if len(values) != len(column):
+                raise ValueError(f'Column "{key}" needs {len(column)} values, got {len(values)}')
+            converted[key] = array(typecode, values) if typecode is not None else list(values)
+        if self._validate:
+            self._check_columns(converted)
+        before = self._tracked_elements() if self._buffer_layout is not None else None
+        for key, values in converted.items():
+            target[key][:] = values
+
+        if self._buffer_layout is None:
+            self.set_value(layout.read(target, 0))
+        elif before is not None:
+            self._log_elements(before)
+
+    def _coordinate_keys(self, path: str = None) -> list[str]:
+        if self._buffer_layout is None:
+            raise TypeError(f'{self.name} is not buffered, its coordinates are not stored in columns')
+        vector = self._buffer_layout.element
+        for name in path.split('.') if path else ():
+            vector = vector.children.get(name)
+            if vector is None:
+                raise KeyError(f'The elements of {self.name} have no field "{path}"')
+        if vector.swe_type is not SWEDataTypes.VECTOR \
+                or any(axis.typecode is None for axis in vector.children.values()):
+            what = f'"{path}" fields' if path else 'elements'
+            raise ValueError(f'The {what} of {self.name} are not Vectors of numeric coordinates')
+        return [axis.key for axis in vector.children.values()]
+
+    def get_coordinates(self, start: int = 0, stop: int = None, path: str = None) -> list[tuple]:
+        """
+        Returns the coordinates of a range of the elements of a buffered array of Vectors as tuples in axis order, e.g.
+        [(lat, lon, alt), ...], zipping the axis columns instead of building a dictionary per element
+        :param path: dotted field path of the Vector within each element, e.g. 'location' for an array of records with
+            a location field; None if the elements are Vectors themselves
+        """
+        return list(zip(*(self._columns[key][start:stop] for key in self._coordinate_keys(path))))
+
+    def set_coordinates(self, coordinates, path: str = None):
+        """
+        Sets the coordinates of all elements of a buffered array of Vectors, one axis column at a time
+        :param coordinates: a NumPy array of shape (element count, number of axes), or a sequence of coordinate tuples
+            in axis order
+        :param path: dotted field path of the Vector within each element, as for get_coordinates
+        """
+        keys = self._coordinate_keys(path)
+        if hasattr(coordinates, 'ndim'):
+            if coordinates.ndim != 2 or coordinates.shape[1] != len(keys):
+                raise ValueError(f'Expected an array of shape (N, {len(keys)}), got {coordinates.shape}')
+            self.set_columns({key: coordinates[:, i] for (i, key) in enumerate(keys)})
+            return
+        if any(len(point) != len(keys) for point in coordinates):
+            raise ValueError(f'The elements of {self.name} have {len(keys)} axes')
+        axes = list(zip(*coordinates)) or [()] * len(keys)
+        self.set_columns(dict(zip(keys, axes)))
+
+    def to_coordinate_array(self, path: str = None):
+        """
+        Returns the coordinates of a buffered array of Vectors as a NumPy array of shape (element count, number of
+        axes), stacking the axis columns. Requires NumPy.
+        :param path: dotted field path of the Vector within each element, as for get_coordinates
+        """
+        import numpy as np
+
+        columns = [self._columns[key] for key in self._coordinate_keys(path)]
+        return np.column_stack([np.frombuffer(column, dtype=column_typecode(column)) for column in columns])
+
+    def _numeric_column(self, key: str = None):
+        if self._buffer_layout is None:
+            raise TypeError(f'{self.name} is not buffered, its values are not stored in a contiguous buffer')
+        if key is None:
+            leaves = self._buffer_layout.leaves
+            if len(leaves) != 1:
+                raise ValueError(f'The elements of {self.name} have several leaves, one must be chosen')
+            key = leaves[0][0]
+        column = self._columns.get(key)
+        if column_typecode(column) is None:
+            raise ValueError(f'Leaf "{key}" of {self.name} is not a Boolean, Count, Quantity or Time component')
+        return key, column, self._buffer_layout.leaf_shape(key)
+
+    def get_buffer(self, key: str = None) -> memoryview:
+        """
+        Returns a memoryview of a numeric column of a buffered array without copying it. The view is shaped by the
+        array's size followed by the sizes of any arrays nested in its elements, e.g. (1920, 1080). The array cannot be
+        resized while the view is in use.
+        :param key: the path of the leaf (see get_columns), only needed when the elements have several scalar leaves
+        """
+        key, column, shape = self._numeric_column(key)
+        return memoryview(column).cast('B').cast(column_typecode(column), shape)
+
+    @property
+    def __array_interface__(self):
+        """
+        Lets NumPy wrap the values of a buffered array whose elements have a single numeric leaf without copying them,
+        e.g. ``numpy.asarray(data_array)``
+        """
+        try:
+            key, column, shape = self._numeric_column()
+        except (TypeError, ValueError) as e:
+            raise AttributeError(str(e)) from None
+        boolean = self._buffer_layout.leaves[0][1].swe_type is SWEDataTypes.BOOLEAN
+        return array_interface(column, shape, boolean)
+
+    def to_structured_array(self):
+        """
+        Returns the values of the elements as a NumPy structured array with one field per column of get_columns.
+        Requires NumPy.
+        """
+        import numpy as np
+
+        layout = self._buffer_layout if self._buffer_layout is not None else BufferLayout(self)
+        columns = self._columns if self._buffer_layout is not None else self.get_columns()
+        count = self.element_count.value
+        dtype = []
+        for (key, leaf, width) in layout.element.leaves:
+            typecode = column_typecode(columns[key])
+            field_type = np.dtype(typecode) if typecode is not None else np.dtype(object)
+            if leaf.swe_type is SWEDataTypes.BOOLEAN:
+                field_type = np.dtype(bool)
+            dtype.append((key, field_type) if width == 1 else (key, field_type, (width,)))
+
+        structured = np.empty(count, dtype=dtype)
+        for (key, leaf, width) in layout.element.leaves:
+            column = columns[key]
+            typecode = column_typecode(column)
+            values = np.frombuffer(column, dtype=typecode) if typecode is not None else list(column)
+            structured[key] = np.reshape(values, (count, width)) if width > 1 else values
+        return structured
+
+    def _schema_to_dict(self):
+        schema_dict = super()._schema_to_dict()
 
         schema_dict['elementCount'] = {
             'type': self.element_count.swe_type.value,
             'definition': self.element_count.definition,
             'value': self.element_count.value,
         }
-        schema_dict['elementType'] = {
-            'name': self.element_type.label,
-            'type': self.element_type.swe_type.value,
-            'definition': self.element_type.definition,
-            'description': self.element_type.description,
-        }
+        schema_dict['elementType'] = self.element_type._get_schema_dict()
 
         return schema_dict
 
+    def create_instance(self):
+        return self._clone(compact=True)
+
     def get_uuid_value_map(self):
-        uuid_list = list(map(lambda comp: comp.get_uuid(), self.components))
-        value_list = list(map(lambda comp: comp.get_value(), self.components))
-        uuid_value_map = {uuid: value for (uuid, value) in zip(uuid_list, value_list)}
-        return uuid_value_map
+        if self._buffer_layout is not None:
+            # Buffered elements are views of the template and have no identity of their own
+            return {self.get_uuid(): self.get_value()}
+        return {comp.get_uuid(): comp.get_value() for comp in self.components}
+
+
+_BUFFER_FORMATS = {
+    'b': {'b', '?'},
+    'q': {'q', 'l'},
+    'd': {'d'},
+}
+"""
+    memoryview formats that can be copied byte for byte into a buffer of each typecode
+"""
+
+
+class MatrixComponent(DataComponentImpl):
+    swe_type = SWEDataTypes.MATRIX
+    element_type: DataComponentImpl = _SchemaAttribute(child=True)
+    shape: tuple[int, ...] = _SchemaAttribute()
+    strides: tuple[int, ...]
+    referenceFrame: str = _SchemaAttribute()
+    localFrame: str = _SchemaAttribute()
+
+    def __init__(self, name, label, definition, element_type, shape, reference_frame=None, local_frame=None,
+                 description=None):
+        """
+        Returns a new MatrixComponent whose values are stored in a single typed buffer in row-major order, rather than
+        as nested DataArrays with one component per cell.
+        :param name: machine name of the component
+        :param label: human-readable name of the component
+        :param definition: URI of the definition of the component
+        :param element_type: the scalar component describing each cell, a Boolean, Count, Quantity or Time
+        :param shape: the size of each dimension, e.g. (rows, columns)
+        :param reference_frame: optional frame of reference of the matrix, e.g. for rotation matrices
+        :param local_frame: optional local frame of reference
+        :param description: brief description of the component
+        """
+        if element_type.swe_type not in BUFFER_TYPECODES:
+            raise ValueError(f'Matrix elements must be Boolean, Count, Quantity or Time components, not '
+                             f'{element_type.swe_type.value}')
+        self.name = name
+        self.label = label
+        self.definition = definition
+        self.description = description
+        self.element_type = element_type
+        self.shape = tuple(shape)
+        self.strides = c_strides(self.shape)
+        self.referenceFrame = reference_frame
+        self.localFrame = local_frame
+        self._data = new_column(element_type, math.prod(self.shape))
+
+    def get_view(self) -> StridedView:
+        """
+        Returns a view of the whole matrix. Views can be indexed and sliced along every dimension, e.g.
+        ``view[2:5, 1]``, and read or write the matrix values without copying them.
+        """
+        return StridedView(self._data, 0, self.shape, self.strides, self.element_type.swe_type is SWEDataTypes.BOOLEAN,
+                           self)
+
+    def __getitem__(self, index):
+        return self.get_view()[index]
+
+    def __setitem__(self, index, value):
+        self.get_view()[index] = value
+
+    def row(self, i: int) -> StridedView:
+        return self.get_view()[i]
+
+    def column(self, j: int) -> StridedView:
+        return self.get_view()[:, j]
+
+    def get_buffer(self) -> memoryview:
+        """
+        Returns a memoryview of the values, shaped like the matrix
+        """
+        return memoryview(self._data).cast('B').cast(self._data.typecode, self.shape)
+
+    @property
+    def __array_interface__(self):
+        """
+        Lets NumPy wrap the values of the matrix without copying them, e.g. ``numpy.asarray(matrix)``
+        """
+        return array_interface(self._data, self.shape, self.element_type.swe_type is SWEDataTypes.BOOLEAN)
+
+    def get_value(self):
+        return self.get_view().tolist()
+
+    def set_value(self, value):
+        """
+        Sets all values of the matrix at once
+        :param value: nested sequences matching the shape of the matrix, a flat sequence of all values in row-major
+            order, or any object supporting the buffer protocol (array.array, NumPy arrays...) holding all values
+        """
+        if self._change_log is None and not self._validate:
+            self._assign(value)
+            return
+        before = self._data[:]
+        self._assign(value)
+        if self._validate:
+            try:
+                self._check_values(self._data)
+            except ValueError:
+                self._data[:] = before
+                raise
+        if self._change_log is not None and self._data != before:
+            self._mark_changed()
+
+    def _check_values(self, values):
+        # Raises a ValueError if any of a flat sequence of values is not allowed by the element type's constraint
+        constraint = getattr(self.element_type, 'constraint', None)
+        if constraint is not None:
+            invalid = constraint.find_invalid(values)
+            if invalid:
+                raise ValueError(f'{values[invalid[0]]!r} is not an allowed value for {self.element_type.name}')
+
+    def _assign(self, value):
+        data = self._data
+        if isinstance(value, array) and value.typecode == data.typecode:
+            if len(value) != len(data):
+                raise ValueError(f'Expected {len(data)} values, got {len(value)}')
+            data[:] = value
+            return
+
+        try:
+            view = memoryview(value)
+        except TypeError:
+            view = None
+        if view is not None:
+            if view.format.lstrip('@=') in _BUFFER_FORMATS[data.typecode] and view.itemsize == data.itemsize \
+                    and view.c_contiguous:
+                if view.nbytes != len(data) * data.itemsize:
+                    raise ValueError(f'Expected {len(data)} values, got {view.nbytes // view.itemsize}')
+                memoryview(data).cast('B')[:] = view.cast('B')
+                return
+            value = view.tolist()
+
+        flat = value
+        for _ in range(len(self.shape) - 1):
+            if len(flat) > 0 and not isinstance(flat[0], (list, tuple, StridedView)):
+                break
+            flat = list(chain.from_iterable(flat))
+        if len(flat) != len(data):
+            raise ValueError(f'Expected {len(data)} values, got {len(flat)}')
+        data[:] = array(data.typecode, flat)
+
+    def _flat_segments(self, path: str) -> list:
+        boolean = self.element_type.swe_type is SWEDataTypes.BOOLEAN
+
+        def get():
+            return map(bool, self._data) if boolean else self._data
+
+        return [(path, self.element_type.swe_type, len(self._data), get, self.set_value)]
+
+    def _children(self):
+        return [self.element_type]
+
+    def _clone_children(self, clone, compact: bool):
+        clone.__dict__['element_type'] = self.element_type.clone()
+        clone.__dict__['_data'] = self._data[:]
+
+    def create_instance(self):
+        return self.clone()
+
+    def _schema_to_dict(self):
+        schema_dict = super()._schema_to_dict()
+        if self.referenceFrame is not None:
+            schema_dict['referenceFrame'] = self.referenceFrame
+        if self.localFrame is not None:
+            schema_dict['localFrame'] = self.localFrame
+
+        # Each dimension beyond the first is described as a nested Matrix
+        element_dict = self.element_type._get_schema_dict()
+        for n in reversed(self.shape[1:]):
+            element_dict = {'type': self.swe_type.value, 'elementCount': {'type': 'Count', 'value': n},
+                            'elementType': element_dict}
+        schema_dict['elementCount'] = {'type': 'Count', 'value': self.shape[0]}
+        schema_dict['elementType'] = element_dict
+        return schema_dict
+
+
+class DataStreamComponent(DataComponentImpl):
+    swe_type = SWEDataTypes.DATA_STREAM
+    element_type: DataComponentImpl = _SchemaAttribute(child=True)
+    encoding: AbstractEncoding = _SchemaAttribute()
+    capacity: int
+
+    _storage = None
+
+    def __init__(self, name, label, definition, element_type, encoding, capacity=1024, description=None,
+                 storage=None):
+        """
+        Returns a new DataStreamComponent that keeps the most recent records of a stream in a ring buffer. The values of
+        each scalar leaf of the element type are stored in a preallocated column, so appending a record does not
+        allocate anything.
+        :param name: machine name of the component
+        :param label: human-readable name of the component
+        :param definition: URI of the definition of the component
+        :param element_type: the schema of a record
+        :param encoding: the encoding of the records in the stream
+        :param capacity: the number of records kept, older records are overwritten
+        :param description: brief description of the component
+        :param storage: a column backend such as swecommondm.storage.MappedColumns holding the ring buffer, e.g. in a
+            memory-mapped file. The records it already holds are kept.
+        """
+        self.name = name
+        self.label = label
+        self.definition = definition
+        self.description = description
+        self.element_type = element_type
+        self.encoding = encoding
+        self.capacity = capacity
+        self._layout = BufferLayout(element_type)
+        if storage is not None:
+            self._storage = storage
+            self._columns = storage.open(self._layout, capacity)
+            self._next, self._count = storage.state
+        else:
+            self._columns = self._layout.allocate(capacity)
+            self._next = 0
+            self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __getstate__(self):
+        # Pickled streams keep their records, copied out of any storage backend, but not the backend itself
+        state = self.__dict__.copy()
+        state.pop('_storage', None)
+        return state
+
+    def create_codec(self):
+        """
+        Returns a codec for the records of the stream, see TextCodec and BinaryCodec
+        """
+        return self.encoding.create_codec(self.element_type)
+
+    def append(self, value):
+        """
+        Adds a record to the stream, overwriting the oldest one if the buffer is full
+        :param value: the value of the record, shaped as the element type's get_value returns it
+        """
+        if self._validate:
+            self.element_type.check_value(value)
+        self._layout.write(self._columns, self._next, value)
+        self._next = self._next + 1 if self._next + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+        if self._storage is not None:
+            self._storage.state[:] = array('q', (self._next, self._count))
+        self._mark_changed()
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def clear(self):
+        if self._storage is not None:
+            self._storage.reset(self._layout)
+        else:
+            self._columns = self._layout.allocate(self.capacity)
+        self._next = 0
+        self._count = 0
+        self._mark_changed()
+
+    def _slot(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('DataStream index out of range')
+        return (self._next - self._count + index) % self.capacity
+
+    def get_record(self, index: int):
+        """
+        Returns a record by its position in the buffer, 0 being the oldest record kept and -1 the latest
+        """
+        return self._layout.read(self._columns, self._slot(index))
+
+    def get_value(self):
+        """
+        Returns the latest record, or None if no record was added yet
+        """
+        return self.get_record(-1) if self._count else None
+
+    def set_value(self, value):
+        self.append(value)
+
+    def _flat_segments(self, path: str) -> list:
+        raise TypeError(f'{self.name} holds a history of records, which has no flat layout. Use the flat values of '
+                        f'its element type, or its codec, instead.')
+
+    def _children(self):
+        return [self.element_type]
+
+    def _clone_children(self, clone, compact: bool):
+        clone_dict = clone.__dict__
+        clone_dict['element_type'] = self.element_type.clone()
+        clone_dict['_layout'] = BufferLayout(clone_dict['element_type'])
+        clone_dict['_columns'] = {key: copy_column(column) for (key, column) in self._columns.items()}
+
+    def create_instance(self):
+        return self.clone()
+
+    def get_window(self, count: int = None) -> list:
+        """
+        Returns the latest `count` records, or all records kept, from oldest to latest
+        """
+        count = self._count if count is None else min(count, self._count)
+        read = self._layout.read
+        columns = self._columns
+        first = self._count - count
+        return [read(columns, self._slot(i)) for i in range(first, self._count)]
+
+    def _chronological(self, column, width: int, count: int):
+        end = self._next * width
+        start = end - count * width
+        if start >= 0:
+            return copy_column(column, start, end)
+        return copy_column(column, start) + copy_column(column, 0, end)
+
+    def get_columns(self, count: int = None) -> dict:
+        """
+        Returns the latest `count` records, or all records kept, column by column from oldest to latest, in the form
+        returned by DataArrayComponent.get_columns
+        """
+        count = self._count if count is None else min(count, self._count)
+        return {key: self._chronological(self._columns[key], width, count)
+                for (key, _, width) in self._layout.leaves}
+
+    def get_time_window(self, start, end=None, time_path: str = None) -> list:
+        """
+        Returns the records whose time is within [start, end], assuming records are appended in time order
+        :param start: earliest time, in epoch nanoseconds or as an ISO-8601 date-time
+        :param end: latest time, unbounded if None
+        :param time_path: path to the time leaf of the element type, defaults to its first Time component
+        """
+        if time_path is None:
+            time_path = next((key for (key, leaf, width) in self._layout.leaves
+                              if leaf.swe_type is SWEDataTypes.TIME and width == 1), None)
+            if time_path is None:
+                raise ValueError(f'The records of {self.name} have no Time component')
+        if isinstance(start, str):
+            start = parse_iso8601(start)
+        if isinstance(end, str):
+            end = parse_iso8601(end)
+        times = self._chronological(self._columns[time_path], 1, self._count)
+        first = bisect_left(times, start)
+        last = bisect_right(times, end) if end is not None else self._count
+        read = self._layout.read
+        return [read(self._columns, self._slot(i)) for i in range(first, last)]
+
+    def _schema_to_dict(self):
+        schema_dict = super()._schema_to_dict()
+        schema_dict['elementType'] = self.element_type._get_schema_dict()
+        schema_dict['encoding'] = self.encoding.datastructure_to_dict()
+        schema_dict['capacity'] = self.capacity
+        return schema_dict
+
+
+# Schema loading
+
+def _common_kwargs(schema: dict) -> dict:
+    kwargs = {'name': schema.get('name'), 'label': schema.get('label', schema.get('name')),
+              'definition': schema.get('definition')}
+    for key in ('description', 'identifier', 'optional', 'updatable'):
+        if key in schema:
+            kwargs[key] = schema[key]
+    return kwargs
+
+
+def _scalar_kwargs(schema: dict) -> dict:
+    kwargs = _common_kwargs(schema)
+    if 'value' in schema:
+        kwargs['value'] = schema['value']
+    return kwargs
+
+
+def _uom_code(schema: dict):
+    uom = schema.get('uom')
+    if uom is None:
+        return None
+    return uom.get('code', uom.get('href'))
+
+
+def _allowed_tokens(schema: dict):
+    constraint = schema.get('constraint')
+    if constraint is None:
+        return None
+    value = constraint.get('value')
+    return AllowedTokens(value=set(value) if value is not None else None, pattern=constraint.get('pattern'))
+
+
+def _allowed_values(schema: dict):
+    constraint = schema.get('constraint')
+    if constraint is None:
+        return None
+    value = constraint.get('value')
+    interval = constraint.get('interval')
+    if interval is not None and all(isinstance(bound, int) for bound in interval):
+        # Intervals are serialized with an inclusive upper bound
+        interval = range(interval[0], interval[1] + 1)
+    return AllowedValues(value=set(value) if value is not None else None, interval=interval,
+                         significant_figures=constraint.get('significantFigures'))
+
+
+def _time_from_dict(schema: dict, buffered: bool):
+    kwargs = _scalar_kwargs(schema)
+    if kwargs['definition'] is None:
+        del kwargs['definition']
+    if 'uom' in schema:
+        kwargs['uom'] = _uom_code(schema)
+    value = kwargs.get('value')
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Numeric values are counted in the component's unit of time
+        scale = time_unit_scale(kwargs.get('uom'))
+        if scale is not None:
+            kwargs['value'] = parse_time_number(repr(value), scale)
+    return TimeComponent(**kwargs, constraint=_allowed_values(schema))
+
+
+def _record_from_dict(schema: dict, buffered: bool):
+    record = DataRecordComponent(**_common_kwargs(schema))
+    for field_schema in schema.get('fields', []):
+        record.add_field(_component_from_dict(field_schema, buffered))
+    return record
+
+
+def _vector_from_dict(schema: dict, buffered: bool):
+    vector = VectorComponent(schema.get('name'), schema.get('label', schema.get('name')), schema.get('definition'),
+                             schema.get('referenceFrame'), schema.get('localFrame'), schema.get('description'))
+    for coord_schema in schema.get('coordinates', []):
+        vector.add_coord(coord_schema.get('axisID', coord_schema.get('name')),
+                         _component_from_dict(coord_schema, buffered))
+    return vector
+
+
+def _array_from_dict(schema: dict, buffered: bool):
+    data_array = DataArrayComponent(schema.get('name'), schema.get('label', schema.get('name')),
+                                    schema.get('definition'), schema.get('description'))
+    element_schema = schema.get('elementType')
+    if element_schema is not None:
+        size = schema.get('elementCount', {}).get('value') or 0
+        data_array.set_component_template_and_size(size, _component_from_dict(element_schema, buffered), buffered)
+    return data_array
+
+
+def _matrix_from_dict(schema: dict, buffered: bool):
+    shape = []
+    element_schema = schema
+    while element_schema.get('type') == SWEDataTypes.MATRIX.value:
+        shape.append(element_schema.get('elementCount', {}).get('value'))
+        element_schema = element_schema['elementType']
+    return MatrixComponent(schema.get('name'), schema.get('label', schema.get('name')), schema.get('definition'),
+                           _component_from_dict(element_schema, buffered), shape, schema.get('referenceFrame'),
+                           schema.get('localFrame'), schema.get('description'))
+
+
+def _stream_from_dict(schema: dict, buffered: bool):
+    kwargs = {'capacity': schema['capacity']} if 'capacity' in schema else {}
+    return DataStreamComponent(schema.get('name'), schema.get('label', schema.get('name')), schema.get('definition'),
+                               _component_from_dict(schema['elementType'], buffered),
+                               encoding_from_dict(schema['encoding']), description=schema.get('description'), **kwargs)
+
+
+_SCHEMA_LOADERS = {
+    SWEDataTypes.BOOLEAN: lambda schema, buffered: BooleanComponent(**_scalar_kwargs(schema)),
+    SWEDataTypes.TEXT: lambda schema, buffered: TextComponent(**_scalar_kwargs(schema),
+                                                              constraint=_allowed_tokens(schema)),
+    SWEDataTypes.CATEGORY: lambda schema, buffered: CategoryComponent(**_scalar_kwargs(schema),
+                                                                      codespace=schema.get('codeSpace'),
+                                                                      constraint=_allowed_tokens(schema)),
+    SWEDataTypes.COUNT: lambda schema, buffered: CountComponent(**_scalar_kwargs(schema),
+                                                                constraint=_allowed_values(schema)),
+    SWEDataTypes.QUANTITY: lambda schema, buffered: QuantityComponent(**_scalar_kwargs(schema),
+                                                                      uom=_uom_code(schema),
+                                                                      constraint=_allowed_values(schema)),
+    SWEDataTypes.TIME: _time_from_dict,
+    SWEDataTypes.DATA_RECORD: _record_from_dict,
+    SWEDataTypes.VECTOR: _vector_from_dict,
+    SWEDataTypes.DATA_ARRAY: _array_from_dict,
+    SWEDataTypes.MATRIX: _matrix_from_dict,
+    SWEDataTypes.DATA_STREAM: _stream_from_dict,
+}
+
+
+def _component_from_dict(schema: dict, buffered: bool):
+    try:
+        swe_type = SWEDataTypes(schema['type'])
+    except (KeyError, ValueError):
+        raise ValueError(f'Unsupported component type: {schema.get("type")!r}') from None
+    return _SCHEMA_LOADERS[swe_type](schema, buffered)
+
+
+@lru_cache(maxsize=256)
+def _schema_prototype(schema_json: str | bytes, buffered: bool):
+    return _component_from_dict(json.loads(schema_json), buffered)
+
+
+def from_json(schema_json: str | bytes, buffered: bool = False):
+    """
+    Builds a component tree from a SWE Common JSON schema, such as the output of datastructure_to_json. Each distinct
+    schema is only parsed once; later calls return a clone of the component built the first time.
+    :param schema_json: the JSON schema
+    :param buffered: whether DataArrays in the schema store their element values in columns, see
+        DataArrayComponent.set_component_template_and_size
+    :return: a new component
+    """
+    return _schema_prototype(schema_json, buffered).clone()
+
+
+def from_dict(schema: dict, buffered: bool = False):
+    """
+    Builds a component tree from a SWE Common schema dictionary, such as the output of datastructure_to_dict. Like
+    from_json, each distinct schema is only parsed once.
+    :param schema: the schema dictionary
+    :param buffered: whether DataArrays in the schema store their element values in columns
+    :return: a new component
+    """
+    return from_json(json.dumps(schema, sort_keys=True, default=_json_default), buffered)
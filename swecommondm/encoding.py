@@ -1,6 +1,28 @@
-from abc import ABC
+import binascii
+import codecs
+import re
+import struct
+from abc import ABC, abstractmethod
 from enum import Enum
 
+from swecommondm import SWEDataTypes
+from swecommondm.buffers import BufferLayout
+from swecommondm.iso8601 import format_iso8601, format_time_number, parse_iso8601, parse_time_number, \
+    time_unit_scale
+
+
+BASE64_CHUNK_SIZE = 3 * 16384
+"""
+    Number of raw bytes encoded to base64 at a time when streaming. It is a multiple of 3 so that chunks can be
+    concatenated without padding.
+"""
+
+
+STREAM_READ_SIZE = 65536
+"""
+    Maximum number of bytes read from an asynchronous stream at a time when decoding it
+"""
+
 
 class ByteEncoding(Enum):
     RAW = 'raw'
@@ -12,9 +34,61 @@ class ByteOrder(Enum):
     LITTLE_ENDIAN = 'littleEndian'
 
 
+class BinaryDataType(Enum):
+    """
+    Data types of the scalar components of a binary encoded block, identified by their OGC definition URIs
+    """
+    BOOLEAN = 'http://www.opengis.net/def/dataType/OGC/0/boolean'
+    SIGNED_BYTE = 'http://www.opengis.net/def/dataType/OGC/0/signedByte'
+    UNSIGNED_BYTE = 'http://www.opengis.net/def/dataType/OGC/0/unsignedByte'
+    SIGNED_SHORT = 'http://www.opengis.net/def/dataType/OGC/0/signedShort'
+    UNSIGNED_SHORT = 'http://www.opengis.net/def/dataType/OGC/0/unsignedShort'
+    SIGNED_INT = 'http://www.opengis.net/def/dataType/OGC/0/signedInt'
+    UNSIGNED_INT = 'http://www.opengis.net/def/dataType/OGC/0/unsignedInt'
+    SIGNED_LONG = 'http://www.opengis.net/def/dataType/OGC/0/signedLong'
+    UNSIGNED_LONG = 'http://www.opengis.net/def/dataType/OGC/0/unsignedLong'
+    FLOAT32 = 'http://www.opengis.net/def/dataType/OGC/0/float32'
+    FLOAT64 = 'http://www.opengis.net/def/dataType/OGC/0/double'
+
+
+_STRUCT_CHARS = {
+    BinaryDataType.BOOLEAN: '?',
+    BinaryDataType.SIGNED_BYTE: 'b',
+    BinaryDataType.UNSIGNED_BYTE: 'B',
+    BinaryDataType.SIGNED_SHORT: 'h',
+    BinaryDataType.UNSIGNED_SHORT: 'H',
+    BinaryDataType.SIGNED_INT: 'i',
+    BinaryDataType.UNSIGNED_INT: 'I',
+    BinaryDataType.SIGNED_LONG: 'q',
+    BinaryDataType.UNSIGNED_LONG: 'Q',
+    BinaryDataType.FLOAT32: 'f',
+    BinaryDataType.FLOAT64: 'd',
+}
+
+_NON_INTEGER_DATA_TYPES = frozenset({BinaryDataType.BOOLEAN, BinaryDataType.FLOAT32, BinaryDataType.FLOAT64})
+
+_DEFAULT_BINARY_DATA_TYPES = {
+    SWEDataTypes.BOOLEAN: BinaryDataType.BOOLEAN,
+    SWEDataTypes.COUNT: BinaryDataType.SIGNED_LONG,
+    SWEDataTypes.QUANTITY: BinaryDataType.FLOAT64,
+    SWEDataTypes.TIME: BinaryDataType.SIGNED_LONG,
+}
+
+
 class AbstractEncoding(ABC):
     type_name: str
 
+    @abstractmethod
+    def datastructure_to_dict(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def create_codec(self, component):
+        """
+        Returns a codec encoding and decoding the values of `component` with this encoding
+        """
+        raise NotImplementedError
+
 
 class TextEncoding(AbstractEncoding):
     """
@@ -22,6 +96,7 @@ class TextEncoding(AbstractEncoding):
     using a text based delimiter separated values (DSV) format. -  OGC 08-094r1 pg. 59
     """
 
+    type_name = 'TextEncoding'
     token_sep = ','
     block_sep = '\n'
     decimal_sep = '.'
@@ -33,6 +108,380 @@ class TextEncoding(AbstractEncoding):
         self.decimal_sep = decimal
         self.collapse_white_spaces = collapse_white_space
 
+    def datastructure_to_dict(self):
+        return {
+            'type': self.type_name,
+            'tokenSeparator': self.token_sep,
+            'blockSeparator': self.block_sep,
+            'decimalSeparator': self.decimal_sep,
+            'collapseWhiteSpaces': self.collapse_white_spaces,
+        }
+
+    def create_codec(self, component):
+        return TextCodec(component, self)
+
+
+_BOOLEAN_TOKENS = {'true': True, '1': True, 'false': False, '0': False}
+
+
+def _parse_boolean(token):
+    value = _BOOLEAN_TOKENS.get(token)
+    if value is None:
+        raise ValueError(f'{token!r} is not a Boolean')
+    return value
+
+
+def _format_boolean(value):
+    return 'true' if value else 'false'
+
+
+def _format_count(value):
+    if value.__class__ is not int:
+        if not float(value).is_integer():
+            raise ValueError(f'{value!r} is not a valid Count')
+        value = int(value)
+    return str(value)
+
+
+_ESCAPE = '\\'
+_ESCAPED = re.compile(r'\\(.)', re.DOTALL)
+
+
+def _unescape(token):
+    return _ESCAPED.sub(r'\1', token) if _ESCAPE in token else token
+
+
+def _strip_unescaped(text: str) -> str:
+    """
+    Strips the white space around text, keeping a final white space character that is escaped with a backslash
+    """
+    stripped = text.strip()
+    if stripped.endswith(_ESCAPE) and (len(stripped) - len(stripped.rstrip(_ESCAPE))) % 2:
+        return stripped + text[len(text) - len(text.lstrip()) + len(stripped)]
+    return stripped
+
+
+def _split_escaped(text: str, sep: str) -> list[str]:
+    """
+    Splits text at the separators that are not escaped with a backslash, keeping the escapes in the parts
+    """
+    if _ESCAPE not in text:
+        return text.split(sep)
+    parts = []
+    start = 0
+    for match in re.finditer(r'\\.|' + re.escape(sep), text, re.DOTALL):
+        if match[0] == sep:
+            parts.append(text[start:match.start()])
+            start = match.end()
+    parts.append(text[start:])
+    return parts
+
+
+_TEXT_PARSERS = {
+    SWEDataTypes.BOOLEAN: _parse_boolean,
+    SWEDataTypes.COUNT: int,
+    SWEDataTypes.QUANTITY: float,
+    SWEDataTypes.TIME: parse_iso8601,
+}
+_TEXT_FORMATTERS = {
+    SWEDataTypes.BOOLEAN: _format_boolean,
+    SWEDataTypes.COUNT: _format_count,
+    SWEDataTypes.QUANTITY: repr,
+    SWEDataTypes.TIME: format_iso8601,
+}
+
+
+class TextCodec:
+    """
+    Encodes and decodes the values of a component to and from the DSV format described by a TextEncoding.
+
+    The component is only used as a schema: its structure is compiled once into a tree of small functions that map a
+    value, shaped as the component's get_value returns it, to a flat list of tokens and back. The codec should be
+    created once per schema and reused for every block.
+
+    Backslashes and separators within Text and Category values are escaped with a backslash. Empty tokens decode to
+    None.
+    """
+
+    def __init__(self, component, encoding: TextEncoding):
+        """
+        :param component: the schema of a block, usually a DataRecordComponent. A DataArrayComponent describes a block
+            holding all of its elements.
+        :param encoding: the separators to use
+        """
+        self.component = component
+        self.encoding = encoding
+        layout = BufferLayout(component)
+        self.token_count = sum(width for (_, _, width) in layout.leaves)
+        self._encode_node = self._compile_encoder(layout)
+        self._decode_node = self._compile_decoder(layout)
+
+    def _compile_encoder(self, layout: BufferLayout):
+        if layout.key is not None:
+            fmt = self._formatter(layout)
+
+            def encode_scalar(value, out):
+                out.append('' if value is None else fmt(value))
+
+            return encode_scalar
+
+        if layout.element is not None:
+            size = layout.size
+            if layout.element.key is not None:
+                fmt = self._formatter(layout.element)
+
+                def encode_scalars(values, out):
+                    if len(values) != size:
+                        raise ValueError(f'Expected {size} values, got {len(values)}')
+                    out.extend(['' if v is None else fmt(v) for v in values])
+
+                return encode_scalars
+
+            encode_element = self._compile_encoder(layout.element)
+
+            def encode_array(values, out):
+                if len(values) != size:
+                    raise ValueError(f'Expected {size} values, got {len(values)}')
+                for v in values:
+                    encode_element(v, out)
+
+            return encode_array
+
+        children = [(name, self._compile_encoder(child)) for (name, child) in layout.children.items()]
+
+        def encode_record(value, out):
+            for name, encode_child in children:
+                encode_child(value.get(name), out)
+
+        return encode_record
+
+    def _compile_decoder(self, layout: BufferLayout):
+        if layout.key is not None:
+            parse = self._parser(layout)
+
+            def decode_scalar(tokens, i):
+                token = tokens[i]
+                return (parse(token) if token else None), i + 1
+
+            return decode_scalar
+
+        if layout.element is not None:
+            size = layout.size
+            if layout.element.key is not None:
+                parse = self._parser(layout.element)
+
+                def decode_scalars(tokens, i):
+                    end = i + size
+                    try:
+                        return list(map(parse, tokens[i:end])), end
+                    except ValueError:
+                        # Only empty tokens are retried, others fail again with the same error
+                        return [parse(t) if t else None for t in tokens[i:end]], end
+
+                return decode_scalars
+
+            decode_element = self._compile_decoder(layout.element)
+
+            def decode_array(tokens, i):
+                values = []
+                for _ in range(size):
+                    value, i = decode_element(tokens, i)
+                    values.append(value)
+                return values, i
+
+            return decode_array
+
+        children = [(name, self._compile_decoder(child)) for (name, child) in layout.children.items()]
+
+        def decode_record(tokens, i):
+            value = {}
+            for name, decode_child in children:
+                value[name], i = decode_child(tokens, i)
+            return value, i
+
+        return decode_record
+
+    @staticmethod
+    def _time_unit(layout: BufferLayout):
+        # Nanoseconds per unit and reference time of a Time leaf written as numbers, or None for ISO-8601 date-times
+        template = layout.template
+        scale = time_unit_scale(getattr(template, 'uom', None))
+        if scale is None:
+            return None
+        reference = getattr(template, 'reference_time', None)
+        if isinstance(reference, str):
+            reference = parse_iso8601(reference)
+        return scale, reference or 0
+
+    def _formatter(self, layout: BufferLayout):
+        swe_type = layout.swe_type
+        fmt = _TEXT_FORMATTERS.get(swe_type)
+        decimal_sep = self.encoding.decimal_sep
+        if swe_type is SWEDataTypes.TIME and (unit := self._time_unit(layout)) is not None:
+            scale, reference = unit
+            if decimal_sep != '.':
+                return lambda v: format_time_number(v, scale, reference).replace('.', decimal_sep)
+            return lambda v: format_time_number(v, scale, reference)
+        if fmt is None:
+            special = (_ESCAPE, self.encoding.token_sep, self.encoding.block_sep)
+            escapes = [(c, _ESCAPE + c) for c in special]
+
+            def escape(value):
+                value = str(value)
+                if any(c in value for c in special):
+                    for c, escaped in escapes:
+                        value = value.replace(c, escaped)
+                return value
+
+            return escape
+        if decimal_sep != '.' and fmt is repr:
+            return lambda v: repr(v).replace('.', decimal_sep)
+        return fmt
+
+    def _parser(self, layout: BufferLayout):
+        swe_type = layout.swe_type
+        parse = _TEXT_PARSERS.get(swe_type)
+        decimal_sep = self.encoding.decimal_sep
+        if swe_type is SWEDataTypes.TIME and (unit := self._time_unit(layout)) is not None:
+            scale, reference = unit
+            return lambda t: parse_time_number(t.replace(decimal_sep, '.'), scale, reference)
+        if parse is None:
+            if self.encoding.collapse_white_spaces:
+                return lambda t: _unescape(_strip_unescaped(t))
+            return _unescape
+        if decimal_sep != '.' and parse is float:
+            return lambda t: float(t.replace(decimal_sep, '.'))
+        if parse is _parse_boolean and self.encoding.collapse_white_spaces:
+            return lambda t: _parse_boolean(t.strip())
+        if parse is parse_iso8601 and self.encoding.collapse_white_spaces:
+            return lambda t: parse_iso8601(t.strip())
+        return parse
+
+    def encode(self, value=None) -> str:
+        """
+        Encodes one block, terminated by the block separator.
+        :param value: the value to encode, defaults to the current value of the component
+        """
+        if value is None:
+            value = self.component.get_value()
+        tokens = []
+        self._encode_node(value, tokens)
+        return self.encoding.token_sep.join(tokens) + self.encoding.block_sep
+
+    def encode_many(self, values) -> str:
+        return ''.join([self.encode(value) for value in values])
+
+    def _decode_tokens(self, tokens: list[str]):
+        if len(tokens) != self.token_count:
+            raise ValueError(f'Expected {self.token_count} tokens in block, got {len(tokens)}')
+        return self._decode_node(tokens, 0)[0]
+
+    def decode(self, block: str):
+        """
+        Decodes a single block, with or without its trailing block separator.
+        """
+        block_sep = self.encoding.block_sep
+        if block_sep != self.encoding.token_sep:
+            parts = _split_escaped(block, block_sep)
+            if len(parts) > 1 and parts[-1] == '':
+                parts.pop()
+            block = block_sep.join(parts)
+        if self.encoding.collapse_white_spaces:
+            block = _strip_unescaped(block)
+        return self._decode_tokens(_split_escaped(block, self.encoding.token_sep))
+
+    def split_blocks(self, text: str) -> tuple[list[list[str]], str]:
+        """
+        Splits text into the token lists of its complete blocks.
+        :return: the token lists and the trailing text of an incomplete block
+        """
+        token_sep = self.encoding.token_sep
+        block_sep = self.encoding.block_sep
+        collapse = self.encoding.collapse_white_spaces
+
+        if block_sep == token_sep:
+            # Blocks can only be told apart by their number of tokens
+            tokens = _split_escaped(text, token_sep)
+            remainder = tokens.pop()
+            if collapse:
+                tokens = [t for t in tokens if t.strip()]
+            n = self.token_count
+            complete = len(tokens) - len(tokens) % n
+            blocks = [tokens[i:i + n] for i in range(0, complete, n)]
+            return blocks, token_sep.join(tokens[complete:] + [remainder])
+
+        parts = _split_escaped(text, block_sep)
+        remainder = parts.pop()
+        if collapse:
+            parts = [_strip_unescaped(p) for p in parts]
+        # An empty block is the missing value of a single-token block, otherwise it is a blank line
+        keep_empty = self.token_count == 1
+        return [_split_escaped(p, token_sep) for p in parts if p or keep_empty], remainder
+
+    def decode_many(self, text: str) -> list:
+        """
+        Decodes every block in `text`. A final block does not need a trailing block separator.
+        """
+        blocks, remainder = self.split_blocks(text)
+        if remainder:
+            last, remainder = self.split_blocks(remainder + self.encoding.block_sep)
+            blocks += last
+        if remainder.strip(self.encoding.token_sep + ' \t\r\n'):
+            raise ValueError(f'Incomplete block at end of text: {remainder!r}')
+        decode_tokens = self._decode_tokens
+        return [decode_tokens(tokens) for tokens in blocks]
+
+    def stream_decoder(self):
+        return TextStreamDecoder(self)
+
+    def iter_decode(self, chunks):
+        """
+        Decodes an iterable of str or bytes chunks of arbitrary size, yielding each value as soon as its block is
+        complete.
+        """
+        decoder = TextStreamDecoder(self)
+        for chunk in chunks:
+            yield from decoder.feed(chunk)
+        yield from decoder.flush()
+
+    def aiter_decode(self, reader, read_size: int = STREAM_READ_SIZE, batches: bool = False):
+        """
+        Decodes the blocks read from an asyncio.StreamReader as an async iterator, see `aiter_decode`
+        """
+        return aiter_decode(self, reader, read_size, batches)
+
+
+class TextStreamDecoder:
+    """
+    Incremental decoder for a stream of DSV blocks received in arbitrary chunks, e.g. from a socket. Incomplete blocks
+    and multibyte characters split across chunks are kept until the rest arrives.
+    """
+
+    def __init__(self, codec: TextCodec):
+        self.codec = codec
+        self._pending = ''
+        self._bytes_decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def feed(self, chunk) -> list:
+        """
+        :param chunk: the next piece of the stream, as str or bytes
+        :return: the values of the blocks completed by this chunk
+        """
+        if not isinstance(chunk, str):
+            chunk = self._bytes_decoder.decode(chunk)
+        blocks, self._pending = self.codec.split_blocks(self._pending + chunk)
+        decode_tokens = self.codec._decode_tokens
+        return [decode_tokens(tokens) for tokens in blocks]
+
+    def flush(self) -> list:
+        """
+        Decodes the final block if the stream did not end with a block separator
+        :return: the value of that block, if any
+        """
+        pending = self._pending + self._bytes_decoder.decode(b'', final=True)
+        self._pending = ''
+        return self.codec.decode_many(pending)
+
 
 class BinaryEncoding(AbstractEncoding):
     """
@@ -45,10 +494,11 @@ class BinaryEncoding(AbstractEncoding):
     software that is not SWE Common enabled). - OGC 08-094r1 pg. 62
     """
 
+    type_name = 'BinaryEncoding'
     byte_length: int
     byte_encoding: ByteEncoding
     byte_order: ByteOrder
-    member = None
+    member: dict[str, BinaryDataType] = None
 
     def __init__(self, byte_encoding: ByteEncoding = ByteEncoding.RAW, byte_order: ByteOrder = ByteOrder.LITTLE_ENDIAN,
                  byte_length: int = None):
@@ -60,3 +510,355 @@ class BinaryEncoding(AbstractEncoding):
         self.byte_encoding = byte_encoding
         self.byte_order = byte_order
         self.byte_length = byte_length
+        self.member = {}
+
+    def add_member(self, ref: str, data_type: BinaryDataType):
+        """
+        Sets the data type used to encode a scalar component. Components without a member use a default data type for
+        their SWE type (64-bit integers for Counts and for Times, in epoch nanoseconds, doubles for Quantities). Times
+        can only use integer data types.
+        :param ref: path to the component within the block, e.g. "location.lat". Arrays do not add to the path.
+        :param data_type: the binary data type of the component
+        """
+        self.member[ref] = data_type
+
+    def datastructure_to_dict(self):
+        schema_dict = {
+            'type': self.type_name,
+            'byteOrder': self.byte_order.value,
+            'byteEncoding': self.byte_encoding.value,
+        }
+        if self.byte_length is not None:
+            schema_dict['byteLength'] = self.byte_length
+        if self.member:
+            schema_dict['members'] = [{'type': 'Component', 'ref': '/' + ref.replace('.', '/'),
+                                       'dataType': data_type.value} for (ref, data_type) in self.member.items()]
+        return schema_dict
+
+    def create_codec(self, component):
+        return BinaryCodec(component, self)
+
+
+def encoding_from_dict(schema: dict) -> AbstractEncoding:
+    """
+    Builds a TextEncoding or BinaryEncoding from its dictionary form, see datastructure_to_dict
+    """
+    if schema.get('type') == TextEncoding.type_name:
+        return TextEncoding(schema.get('tokenSeparator', ','), schema.get('blockSeparator', '\n'),
+                            schema.get('decimalSeparator', '.'), schema.get('collapseWhiteSpaces', False))
+    if schema.get('type') == BinaryEncoding.type_name:
+        encoding = BinaryEncoding(ByteEncoding(schema.get('byteEncoding', ByteEncoding.RAW.value)),
+                                  ByteOrder(schema.get('byteOrder', ByteOrder.LITTLE_ENDIAN.value)),
+                                  schema.get('byteLength'))
+        for member in schema.get('members', []):
+            encoding.add_member(member['ref'].strip('/').replace('/', '.'), BinaryDataType(member['dataType']))
+        return encoding
+    raise ValueError(f'Unsupported encoding type: {schema.get("type")!r}')
+
+
+class BinaryCodec:
+    """
+    Encodes and decodes the values of a component to and from the binary format described by a BinaryEncoding.
+
+    The component is compiled once into a single struct.Struct covering a whole block, so encoding and decoding a block
+    is one call into C plus rebuilding the nested value. Only components with a fixed size can be compiled: scalar
+    Boolean, Count, Quantity and Time components, and records, vectors, matrices and fixed-size arrays of them.
+    """
+
+    def __init__(self, component, encoding: BinaryEncoding):
+        self.component = component
+        self.encoding = encoding
+        layout = BufferLayout(component)
+        byte_order = '<' if encoding.byte_order is ByteOrder.LITTLE_ENDIAN else '>'
+        self.struct = struct.Struct(byte_order + ''.join(self._compile_format(layout)))
+        self.block_size = self.struct.size
+        self._flatten = layout.compile_flatten()
+        self._unflatten = layout.compile_unflatten()
+
+    def _compile_format(self, layout: BufferLayout) -> list[str]:
+        if layout.key is not None:
+            return [self._struct_char(layout)]
+        if layout.element is not None:
+            if layout.element.key is not None:
+                return [f'{layout.size}{self._struct_char(layout.element)}']
+            return self._compile_format(layout.element) * layout.size
+        return [c for child in layout.children.values() for c in self._compile_format(child)]
+
+    def _struct_char(self, layout: BufferLayout) -> str:
+        data_type = self.encoding.member.get(layout.key, _DEFAULT_BINARY_DATA_TYPES.get(layout.swe_type))
+        if data_type is None:
+            raise ValueError(f'Component "{layout.key}" of type {layout.swe_type.value} has no fixed-size binary '
+                             f'representation')
+        if layout.swe_type is SWEDataTypes.TIME and data_type in _NON_INTEGER_DATA_TYPES:
+            # Times are stored as integer epoch nanoseconds, packed as is: a float would not decode to a valid value
+            raise ValueError(f'Time component "{layout.key}" must be encoded as an integer data type (epoch '
+                             f'nanoseconds), not {data_type.name}')
+        return _STRUCT_CHARS[data_type]
+
+    def _is_base64(self):
+        return self.encoding.byte_encoding is ByteEncoding.BASE64
+
+    def _pack(self, value) -> bytes:
+        if value is None:
+            value = self.component.get_value()
+        flat = []
+        self._flatten(value, flat)
+        return self.struct.pack(*flat)
+
+    def encode(self, value=None) -> bytes:
+        """
+        Encodes one block, as base64 if that is the byte encoding.
+        :param value: the value to encode, defaults to the current value of the component
+        """
+        data = self._pack(value)
+        return binascii.b2a_base64(data, newline=False) if self._is_base64() else data
+
+    def encode_into(self, buffer, offset: int, value=None):
+        """
+        Encodes one block directly into a writable buffer at `offset`. Blocks in a buffer are always raw, base64 only
+        applies to a whole stream of them (see encode_many and iter_encode).
+        """
+        if value is None:
+            value = self.component.get_value()
+        flat = []
+        self._flatten(value, flat)
+        self.struct.pack_into(buffer, offset, *flat)
+
+    def encode_many(self, values) -> bytes | bytearray:
+        values = list(values)
+        buffer = bytearray(self.block_size * len(values))
+        for i, value in enumerate(values):
+            self.encode_into(buffer, i * self.block_size, value)
+        return b''.join(iter_base64(buffer)) if self._is_base64() else buffer
+
+    def iter_encode(self, values, chunk_size: int = BASE64_CHUNK_SIZE):
+        """
+        Encodes blocks into a stream of chunks. With base64 only one chunk of encoded text exists at a time, so large
+        blocks are never held as both raw bytes and base64 text in full.
+        """
+        if not self._is_base64():
+            for value in values:
+                yield self._pack(value)
+            return
+
+        encoder = Base64StreamEncoder()
+        for value in values:
+            data = memoryview(self._pack(value))
+            for start in range(0, len(data), chunk_size):
+                yield encoder.encode(data[start:start + chunk_size])
+        yield encoder.flush()
+
+    def _to_raw(self, buffer):
+        if not self._is_base64():
+            return buffer
+        # Decode in chunks straight into a buffer sized for the whole payload, so no intermediate bytes are built. Text
+        # is converted to ASCII one chunk at a time for the same reason.
+        if isinstance(buffer, str):
+            text = buffer
+            chunks = (text[start:start + BASE64_CHUNK_SIZE].encode('ascii')
+                      for start in range(0, len(text), BASE64_CHUNK_SIZE))
+        else:
+            text = memoryview(buffer).cast('B')
+            chunks = (text[start:start + BASE64_CHUNK_SIZE] for start in range(0, len(text), BASE64_CHUNK_SIZE))
+        decoder = Base64StreamDecoder(bytearray(len(text) * 3 // 4))
+        for chunk in chunks:
+            decoder.feed(chunk)
+        decoder.flush()
+        return memoryview(decoder.buffer)[:decoder.position]
+
+    def decode(self, buffer, offset: int = 0):
+        """
+        Decodes the block starting at `offset`. Raw blocks are read without being copied from any object supporting the
+        buffer protocol (bytes, bytearray, memoryview, mmap...). Base64 data is decoded before `offset` is applied.
+        """
+        return self._unflatten(self.struct.unpack_from(self._to_raw(buffer), offset), 0)[0]
+
+    def decode_flat(self, buffer, offset: int = 0) -> tuple:
+        """
+        Decodes the block starting at `offset` to the flat tuple of its scalar values in element order
+        """
+        return self.struct.unpack_from(self._to_raw(buffer), offset)
+
+    def decode_many(self, buffer) -> list:
+        """
+        Decodes consecutive blocks filling `buffer`, whose (decoded) length must be a multiple of the block size
+        """
+        unflatten = self._unflatten
+        return [unflatten(flat, 0)[0] for flat in self.struct.iter_unpack(self._to_raw(buffer))]
+
+    def stream_decoder(self):
+        return BinaryStreamDecoder(self)
+
+    def iter_decode(self, chunks):
+        """
+        Decodes an iterable of chunks of arbitrary size, yielding each value as soon as its block is complete
+        """
+        decoder = BinaryStreamDecoder(self)
+        for chunk in chunks:
+            yield from decoder.feed(chunk)
+        decoder.flush()
+
+    def aiter_decode(self, reader, read_size: int = STREAM_READ_SIZE, batches: bool = False):
+        """
+        Decodes the blocks read from an asyncio.StreamReader as an async iterator, see `aiter_decode`
+        """
+        return aiter_decode(self, reader, read_size, batches)
+
+
+def iter_base64(buffer, chunk_size: int = BASE64_CHUNK_SIZE):
+    """
+    Yields the base64 encoding of a buffer in chunks, without copying the buffer
+    """
+    view = memoryview(buffer).cast('B')
+    chunk_size -= chunk_size % 3
+    for start in range(0, len(view), chunk_size):
+        yield binascii.b2a_base64(view[start:start + chunk_size], newline=False)
+
+
+class Base64StreamEncoder:
+    """
+    Incremental base64 encoder. Input that does not fill a complete 3-byte group is kept until the next call.
+    """
+
+    def __init__(self):
+        self._pending = b''
+
+    def encode(self, data) -> bytes:
+        if self._pending:
+            data = self._pending + bytes(data)
+        usable = len(data) - len(data) % 3
+        self._pending = bytes(data[usable:])
+        return binascii.b2a_base64(data[:usable], newline=False)
+
+    def flush(self) -> bytes:
+        pending, self._pending = self._pending, b''
+        return binascii.b2a_base64(pending, newline=False)
+
+
+class Base64StreamDecoder:
+    """
+    Incremental base64 decoder for text received in arbitrary chunks. Characters that do not complete a 4-character
+    group, as well as whitespace and line breaks, are kept or dropped until the rest arrives. Decoded bytes are either
+    returned (decode) or written straight into a preallocated buffer (feed), so a large payload is never held as both
+    text and bytes in full.
+    """
+
+    def __init__(self, buffer=None):
+        """
+        :param buffer: writable buffer that feed writes decoded bytes into, starting at its beginning
+        """
+        self._pending = b''
+        self.buffer = buffer
+        self._view = memoryview(buffer).cast('B') if buffer is not None else None
+        self.position = 0
+
+    def decode(self, chunk) -> bytes:
+        """
+        :return: the bytes decoded from the complete 4-character groups received so far
+        """
+        if isinstance(chunk, str):
+            chunk = chunk.encode('ascii')
+        data = self._pending + bytes(chunk).translate(None, b' \t\r\n')
+        usable = len(data) - len(data) % 4
+        self._pending = data[usable:]
+        return binascii.a2b_base64(data[:usable])
+
+    def feed(self, chunk) -> int:
+        """
+        Decodes a chunk into the buffer
+        :return: the number of bytes written by this chunk
+        """
+        decoded = self.decode(chunk)
+        end = self.position + len(decoded)
+        if end > len(self._view):
+            raise ValueError(f'Base64 data exceeds the {len(self._view)} byte buffer')
+        self._view[self.position:end] = decoded
+        self.position = end
+        return len(decoded)
+
+    def flush(self):
+        """
+        Checks that the stream did not end in the middle of a 4-character group
+        """
+        if self._pending:
+            raise ValueError('Truncated base64 data')
+
+
+class BinaryStreamDecoder:
+    """
+    Incremental decoder for a stream of binary blocks received in arbitrary chunks. Bytes are copied into a preallocated
+    buffer holding a single block, which is decoded as soon as it is full.
+    """
+
+    def __init__(self, codec: BinaryCodec):
+        self.codec = codec
+        self._block = bytearray(codec.block_size)
+        self._view = memoryview(self._block)
+        self._position = 0
+        self._base64 = Base64StreamDecoder() if codec.encoding.byte_encoding is ByteEncoding.BASE64 else None
+
+    def feed(self, chunk) -> list:
+        """
+        :param chunk: the next piece of the stream
+        :return: the values of the blocks completed by this chunk
+        """
+        if self._base64 is not None:
+            chunk = self._base64.decode(chunk)
+        chunk = memoryview(chunk).cast('B')
+        codec = self.codec
+        block_size = codec.block_size
+        values = []
+        start = 0
+        while start < len(chunk):
+            if self._position == 0 and len(chunk) - start >= block_size:
+                # Whole blocks are decoded straight from the chunk
+                values.append(codec._unflatten(codec.struct.unpack_from(chunk, start), 0)[0])
+                start += block_size
+                continue
+            n = min(block_size - self._position, len(chunk) - start)
+            self._view[self._position:self._position + n] = chunk[start:start + n]
+            self._position += n
+            start += n
+            if self._position == block_size:
+                values.append(codec._unflatten(codec.struct.unpack_from(self._block), 0)[0])
+                self._position = 0
+        return values
+
+    def flush(self) -> list:
+        """
+        Checks that the stream did not end in the middle of a block
+        :return: an empty list, as binary blocks are always decoded by feed
+        """
+        if self._base64 is not None:
+            self._base64.flush()
+        if self._position:
+            raise ValueError(f'Stream ended with an incomplete block of {self._position} bytes')
+        return []
+
+
+async def aiter_decode(codec, reader, read_size: int = STREAM_READ_SIZE, batches: bool = False):
+    """
+    Decodes the blocks read from an asyncio.StreamReader (or anything with an awaitable `read(n)`), yielding each value
+    as soon as its block is complete. Nothing is read ahead of the consumer, so a slow consumer pauses the connection
+    through the reader's flow control rather than buffering data.
+    :param codec: a TextCodec or BinaryCodec
+    :param reader: the stream to read from, until it reaches EOF
+    :param read_size: maximum number of bytes read at a time
+    :param batches: when True, yields lists holding the values completed by each read instead of single values
+    """
+    decoder = codec.stream_decoder()
+    while chunk := await reader.read(read_size):
+        values = decoder.feed(chunk)
+        if batches:
+            if values:
+                yield values
+        else:
+            for value in values:
+                yield value
+    values = decoder.flush()
+    if batches:
+        if values:
+            yield values
+    else:
+        for value in values:
+            yield value
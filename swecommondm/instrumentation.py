@@ -0,0 +1,156 @@
+"""
+Opt-in instrumentation of the library's hot paths.
+
+Nothing is instrumented until enable() is called. It replaces the instrumented methods (component set_value, get_value
+and datastructure_to_dict, array construction, and the encode/decode methods of the codecs) with wrappers that count
+calls and record their duration in a histogram. disable() restores the original methods, so instrumentation costs
+nothing while it is disabled.
+"""
+import functools
+from bisect import bisect_left
+from time import perf_counter
+
+from swecommondm import ComponentInstance, DataComponentImpl
+from swecommondm import component_implementations
+from swecommondm.encoding import BinaryCodec, BinaryStreamDecoder, TextCodec, TextStreamDecoder
+
+
+HISTOGRAM_BOUNDS = tuple(2 ** i / 1e6 for i in range(21))
+"""
+    Upper bounds, in seconds, of the buckets of the timing histograms: powers of two from 1 µs to about 1 s. Longer calls
+    fall into a last, unbounded bucket.
+"""
+
+_COMPONENT_METHODS = ('get_value', 'set_value')
+_ARRAY_METHODS = ('set_component_template_and_size', 'add_component', 'set_columns')
+_CODEC_METHODS = ('encode', 'encode_many', 'decode', 'decode_many')
+_STREAM_DECODER_METHODS = ('feed',)
+
+
+class Metric:
+    """
+    Call count and timing histogram of one instrumented method
+    """
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+    def record(self, duration: float):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.buckets[bisect_left(HISTOGRAM_BOUNDS, duration)] += 1
+
+    def to_dict(self) -> dict:
+        """
+        :return: the count, total, mean and max durations in seconds, and the non-empty histogram buckets keyed by their
+            upper bound (inf for the last one)
+        """
+        bounds = HISTOGRAM_BOUNDS + (float('inf'),)
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'histogram': {bound: n for (bound, n) in zip(bounds, self.buckets) if n},
+        }
+
+
+_metrics: dict[str, Metric] = {}
+_originals: list[tuple[type, str, object]] = []
+
+
+def _component_name(component) -> str:
+    return component.name
+
+
+def _codec_name(codec) -> str:
+    return codec.component.name
+
+
+def _decoder_name(decoder) -> str:
+    return decoder.codec.component.name
+
+
+def _instrument(cls, name: str, label, per_component: bool):
+    original = cls.__dict__[name]
+    metric_name = f'{cls.__name__}.{name}'
+
+    @functools.wraps(original)
+    def instrumented(self, *args, **kwargs):
+        start = perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            duration = perf_counter() - start
+            key = f'{metric_name}[{label(self)}]' if per_component else metric_name
+            metric = _metrics.get(key)
+            if metric is None:
+                metric = _metrics[key] = Metric()
+            metric.record(duration)
+
+    _originals.append((cls, name, original))
+    setattr(cls, name, instrumented)
+
+
+def _targets():
+    components = [cls for cls in vars(component_implementations).values()
+                  if isinstance(cls, type) and issubclass(cls, DataComponentImpl)]
+    for cls in components + [ComponentInstance]:
+        for name in _COMPONENT_METHODS:
+            if name in cls.__dict__:
+                yield cls, name, _component_name
+    yield DataComponentImpl, 'datastructure_to_dict', _component_name
+    for name in _ARRAY_METHODS:
+        yield component_implementations.DataArrayComponent, name, _component_name
+    for cls in (TextCodec, BinaryCodec):
+        for name in _CODEC_METHODS:
+            yield cls, name, _codec_name
+    for cls in (TextStreamDecoder, BinaryStreamDecoder):
+        for name in _STREAM_DECODER_METHODS:
+            yield cls, name, _decoder_name
+
+
+def enable(per_component: bool = False):
+    """
+    Starts instrumenting the library. Metrics recorded before are kept.
+    :param per_component: when True, metrics are also keyed by the name of the component, or of the component a codec
+        encodes, e.g. "TextCodec.decode_many[weather]", to tell datastreams apart
+    """
+    disable()
+    for cls, name, label in _targets():
+        _instrument(cls, name, label, per_component)
+
+
+def disable():
+    """
+    Stops instrumenting the library, restoring the original methods. Metrics recorded so far are kept.
+    """
+    while _originals:
+        cls, name, original = _originals.pop()
+        setattr(cls, name, original)
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def snapshot(reset: bool = False) -> dict:
+    """
+    Returns the metrics recorded so far as a plain dictionary of metric names, e.g. "QuantityComponent.set_value", to
+    the dictionaries of Metric.to_dict
+    :param reset: when True, the metrics are cleared after being read, so each snapshot covers the period since the last
+    """
+    metrics = {name: metric.to_dict() for (name, metric) in _metrics.items()}
+    if reset:
+        _metrics.clear()
+    return metrics
+
+
+def reset():
+    _metrics.clear()
@@ -0,0 +1,147 @@
+"""
+Conversion between ISO-8601 date-times, or numbers in a unit of time, and the epoch nanoseconds TimeComponents store.
+
+The conversions of dates down to the minute are cached, so converting the samples of a stream mostly costs slicing
+the seconds and their fraction, without creating datetime objects.
+"""
+import re
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+
+
+NANOSECONDS = 1_000_000_000
+"""
+    Nanoseconds in a second
+"""
+
+ISO_8601_UOM = 'http://www.opengis.net/def/uom/ISO-8601/0/Gregorian'
+"""
+    The unit of Time components whose values are written as ISO-8601 date-times
+"""
+
+TIME_UNITS = {
+    'ns': 1,
+    'us': 1_000,
+    'ms': 1_000_000,
+    's': NANOSECONDS,
+    'min': 60 * NANOSECONDS,
+    'h': 3600 * NANOSECONDS,
+    'd': 86400 * NANOSECONDS,
+}
+"""
+    Nanoseconds in each UCUM unit of time that numeric Time values can be written in
+"""
+
+_SECONDS_PER_DAY = 86400
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_ISO_8601 = re.compile(r'(\d{4}-\d{2}-\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d+))?)?)?'
+                       r'(Z|[+-]\d{2}(?::?\d{2})?)?$')
+
+
+@lru_cache(maxsize=4096)
+def _epoch_day(date_text: str) -> int:
+    return date.fromisoformat(date_text).toordinal() - _EPOCH_ORDINAL
+
+
+@lru_cache(maxsize=4096)
+def _minute_seconds(minute_text: str):
+    """
+    Converts "YYYY-MM-DDTHH:MM" to seconds since the epoch, or None if it has another format
+    """
+    if minute_text[10] != 'T' or minute_text[13] != ':':
+        return None
+    match = _ISO_8601.match(minute_text)
+    if match is None:
+        return None
+    return _epoch_day(match[1]) * _SECONDS_PER_DAY + int(match[2]) * 3600 + int(match[3]) * 60
+
+
+@lru_cache(maxsize=4096)
+def _minute_text(epoch_minute: int) -> str:
+    epoch_day, minutes = divmod(epoch_minute, 1440)
+    hour, minute = divmod(minutes, 60)
+    return f'{date.fromordinal(epoch_day + _EPOCH_ORDINAL).isoformat()}T{hour:02d}:{minute:02d}:'
+
+
+def parse_iso8601(text: str) -> int:
+    """
+    Converts an ISO-8601 date or date-time, e.g. "2024-06-13T00:00:00.5Z", to nanoseconds since the epoch. Times
+    without a time zone are UTC, fractions of seconds beyond nanoseconds are truncated.
+    """
+    # Fast path for UTC date-times with seconds, the format of format_iso8601
+    if len(text) >= 20 and text[-1] == 'Z' and text[16] == ':':
+        seconds = _minute_seconds(text[:16])
+        second = text[17:19]
+        if seconds is not None and second.isdigit():
+            if len(text) == 20:
+                return (seconds + int(second)) * NANOSECONDS
+            fraction = text[20:-1]
+            if text[19] in '.,' and fraction.isdigit():
+                return (seconds + int(second)) * NANOSECONDS + int(fraction[:9].ljust(9, '0'))
+
+    match = _ISO_8601.match(text)
+    if match is None:
+        raise ValueError(f'{text!r} is not an ISO-8601 date-time')
+    date_text, hour, minute, second, fraction, zone = match.groups()
+    seconds = _epoch_day(date_text) * _SECONDS_PER_DAY
+    if hour is not None:
+        seconds += int(hour) * 3600 + int(minute) * 60 + (int(second) if second else 0)
+    if zone is not None and zone != 'Z':
+        offset = int(zone[1:3]) * 3600 + int(zone[-2:]) * 60 * (len(zone) > 3)
+        seconds += -offset if zone[0] == '+' else offset
+    ns = seconds * NANOSECONDS
+    if fraction:
+        ns += int(fraction[:9].ljust(9, '0'))
+    return ns
+
+
+def format_iso8601(ns: int) -> str:
+    """
+    Converts nanoseconds since the epoch to a UTC ISO-8601 date-time, e.g. "2024-06-13T00:00:00.5Z". Fractions of
+    seconds are written with as many digits as needed.
+    """
+    seconds, fraction = divmod(ns, NANOSECONDS)
+    epoch_minute, second = divmod(seconds, 60)
+    if fraction:
+        return f'{_minute_text(epoch_minute)}{second:02d}.{fraction:09d}'.rstrip('0') + 'Z'
+    return f'{_minute_text(epoch_minute)}{second:02d}Z'
+
+
+def time_unit_scale(uom: str):
+    """
+    Returns the number of nanoseconds in a Time component's unit, or None if its values are ISO-8601 date-times
+    :param uom: a UCUM code such as "s", or a URI ending with one, or the ISO-8601 unit (the default when None)
+    """
+    if uom is None or uom == ISO_8601_UOM:
+        return None
+    scale = TIME_UNITS.get(uom.rsplit('/', 1)[-1])
+    if scale is None:
+        raise ValueError(f'Unsupported unit of time {uom!r}, expected ISO-8601 or one of {", ".join(TIME_UNITS)}')
+    return scale
+
+
+def format_time_number(ns: int, scale: int, reference: int = 0) -> str:
+    """
+    Converts nanoseconds since the epoch to a number of units of `scale` nanoseconds since `reference`, written
+    exactly, e.g. "1718236800.5" for seconds
+    """
+    ns -= reference
+    if ns % scale == 0:
+        return str(ns // scale)
+    return format(Decimal(ns) / scale, 'f')
+
+
+def parse_time_number(text: str, scale: int, reference: int = 0) -> int:
+    """
+    Converts a number of units of `scale` nanoseconds since `reference` to nanoseconds since the epoch, truncating
+    fractions of nanoseconds
+    """
+    try:
+        return int(text) * scale + reference
+    except ValueError:
+        pass
+    try:
+        return int(Decimal(text) * scale) + reference
+    except ArithmeticError:
+        raise ValueError(f'{text!r} is not a number of units of time') from None
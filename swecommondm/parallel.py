@@ -0,0 +1,179 @@
+"""
+Parallel decoding of large batches of encoded blocks.
+
+The input is copied once into shared memory and split at block boundaries, one range per task. Worker processes
+decode their range and write the values of numeric leaves straight into a shared columnar output buffer, so only the
+values of Text and Category leaves are sent back through pickling.
+"""
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from swecommondm.buffers import BufferLayout
+from swecommondm.encoding import _ESCAPE, BinaryCodec, TextCodec
+
+
+MIN_RANGE_SIZE = 1 << 20
+"""
+    Minimum number of bytes decoded per task. Smaller inputs are decoded in the calling process.
+"""
+
+
+def _to_bytes(codec, data):
+    if isinstance(codec, BinaryCodec):
+        data = codec._to_raw(data)
+        if len(data) % codec.block_size:
+            raise ValueError(f'The data is {len(data)} bytes long, which is not a multiple of the block size '
+                             f'({codec.block_size} bytes)')
+        return data
+    return data.encode('utf-8') if isinstance(data, str) else data
+
+
+def _find_separator(data: bytes, separator: bytes, start: int) -> int:
+    """
+    Returns the position of the first block separator at or after `start` that is not escaped with a backslash, or -1
+    """
+    escape = ord(_ESCAPE)
+    found = data.find(separator, start)
+    while found >= 0:
+        # A separator preceded by an odd number of backslashes is part of a Text or Category value
+        i = found
+        while i > 0 and data[i - 1] == escape:
+            i -= 1
+        if (found - i) % 2 == 0:
+            return found
+        found = data.find(separator, found + 1)
+    return found
+
+
+def _split_ranges(codec, data, parts: int) -> list[tuple[int, int, int]]:
+    """
+    Splits the data at block boundaries into at most `parts` ranges.
+    :return: (start, stop, capacity) of each range, capacity being an upper bound on its number of blocks
+    """
+    if isinstance(codec, BinaryCodec):
+        block_size = codec.block_size
+        count = len(data) // block_size
+        bounds = [count * i // parts for i in range(parts + 1)]
+        return [(a * block_size, b * block_size, b - a) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+    separator = codec.encoding.block_sep.encode('utf-8')
+    ranges = []
+    start = 0
+    for i in range(1, parts + 1):
+        stop = len(data)
+        if i < parts:
+            found = _find_separator(data, separator, max(start, len(data) * i // parts))
+            if found < 0:
+                continue
+            stop = found + len(separator)
+        if stop > start:
+            ranges.append((start, stop, data.count(separator, start, stop) + 1))
+            start = stop
+        if start == len(data):
+            break
+    return ranges
+
+
+def _decode_range(component, encoding, data) -> tuple[int, dict]:
+    codec = encoding.create_codec(component)
+    if isinstance(codec, TextCodec):
+        values = codec.decode_many(bytes(data).decode('utf-8'))
+    else:
+        # Base64 data was already decoded by _to_bytes
+        unflatten = codec._unflatten
+        values = [unflatten(flat, 0)[0] for flat in codec.struct.iter_unpack(data)]
+    layout = BufferLayout(component)
+    columns = layout.allocate(len(values))
+    for i, value in enumerate(values):
+        layout.write(columns, i, value)
+    return len(values), columns
+
+
+def _decode_shared(component, encoding, input_name: str, start: int, stop: int, output_name: str,
+                   offsets: dict[str, int]) -> tuple[int, dict]:
+    source = shared_memory.SharedMemory(name=input_name)
+    try:
+        data = bytes(source.buf[start:stop])
+    finally:
+        source.close()
+    count, columns = _decode_range(component, encoding, data)
+
+    output = shared_memory.SharedMemory(name=output_name)
+    try:
+        for key, offset in offsets.items():
+            raw = columns.pop(key).tobytes()
+            output.buf[offset:offset + len(raw)] = raw
+    finally:
+        output.close()
+    return count, columns
+
+
+def decode_columns(codec, data, workers: int = None, executor: ProcessPoolExecutor = None,
+                   min_range_size: int = MIN_RANGE_SIZE) -> dict:
+    """
+    Decodes every block of a large batch across a pool of processes.
+    :param codec: a TextCodec or BinaryCodec. Text codecs whose token and block separators are the same cannot be split
+        and are decoded in a single task.
+    :param data: the encoded blocks, as bytes or str
+    :param workers: number of tasks to split the data into, defaults to the number of CPUs
+    :param executor: an existing process pool to submit the tasks to, a new one is created otherwise
+    :param min_range_size: minimum number of bytes per task
+    :return: the decoded values as columns keyed by leaf path, in the same form as DataArrayComponent.get_columns, so
+        they can be loaded with set_columns
+    """
+    data = _to_bytes(codec, data)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    parts = max(1, min(workers, len(data) // max(1, min_range_size)))
+    if isinstance(codec, TextCodec) and codec.encoding.block_sep == codec.encoding.token_sep:
+        parts = 1
+    ranges = _split_ranges(codec, data, parts)
+    if len(ranges) <= 1:
+        return _decode_range(codec.component, codec.encoding, data)[1]
+
+    # Numeric columns of each range are written at the offset given by the capacities of the previous ranges
+    layout = BufferLayout(codec.component)
+    total_capacity = sum(capacity for _, _, capacity in ranges)
+    empty = layout.allocate(0)
+    numeric = {key: (empty[key].typecode, empty[key].itemsize * width)
+               for key, _, width in layout.leaves if isinstance(empty[key], array)}
+    bases = {}
+    size = 0
+    for key, (_, row_size) in numeric.items():
+        bases[key] = size
+        size += row_size * total_capacity
+
+    source = shared_memory.SharedMemory(create=True, size=len(data))
+    output = shared_memory.SharedMemory(create=True, size=max(1, size))
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(ranges)))
+    try:
+        source.buf[:len(data)] = data
+        futures = []
+        first = 0
+        for start, stop, capacity in ranges:
+            offsets = {key: bases[key] + first * row_size for key, (_, row_size) in numeric.items()}
+            futures.append((first, executor.submit(_decode_shared, codec.component, codec.encoding, source.name,
+                                                   start, stop, output.name, offsets)))
+            first += capacity
+        results = [(first, future.result()) for first, future in futures]
+
+        columns = {key: array(typecode) for key, (typecode, _) in numeric.items()}
+        columns.update({key: empty[key] for key, _, _ in layout.leaves if key not in numeric})
+        for first, (count, other_columns) in results:
+            for key, (_, row_size) in numeric.items():
+                start = bases[key] + first * row_size
+                columns[key].frombytes(output.buf[start:start + count * row_size])
+            for key, values in other_columns.items():
+                columns[key].extend(values)
+        return columns
+    finally:
+        if own_executor:
+            executor.shutdown()
+        source.close()
+        source.unlink()
+        output.close()
+        output.unlink()
@@ -0,0 +1,336 @@
+"""
+Memory-mapped storage of values described by a SWE Common component.
+
+MappedColumns is a column backend for buffered DataArrayComponents and DataStreamComponents: the leaf columns of their
+elements live in a mapped file instead of in memory, so an array or a record history can be larger than memory, opens
+instantly and is read and written in place by index.
+
+A record file (MappedRecordFile) holds consecutive fixed-size blocks laid out by a compiled BinaryCodec, i.e. exactly
+the raw stream a BinaryEncoding describes, without any header, for exchanging records with other programs.
+"""
+import mmap
+import os
+import struct
+from array import array
+from itertools import islice
+
+from swecommondm.buffers import BUFFER_TYPECODES, BufferLayout, fill_value
+from swecommondm.encoding import BinaryCodec, BinaryEncoding, ByteEncoding
+
+
+WRITE_BATCH_SIZE = 4096
+"""
+    Number of records written per resize of the file when extending it from an iterable of unknown length
+"""
+
+
+FILL_CHUNK_SIZE = 65536
+"""
+    Number of values written at a time when filling mapped columns
+"""
+
+_COLUMNS_MAGIC = b'SWECOL01'
+_COLUMNS_HEADER = struct.Struct('=8sqqq')
+_STATE_OFFSET = struct.calcsize('=8sq')
+_COLUMN_ALIGNMENT = 8
+
+
+class _MappedColumnDict(dict):
+    """
+    The columns of a MappedColumns. Copying or pickling them, e.g. along with the component using them, copies their
+    values into memory rather than sharing the file.
+    """
+
+    def _in_memory(self) -> dict:
+        return {key: array(column.format, column.tobytes()) for (key, column) in self.items()}
+
+    def __reduce__(self):
+        return dict, (self._in_memory(),)
+
+    def __deepcopy__(self, memo):
+        return self._in_memory()
+
+
+class MappedColumns:
+    """
+    Keeps the leaf columns of a buffered component in a memory-mapped file. Pass it as the `storage` of
+    DataArrayComponent.set_component_template_and_size or of a DataStreamComponent; their columns are then memoryviews
+    over the file, read and written in place like the array.array columns of an in-memory component.
+
+    The file starts with a header holding the number of template instances and the position of a stream, followed by
+    each leaf column in turn in native byte order. Only Boolean, Count, Quantity and Time leaves can be mapped, as the
+    other leaves have no fixed size. Mapped columns have a fixed length, so arrays using them cannot be extended.
+    """
+
+    def __init__(self, path, writable: bool = True):
+        """
+        :param path: path of the file, created by `open` if it does not exist
+        :param writable: when False, the file is mapped read-only
+        """
+        self.path = path
+        self.writable = writable
+        self.count = 0
+        self.columns: dict = None
+        self.state: memoryview = None
+        """
+            Two integers kept in the header for the component using the columns, a stream's next slot and record count
+        """
+        self._file = None
+        self._map = None
+        self._views: list[memoryview] = []
+
+    @staticmethod
+    def _regions(layout: BufferLayout, count: int):
+        # (key, typecode, offset, size in bytes) of each column, and the size of the file
+        regions = []
+        offset = _COLUMNS_HEADER.size
+        for (key, leaf, width) in layout.leaves:
+            typecode = BUFFER_TYPECODES.get(leaf.swe_type)
+            if typecode is None:
+                raise ValueError(f'Leaf "{key}" is a {leaf.swe_type.value} component, whose values cannot be mapped')
+            size = width * count * array(typecode).itemsize
+            regions.append((key, typecode, offset, size))
+            offset += -(-size // _COLUMN_ALIGNMENT) * _COLUMN_ALIGNMENT
+        return regions, offset
+
+    def open(self, layout: BufferLayout, count: int = None) -> dict:
+        """
+        Maps the columns of `count` instances of a template. An existing file is opened as it is and must hold `count`
+        instances, if given. Otherwise, a new file is created for `count` instances, each filled with the template's
+        values.
+        :param layout: the compiled template, e.g. BufferLayout(data_array.element_type)
+        :param count: the number of template instances, only optional when opening an existing file
+        :return: dictionary of leaf paths to columns, in the form of BufferLayout.allocate
+        """
+        self.close()
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            self._file = open(self.path, 'r+b' if self.writable else 'rb')
+            magic, stored_count, _, _ = _COLUMNS_HEADER.unpack(self._file.read(_COLUMNS_HEADER.size))
+            if magic != _COLUMNS_MAGIC:
+                self._file.close()
+                raise ValueError(f'{self.path} is not a file of mapped columns')
+            if count is not None and count != stored_count:
+                self._file.close()
+                raise ValueError(f'{self.path} holds {stored_count} instances, not {count}')
+            regions, size = self._regions(layout, stored_count)
+            if os.fstat(self._file.fileno()).st_size != size:
+                self._file.close()
+                raise ValueError(f'{self.path} does not match the layout of the template')
+            self._map_file(regions, size, stored_count)
+        else:
+            if count is None:
+                raise FileNotFoundError(f'{self.path} does not exist, a count is needed to create it')
+            if not self.writable:
+                raise ValueError(f'{self.path} does not exist and cannot be created read-only')
+            regions, size = self._regions(layout, count)
+            self._file = open(self.path, 'w+b')
+            self._file.truncate(size)
+            self._map_file(regions, size, count)
+            _COLUMNS_HEADER.pack_into(self._map, 0, _COLUMNS_MAGIC, count, 0, 0)
+            self._fill(layout, skip_zeros=True)
+        return self.columns
+
+    def _map_file(self, regions, size: int, count: int):
+        access = mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ
+        self._map = mmap.mmap(self._file.fileno(), size, access=access)
+        self.count = count
+        root = memoryview(self._map)
+        self.columns = _MappedColumnDict((key, root[offset:offset + length].cast(typecode))
+                                         for (key, typecode, offset, length) in regions)
+        self.state = root[_STATE_OFFSET:_COLUMNS_HEADER.size].cast('q')
+        self._views = [root, self.state, *self.columns.values()]
+
+    def _fill(self, layout: BufferLayout, skip_zeros: bool = False):
+        for (key, leaf, _) in layout.leaves:
+            column = self.columns[key]
+            value = fill_value(leaf)
+            if skip_zeros and not value:
+                continue
+            chunk = array(column.format, [value]) * min(FILL_CHUNK_SIZE, len(column))
+            for start in range(0, len(column), FILL_CHUNK_SIZE):
+                stop = min(start + FILL_CHUNK_SIZE, len(column))
+                column[start:stop] = chunk if stop - start == len(chunk) else chunk[:stop - start]
+
+    def reset(self, layout: BufferLayout):
+        """
+        Fills every column with the template's values again and clears the state
+        """
+        self._fill(layout)
+        self.state[0] = self.state[1] = 0
+
+    def flush(self):
+        if self._map is not None and self.writable:
+            self._map.flush()
+
+    def close(self):
+        """
+        Unmaps the file. The columns cannot be used afterwards, and the file cannot be closed while views of them, such
+        as the memoryviews returned by DataArrayComponent.get_buffer, are in use.
+        """
+        if self._map is None:
+            return
+        self.flush()
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self.columns = self.state = None
+        self._map.close()
+        self._map = None
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class MappedRecordFile:
+    """
+    A file of records, each the binary encoding of a value of `component`. Use `create` to start a new file, or the
+    constructor to open an existing one.
+    """
+
+    def __init__(self, path, component, encoding: BinaryEncoding = None, writable: bool = False):
+        """
+        :param path: path of an existing file
+        :param component: the component describing one record, e.g. the element type of a DataArray or DataStream
+        :param encoding: the binary encoding of the records, defaults to raw little endian with default data types
+        :param writable: when True, records can be changed and added
+        """
+        if encoding is None:
+            encoding = BinaryEncoding()
+        if encoding.byte_encoding is not ByteEncoding.RAW:
+            raise ValueError('Only raw binary encodings can be memory-mapped')
+        self.path = path
+        self.codec = BinaryCodec(component, encoding)
+        self.block_size = self.codec.block_size
+        self.writable = writable
+        self._file = open(path, 'r+b' if writable else 'rb')
+        self._map = None
+        self._count = 0
+
+        size = os.fstat(self._file.fileno()).st_size
+        if size % self.block_size:
+            self._file.close()
+            raise ValueError(f'{path} is {size} bytes long, which is not a multiple of the record size '
+                             f'({self.block_size} bytes)')
+        self._remap(size // self.block_size)
+
+    @classmethod
+    def create(cls, path, component, encoding: BinaryEncoding = None):
+        """
+        Creates an empty, writable record file, replacing any existing file at `path`
+        """
+        open(path, 'wb').close()
+        return cls(path, component, encoding, writable=True)
+
+    @classmethod
+    def from_array(cls, path, data_array, encoding: BinaryEncoding = None):
+        """
+        Creates a record file holding the elements of a DataArrayComponent, one record per element
+        """
+        records = cls.create(path, data_array.element_type, encoding)
+        records.extend(element.get_value() for element in data_array.components)
+        return records
+
+    @classmethod
+    def from_stream(cls, path, data_stream, encoding: BinaryEncoding = None):
+        """
+        Creates a record file holding the record history of a DataStreamComponent, oldest first. The stream's own
+        encoding is used when it is a raw binary encoding and no other is given.
+        """
+        if encoding is None and isinstance(data_stream.encoding, BinaryEncoding) \
+                and data_stream.encoding.byte_encoding is ByteEncoding.RAW:
+            encoding = data_stream.encoding
+        records = cls.create(path, data_stream.element_type, encoding)
+        records.extend(data_stream.get_window(len(data_stream)))
+        return records
+
+    def _remap(self, count: int):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if count:
+            access = mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ
+            self._map = mmap.mmap(self._file.fileno(), count * self.block_size, access=access)
+        self._count = count
+
+    def _resize(self, count: int):
+        if not self.writable:
+            raise ValueError(f'{self.path} was not opened as writable')
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.truncate(count * self.block_size)
+        self._remap(count)
+
+    def _offset(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('record index out of range')
+        return index * self.block_size
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step == 1:
+                return self.read_many(start, stop)
+            return [self.codec.decode(self._map, i * self.block_size) for i in range(start, stop, step)]
+        return self.codec.decode(self._map, self._offset(index))
+
+    def __setitem__(self, index: int, value):
+        if not self.writable:
+            raise ValueError(f'{self.path} was not opened as writable')
+        self.codec.encode_into(self._map, self._offset(index), value)
+
+    def __iter__(self):
+        for start in range(0, self._count, WRITE_BATCH_SIZE):
+            yield from self.read_many(start, min(start + WRITE_BATCH_SIZE, self._count))
+
+    def read_many(self, start: int = 0, stop: int = None) -> list:
+        """
+        Decodes the records from `start` up to, but not including, `stop`
+        """
+        if stop is None:
+            stop = self._count
+        if start >= stop:
+            return []
+        with memoryview(self._map) as view:
+            return self.codec.decode_many(view[start * self.block_size:stop * self.block_size])
+
+    def append(self, value):
+        self.extend((value,))
+
+    def extend(self, values):
+        """
+        Appends records, growing the file once per batch of records
+        """
+        values = iter(values)
+        while batch := list(islice(values, WRITE_BATCH_SIZE)):
+            start = self._count
+            self._resize(start + len(batch))
+            for i, value in enumerate(batch, start):
+                self.codec.encode_into(self._map, i * self.block_size, value)
+
+    def flush(self):
+        if self._map is not None and self.writable:
+            self._map.flush()
+
+    def close(self):
+        self.flush()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -123,3 +123,16 @@ def test_nested_comp_data_array_3():
                                    value=1920)
     comp.set_component_template_and_size(element_count.get_value(), element_type)
     return comp
+
+
+@pytest.fixture
+def test_buffered_nested_comp_data_array():
+    comp = DataArrayComponent(name='test-data-array', label='Test DataArray', description='Test Description',
+                              definition='www.test.org/test/data-array')
+    element_type = DataArrayComponent(name='array-element', label='Array Element',
+                                      definition='www.test.org/test/array-element-da')
+    element_type.set_component_template_and_size(1080, CountComponent(name='array-element', label='Array Element',
+                                                                       definition='www.test.org/test/array-element-text'),
+                                                  buffered=True)
+    comp.set_component_template_and_size(1920, element_type, buffered=True)
+    return comp
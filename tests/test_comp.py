@@ -1,6 +1,14 @@
+import copy
+import json
 import time
+from uuid import UUID
 
-from swecommondm import SWEDataTypes
+import pytest
+
+from swecommondm import AllowedTokens, AllowedValues, SWEDataTypes, sequential_uuid_factory, set_uuid_factory
+from swecommondm.component_implementations import DataArrayComponent, MatrixComponent, QuantityComponent, \
+    TimeComponent
+from swecommondm.iso8601 import NANOSECONDS, format_iso8601, parse_iso8601
 
 
 def test_bool_component(test_bool_comp):
@@ -82,6 +90,34 @@ def test_time_component(test_time_comp):
     assert comp.local_frame == time.gmtime(0)
 
 
+def test_time_iso8601(test_time_comp):
+    comp = test_time_comp
+    comp.set_value('2024-06-13T00:00:00.123456789Z')
+    assert comp.get_value() == 1718236800_123456789
+    assert comp.get_iso_value() == '2024-06-13T00:00:00.123456789Z'
+    comp.set_value('2024-06-13T02:30:00+02:30')
+    assert comp.get_iso_value() == '2024-06-13T00:00:00Z'
+    comp.set_value('2024-06-13')
+    assert comp.get_value() == 1718236800 * NANOSECONDS
+
+    assert parse_iso8601('1969-12-31T23:59:59.5Z') == -NANOSECONDS // 2
+    assert format_iso8601(-NANOSECONDS // 2) == '1969-12-31T23:59:59.5Z'
+    assert TimeComponent(name='t', label='T', value='1970-01-01T00:00:01Z').value == NANOSECONDS
+    with pytest.raises(ValueError):
+        parse_iso8601('13/06/2024')
+
+    # Floats such as epoch seconds are rejected, as they are by array buffers, rather than taken for nanoseconds
+    with pytest.raises(TypeError):
+        comp.set_value(1718236800.5)
+    with pytest.raises(TypeError):
+        TimeComponent(name='t', label='T', value=1.0)
+    with pytest.raises(TypeError):
+        comp.create_instance().set_value(1718236800.5)
+    instance = comp.create_instance()
+    instance.set_value('1970-01-01T00:00:01Z')
+    assert instance.get_value() == NANOSECONDS
+
+
 def test_datarecord_component(test_comp_datarecord):
     comp = test_comp_datarecord
     assert comp.name == 'test-datarecord'
@@ -90,3 +126,169 @@ def test_datarecord_component(test_comp_datarecord):
     assert comp.description == 'Test Description'
     assert comp.swe_type.value == SWEDataTypes.DATA_RECORD.value
     assert comp.extension is None
+
+
+def test_lazy_uuid(test_quantity_comp):
+    comp = test_quantity_comp
+    assert comp._DataComponentImpl__uuid is None
+    comp_uuid = comp.get_uuid()
+    assert isinstance(comp_uuid, UUID)
+    assert comp.get_uuid() == comp_uuid
+    assert copy.deepcopy(comp).get_uuid() != comp_uuid
+
+
+def test_uuid_factory(test_comp_vector):
+    set_uuid_factory(sequential_uuid_factory())
+    try:
+        first = test_comp_vector.get_uuid()
+        second = test_comp_vector.coordinates['Lat'].get_uuid()
+        assert second.int == first.int + 1
+    finally:
+        set_uuid_factory()
+    assert test_comp_vector.coordinates['Lon'].get_uuid().version == 4
+
+
+def test_schema_cache(test_comp_datarecord, test_quantity_comp):
+    record = test_comp_datarecord
+    record.add_field(test_quantity_comp)
+    schema = record.datastructure_to_dict()
+    schema_json = record.datastructure_to_json()
+    assert json.loads(schema_json) == schema
+    assert record.datastructure_to_json() is schema_json
+
+    # Callers get their own copy of the cached schema
+    schema['label'] = 'X'
+    schema['fields'][0]['label'] = 'X'
+    assert record.datastructure_to_dict()['label'] == 'Test DataRecord'
+    assert record.datastructure_to_dict()['fields'][0]['label'] == 'Test Quantity'
+    shared = record.datastructure_to_dict(shared=True)
+    assert record.datastructure_to_dict(shared=True) is shared and shared['label'] == 'Test DataRecord'
+
+    test_quantity_comp.set_value(1.0)
+    assert record.datastructure_to_json() is schema_json
+
+    # Unrelated components do not invalidate the cache
+    other = AllowedValues(value={1.0})
+    other.add_value(3.0)
+    QuantityComponent(name='other', label='Other', definition='www.test.org/test/other', constraint=other).uom = 'm'
+    assert record.datastructure_to_json() is schema_json
+
+    test_quantity_comp.uom = 'm'
+    assert record.datastructure_to_dict()['fields'][0]['uom'] == {'code': 'm'}
+    assert record.datastructure_to_dict(shared=True) is not shared
+
+    test_quantity_comp.set_allowed_values(AllowedValues(value={1.0}))
+    test_quantity_comp.constraint.add_value(2.0)
+    assert json.loads(record.datastructure_to_json())['fields'][0]['constraint'] == {'value': [1.0, 2.0]}
+
+
+def test_allowed_values():
+    constraint = AllowedValues(value={-1}, interval=range(0, 11), significant_figures=3)
+    assert constraint.is_valid(10)
+    assert constraint.is_valid(-1)
+    assert constraint.is_valid(2.5)
+    assert not constraint.is_valid(11)
+    assert not constraint.is_valid(2.555)
+    assert constraint.find_invalid([0, 5, 12, -1, 2.555]) == [2, 4]
+
+    constraint.interval = [0.0, 1.0]
+    constraint.significant_figures = None
+    assert not constraint.is_valid(5)
+    assert constraint.find_invalid([0.5, 0.25]) == []
+
+
+def test_allowed_tokens():
+    constraint = AllowedTokens(value={'ok', 'fault'}, pattern=r'ERR-\d+')
+    assert constraint.is_valid('ok')
+    assert constraint.is_valid('ERR-42')
+    assert not constraint.is_valid('ERR-42x')
+    assert constraint.find_invalid(['ok', 'bad', None, 'ERR-1', 'bad']) == [1, 4]
+
+    constraint.add_value('bad')
+    assert constraint.find_invalid(['ok', 'bad']) == []
+
+
+def test_set_value_validation(test_comp_datarecord, test_count_comp, test_text_comp):
+    test_count_comp.set_allowed_values(AllowedValues(interval=range(0, 100)))
+    test_text_comp.constraint = AllowedTokens(pattern='[a-z]+')
+    test_comp_datarecord.add_field(test_count_comp)
+    test_comp_datarecord.add_field(test_text_comp)
+
+    test_comp_datarecord.set_value({'test-count': 200})
+    test_comp_datarecord.enable_validation()
+    test_comp_datarecord.set_value({'test-count': 50, 'test-text': 'abc'})
+    with pytest.raises(ValueError):
+        test_comp_datarecord.set_value({'test-count': 100})
+    with pytest.raises(ValueError):
+        test_text_comp.set_value('ABC')
+    assert test_comp_datarecord.get_value() == {'test-count': 50, 'test-text': 'abc'}
+
+    # Nothing is set when any value is invalid
+    with pytest.raises(ValueError):
+        test_comp_datarecord.set_value({'test-count': 60, 'test-text': 'ABC'})
+    assert test_comp_datarecord.get_value() == {'test-count': 50, 'test-text': 'abc'}
+
+    # Fields added later are validated too
+    late = copy.deepcopy(test_count_comp)
+    late.name = 'late'
+    test_comp_datarecord.add_field(late)
+    with pytest.raises(ValueError):
+        late.set_value(-1)
+
+
+def test_change_tracking(test_comp_datarecord, test_comp_vector, test_count_comp, test_quantity_comp):
+    samples = DataArrayComponent(name='samples', label='Samples', definition='www.test.org/test/samples')
+    samples.set_component_template_and_size(3, test_quantity_comp, buffered=True)
+    test_comp_datarecord.add_field(test_comp_vector)
+    test_comp_datarecord.add_field(samples)
+    with pytest.raises(ValueError):
+        test_comp_datarecord.get_changes()
+
+    test_comp_datarecord.track_changes()
+    assert test_comp_datarecord.get_changes() == {}
+    test_comp_datarecord.set_value({'test-vector.Lat': 1.0})
+    test_comp_vector.coordinates['Lat'].set_value(2.0)
+    samples.components[1].set_value(5.0)
+    assert test_comp_datarecord.get_changes() == {test_comp_vector.coordinates['Lat'].get_uuid(): 2.0,
+                                                  (samples.get_uuid(), 1): 5.0}
+    assert test_comp_datarecord.get_changes() == {}
+
+    # Unchanged values, and values set back to the last collected one, are not reported
+    test_comp_vector.coordinates['Lat'].set_value(2.0)
+    samples.set_value([0.0, 5.0, 7.0])
+    lon = test_comp_vector.coordinates['Lon']
+    original_lon = lon.get_value()
+    lon.set_value(9.0)
+    lon.set_value(original_lon)
+    assert test_comp_datarecord.get_changes() == {(samples.get_uuid(), 2): 7.0}
+
+    test_comp_datarecord.add_field(test_count_comp)
+    test_count_comp.set_value(3)
+    assert test_comp_datarecord.get_changes() == {test_count_comp.get_uuid(): 3}
+    copy.deepcopy(test_count_comp).set_value(4)
+    assert test_comp_datarecord.get_changes() == {}
+
+    test_comp_datarecord.track_changes(False)
+    with pytest.raises(ValueError):
+        test_comp_datarecord.get_changes()
+
+
+def test_change_tracking_buffered(test_nested_comp_data_array_1):
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(3, test_nested_comp_data_array_1.element_type, buffered=True)
+    d_arr.track_changes()
+    d_arr.components[2]['f2'].set_value(4.0)
+    d_arr.set_columns({'f1': ['A', None, None]})
+    assert d_arr.get_changes() == {(d_arr.get_uuid(), 2): {'f1': None, 'f2': 4.0},
+                                   (d_arr.get_uuid(), 0): {'f1': 'A', 'f2': 0.0}}
+
+    matrix = MatrixComponent(name='m', label='M', definition='www.test.org/test/m', shape=(2, 2),
+                             element_type=QuantityComponent(name='c', label='C', definition='www.test.org/test/c'))
+    matrix.track_changes()
+    matrix.row(0)[1] = 0.0
+    matrix.set_value([[0.0, 0.0], [0.0, 0.0]])
+    assert matrix.get_changes() == {}
+    matrix.column(1).set_value([1.0, 2.0])
+    assert matrix.get_changes() == {matrix.get_uuid(): [[0.0, 1.0], [0.0, 2.0]]}
+    matrix[1, 0] = 3.0
+    assert matrix.get_changes() == {matrix.get_uuid(): [[0.0, 1.0], [3.0, 2.0]]}
@@ -1,4 +1,12 @@
+import copy
 import json
+from array import array
+
+import pytest
+
+from swecommondm import AllowedTokens, AllowedValues
+from swecommondm.buffers import MISSING_CODE, DictionaryColumn
+from swecommondm.component_implementations import DataArrayComponent, DataRecordComponent
 
 
 def test_data_array(test_comp_data_array):
@@ -41,3 +49,312 @@ def test_da_nested_3(test_nested_comp_data_array_3):
         values.append(inner_values)
 
     d_arr.set_value(values)
+
+
+def test_da_buffered(test_quantity_comp):
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(3, test_quantity_comp, buffered=True)
+    assert d_arr.is_buffered()
+    assert d_arr.get_value() == [0.0, 0.0, 0.0]
+
+    d_arr.set_value([1, 2, 3])
+    assert d_arr.get_value() == [1.0, 2.0, 3.0]
+    assert len(d_arr.components) == 3
+    assert d_arr.components[-1].get_value() == 3.0
+    assert d_arr.components[0].name == 'test-quantity'
+
+    d_arr.components[1].set_value(5.5)
+    assert d_arr.get_value() == [1.0, 5.5, 3.0]
+    assert d_arr.components[1].value == 5.5 and test_quantity_comp.value is None
+    d_arr.components[2].value = 4.0
+    assert d_arr.get_value() == [1.0, 5.5, 4.0]
+    assert d_arr.components[2].get_uuid() == (d_arr.get_uuid(), 2) != d_arr.components[1].get_uuid()
+    assert d_arr.components[2].get_uuid_value_map() == {(d_arr.get_uuid(), 2): 4.0}
+
+
+def test_da_buffered_records(test_text_comp, test_bool_comp):
+    element_type = DataRecordComponent(name='array-element', label='Array Element',
+                                       definition='www.test.org/test/array-element-dr')
+    element_type.add_field(test_text_comp)
+    element_type.add_field(test_bool_comp)
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(2, element_type, buffered=True)
+
+    values = [{'test-text': 'A', 'test-bool': True}, {'test-text': 'B', 'test-bool': False}]
+    d_arr.set_value(values)
+    assert d_arr.get_value() == values
+    assert d_arr.components[1]['test-text'].get_value() == 'B'
+    assert d_arr.components[1]['test-text'].value == 'B'
+    with pytest.raises(TypeError):
+        d_arr.components[1]['test-text'].get_uuid()
+
+    d_arr.add_component(copy.deepcopy(element_type))
+    assert d_arr.element_count.value == 3
+    assert d_arr.get_value()[2] == {'test-text': None, 'test-bool': False}
+
+
+def test_da_buffered_vectors(test_comp_vector):
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(2, test_comp_vector, buffered=True)
+    values = [{'Lat': 0.0, 'Lon': 0.0, 'Alt': 0.0}, {'Lat': 34.74, 'Lon': -86.60, 'Alt': 190}]
+    d_arr.set_value(values)
+    assert d_arr.get_value() == values
+
+
+def test_da_buffered_nested(test_buffered_nested_comp_data_array):
+    d_arr = test_buffered_nested_comp_data_array
+    values = [list(range(1080)) for _ in range(1920)]
+
+    d_arr.set_value(values)
+    assert d_arr.get_value() == values
+    assert d_arr.components[10][20].get_value() == 20
+
+    d_arr.components[10][20].set_value(-1)
+    assert d_arr.components[10].get_value()[20] == -1
+    assert d_arr.get_value()[11][20] == 20
+
+
+def test_da_columns(test_comp_vector):
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(3, test_comp_vector, buffered=True)
+    d_arr.set_columns({'Lat': [1.0, 2.0, 3.0], 'Lon': array('d', [4.0, 5.0, 6.0])})
+    assert d_arr.get_value()[1] == {'Lat': 2.0, 'Lon': 5.0, 'Alt': 0.0}
+
+    columns = d_arr.get_columns()
+    assert columns['Lat'].tolist() == [1.0, 2.0, 3.0]
+    columns['Lat'][0] = -1.0
+    assert d_arr.get_value()[0]['Lat'] == 1.0
+
+    with pytest.raises(ValueError):
+        d_arr.set_columns({'Lat': [1.0]})
+    with pytest.raises(KeyError):
+        d_arr.set_columns({'unknown': [1.0, 2.0, 3.0]})
+
+
+def test_da_dictionary_columns(test_category_comp, test_text_comp):
+    test_category_comp.set_allowed_values(AllowedTokens(value={'OK', 'FAULT'}))
+    record = DataRecordComponent(name='status', label='Status', definition='www.test.org/test/status')
+    record.add_field(test_category_comp)
+    test_text_comp.enable_dictionary_encoding()
+    record.add_field(test_text_comp)
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(4, record, buffered=True)
+
+    values = [{'test-category': token, 'test-text': 'unit-1'} for token in ['OK', 'FAULT', 'OK', 'BAD']]
+    d_arr.set_value(values)
+    assert d_arr.get_value() == values
+    columns = d_arr.get_columns()
+    flags = columns['test-category']
+    assert isinstance(flags, DictionaryColumn) and isinstance(columns['test-text'], DictionaryColumn)
+    assert flags == ['OK', 'FAULT', 'OK', 'BAD'] and flags == ('OK', 'FAULT', 'OK', 'BAD') and flags != 'OKFAULTOKBAD'
+    assert flags == columns['test-category'] and flags == d_arr.get_columns()['test-category']
+    # Code 0 is reserved for missing values, the copy's table only holds the values it uses
+    assert flags.table.values == [None, 'FAULT', 'OK', 'BAD'] and len(flags.table) == 3
+    assert flags.codes.tolist() == [2, 1, 2, 3]
+    assert flags.count('OK') == 2 and flags.indices('FAULT') == [1] and 'missing' not in flags
+    assert d_arr.find_invalid_values() == {'test-category': [3]}
+
+    clone = d_arr.clone()
+    clone.components[0]['test-category'].set_value('FAULT')
+    assert clone.get_columns()['test-category'].table is not flags.table
+    assert d_arr.get_value()[0]['test-category'] == 'OK'
+
+    flags[1] = None
+    assert flags.codes[1] == MISSING_CODE and None in flags and flags.count(None) == 1
+    assert flags.table.values[1] == 'FAULT'
+    flags.compact()
+    assert flags.table.values == [None, 'OK', 'BAD'] and flags == ['OK', None, 'OK', 'BAD']
+
+    # Codes are widened once the table outgrows 16 bits
+    assert flags.codes.typecode == 'H'
+    flags.extend(str(i) for i in range(70000))
+    assert flags.codes.typecode == 'l'
+    assert flags[:4] == ['OK', None, 'OK', 'BAD'] and flags[-1] == '69999'
+
+    # Overwritten values are dropped from the table once it grows far past the column
+    churn = DictionaryColumn()
+    churn.extend([None] * 4)
+    for i in range(5000):
+        churn[i % 4] = f'reading-{i}'
+    assert churn == ['reading-4996', 'reading-4997', 'reading-4998', 'reading-4999']
+    assert len(churn.table) < 1100
+
+
+def test_da_columns_unbuffered(test_nested_comp_data_array_1):
+    d_arr = test_nested_comp_data_array_1
+    d_arr.set_value([{'f1': 'A', 'f2': 1.0}, {'f1': 'B', 'f2': 2.0}])
+    d_arr.set_columns({'f2': [3.0, 4.0]})
+    assert d_arr.get_value() == [{'f1': 'A', 'f2': 3.0}, {'f1': 'B', 'f2': 4.0}]
+    assert d_arr.get_columns()['f1'] == ['A', 'B']
+
+
+def test_da_structured_array(test_nested_comp_data_array_1):
+    np = pytest.importorskip('numpy')
+    d_arr = test_nested_comp_data_array_1
+    d_arr.set_value([{'f1': 'A', 'f2': 1.0}, {'f1': 'B', 'f2': 2.0}])
+    structured = d_arr.to_structured_array()
+    assert structured['f2'].tolist() == [1.0, 2.0]
+
+    structured['f2'] = np.array([5.0, 6.0])
+    d_arr.set_columns(structured)
+    assert d_arr.get_value()[1] == {'f1': 'B', 'f2': 6.0}
+
+
+def test_da_buffer(test_buffered_nested_comp_data_array, test_comp_vector):
+    d_arr = test_buffered_nested_comp_data_array
+    buffer = d_arr.get_buffer()
+    assert buffer.shape == (1920, 1080)
+    buffer[10, 20] = 7
+    assert d_arr.components[10][20].get_value() == 7
+    with pytest.raises(BufferError):
+        d_arr.add_component(copy.deepcopy(d_arr.element_type))
+    buffer.release()
+
+    records = DataArrayComponent(name='test-data-array', label='Test DataArray',
+                                 definition='www.test.org/test/data-array')
+    records.set_component_template_and_size(2, test_comp_vector, buffered=True)
+    assert records.get_buffer('Lat').shape == (2,)
+    with pytest.raises(ValueError):
+        records.get_buffer()
+
+
+def test_da_array_interface(test_buffered_nested_comp_data_array, test_nested_comp_data_array_1):
+    np = pytest.importorskip('numpy')
+    d_arr = test_buffered_nested_comp_data_array
+    wrapped = np.asarray(d_arr)
+    assert wrapped.shape == (1920, 1080)
+    assert wrapped.dtype == np.int64
+    wrapped[1, 2] = 5
+    assert d_arr.components[1][2].get_value() == 5
+
+    assert not hasattr(test_nested_comp_data_array_1, '__array_interface__')
+
+
+def test_da_validation(test_quantity_comp):
+    test_quantity_comp.set_allowed_values(AllowedValues(interval=range(-90, 91)))
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(4, test_quantity_comp, buffered=True)
+    d_arr.set_value([0.0, 95.0, -91.0, 45.0])
+    assert d_arr.find_invalid_values() == {'': [1, 2]}
+
+    d_arr.enable_validation()
+    d_arr.set_value([1.0, 2.0])
+    with pytest.raises(ValueError):
+        d_arr.set_value([1.0, 2.0, 100.0])
+    with pytest.raises(ValueError):
+        d_arr.set_columns({'': [1.0, 2.0, 3.0, 100.0]})
+    with pytest.raises(ValueError):
+        d_arr.components[3].set_value(100.0)
+    with pytest.raises(ValueError):
+        d_arr.set_flat_values([1.0, 2.0, 3.0, 100.0])
+    assert d_arr.get_value() == [1.0, 2.0, -91.0, 45.0]
+
+
+def test_da_validation_buffered_records(test_nested_comp_data_array_1):
+    template = test_nested_comp_data_array_1.element_type
+    template.get_field('f1').constraint = AllowedTokens(value={'A', 'B'})
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(2, template, buffered=True)
+    d_arr.enable_validation()
+    before = d_arr.get_value()
+    with pytest.raises(ValueError):
+        d_arr.set_value([{'f1': 'A'}, {'f1': 'C'}])
+    with pytest.raises(ValueError):
+        d_arr.components[0]['f1'].set_value('C')
+    with pytest.raises(ValueError):
+        d_arr.set_columns({'f1': ['C'] * d_arr.element_count.value})
+    assert d_arr.get_value() == before
+
+
+def test_da_validation_unbuffered(test_nested_comp_data_array_1):
+    d_arr = test_nested_comp_data_array_1
+    d_arr.element_type.get_field('f1').constraint = AllowedTokens(value={'A', 'B'})
+    for comp in d_arr.components:
+        comp.get_field('f1').constraint = d_arr.element_type.get_field('f1').constraint
+    d_arr.set_value([{'f1': 'A', 'f2': 1}, {'f1': 'C', 'f2': 2}])
+    assert d_arr.find_invalid_values() == {'f1': [1]}
+
+    d_arr.enable_validation()
+    with pytest.raises(ValueError):
+        d_arr.set_value([{'f1': 'D', 'f2': 1}])
+
+
+def test_da_compact(test_count_comp):
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(3, test_count_comp, compact=True)
+    assert d_arr.element_count.value == 3
+    d_arr.set_value([1, 2, 3])
+    assert d_arr.get_value() == [1, 2, 3]
+
+    first, second = d_arr.components[0], d_arr.components[1]
+    assert not hasattr(first, '__dict__')
+    assert first.get_template() is second.get_template() is test_count_comp
+    assert first.name == 'test-count'
+    assert first.datastructure_to_dict() == test_count_comp.datastructure_to_dict()
+    assert first.get_uuid() != second.get_uuid()
+    assert len(d_arr.get_uuid_value_map()) == 3
+
+    first.label = 'Changed'
+    assert first.label == 'Changed'
+    assert second.label == test_count_comp.label == 'Test Count'
+    assert first.get_value() == 1
+
+    test_count_comp.set_allowed_values(AllowedValues(interval=range(0, 10)))
+    d_arr.enable_validation()
+    with pytest.raises(ValueError):
+        d_arr.set_value([1, 20])
+    assert copy.deepcopy(d_arr).get_value() == [1, 2, 3]
+
+
+def test_da_compact_instances(test_count_comp, test_nested_comp_data_array_1):
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(2, test_count_comp, compact=True)
+    d_arr.add_component(test_count_comp.create_instance())
+    assert len(d_arr.components) == 3
+    d_arr.set_value([1, 2, 3])
+    assert d_arr.get_value() == [1, 2, 3]
+
+    record = DataRecordComponent(name='holder', label='Holder', definition='www.test.org/test/holder')
+    record.add_field(test_count_comp.create_instance())
+    record.get_field('test-count').set_value(7)
+    assert record.get_value() == {'test-count': 7}
+    assert record.datastructure_to_dict()['fields'][0]['name'] == 'test-count'
+
+    element = test_nested_comp_data_array_1.element_type
+    records = DataArrayComponent(name='records', label='Records', definition='www.test.org/test/records')
+    records.set_component_template_and_size(2, element, compact=True)
+    records.set_value([{'f1': 'A', 'f2': 1}, {'f1': 'B', 'f2': 2}])
+    assert records.get_value() == [{'f1': 'A', 'f2': 1}, {'f1': 'B', 'f2': 2}]
+    first, second = records.components
+    assert all(type(leaf).__name__ == 'ComponentInstance' for leaf in first.fields)
+    assert first.fields[0].get_template() is second.fields[0].get_template()
+
+
+def test_compact_instance_isolation(test_count_comp, test_nested_comp_data_array_1):
+    test_count_comp.set_allowed_values(AllowedValues(interval=range(0, 10)))
+    instance = test_count_comp.create_instance()
+    instance.enable_validation()
+    with pytest.raises(ValueError):
+        instance.set_value(50)
+    test_count_comp.set_value(50)
+    test_count_comp.create_instance().set_value(50)
+
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(2, test_count_comp, compact=True)
+    d_arr.enable_validation()
+    other = DataArrayComponent(name='other', label='Other', definition='www.test.org/test/other')
+    other.set_component_template_and_size(2, test_count_comp, compact=True)
+    other.set_value([50, 60])
+
+    instance.label = 'Own'
+    copied = copy.deepcopy(instance)
+    instance.label = 'Changed'
+    assert copied.label == 'Own' and test_count_comp.label == 'Test Count'
+
+    element = test_nested_comp_data_array_1.element_type
+    record = element.create_instance()
+    assert record.datastructure_to_dict()['fields'][0]['label'] == element.fields[0].label
+    element.fields[0].label = 'CHANGED'
+    assert record.fields[0].label != 'CHANGED'
+    assert record.datastructure_to_dict()['fields'][0]['label'] == record.fields[0].label
+    assert element.create_instance().fields[0].label == 'CHANGED'
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from swecommondm import AllowedValues
+from swecommondm.component_implementations import DataRecordComponent, DataStreamComponent, QuantityComponent, \
+    TimeComponent, from_json
+from swecommondm.encoding import BinaryCodec, BinaryEncoding, TextEncoding
+
+
+@pytest.fixture
+def test_stream():
+    record = DataRecordComponent(name='obs', label='Observation', definition='www.test.org/test/obs')
+    record.add_field(TimeComponent(name='time', label='Time'))
+    record.add_field(QuantityComponent(name='temp', label='Temperature', definition='www.test.org/test/temp',
+                                       uom='Cel'))
+    return DataStreamComponent(name='test-stream', label='Test Stream', definition='www.test.org/test/stream',
+                               element_type=record, encoding=TextEncoding(), capacity=4)
+
+
+def test_stream_ring_buffer(test_stream):
+    assert len(test_stream) == 0
+    assert test_stream.get_value() is None
+
+    for i in range(6):
+        test_stream.append({'time': i, 'temp': i * 10.0})
+    assert len(test_stream) == 4
+    assert test_stream.get_value() == {'time': 5, 'temp': 50.0}
+    assert test_stream.get_record(0) == {'time': 2, 'temp': 20.0}
+    assert test_stream.get_window(2) == [{'time': 4, 'temp': 40.0}, {'time': 5, 'temp': 50.0}]
+    assert test_stream.get_columns()['time'].tolist() == [2, 3, 4, 5]
+    assert test_stream.get_columns(3)['temp'].tolist() == [30.0, 40.0, 50.0]
+    assert [r['time'] for r in test_stream.get_time_window(3, 4)] == [3, 4]
+    assert [r['time'] for r in test_stream.get_time_window('1970-01-01T00:00:00.000000004Z')] == [4, 5]
+    with pytest.raises(IndexError):
+        test_stream.get_record(4)
+
+    test_stream.clear()
+    test_stream.set_value({'time': 9})
+    assert test_stream.get_window() == [{'time': 9, 'temp': 0.0}]
+    with pytest.raises(TypeError):
+        test_stream.append({'time': 10, 'temp': None})
+
+    test_stream.element_type.get_field('temp').set_allowed_values(AllowedValues(interval=range(-50, 60)))
+    test_stream.append({'time': 10, 'temp': 100.0})
+    test_stream.enable_validation()
+    with pytest.raises(ValueError):
+        test_stream.append({'time': 11, 'temp': 100.0})
+    assert test_stream.get_value() == {'time': 10, 'temp': 100.0}
+
+
+def test_stream_codec(test_stream):
+    codec = test_stream.create_codec()
+    test_stream.extend(codec.decode_many('2024-06-13T00:00:00Z,20.5\n2024-06-13T00:00:01.5Z,21.0\n'))
+    assert test_stream.get_value() == {'time': 1718236801_500000000, 'temp': 21.0}
+
+    test_stream.encoding = BinaryEncoding()
+    assert isinstance(test_stream.create_codec(), BinaryCodec)
+
+
+def test_stream_schema(test_stream):
+    schema = json.loads(test_stream.datastructure_to_json())
+    assert schema['type'] == 'DataStream'
+    assert schema['encoding']['tokenSeparator'] == ','
+    assert schema['elementType']['fields'][1]['uom'] == {'code': 'Cel'}
+
+    loaded = from_json(test_stream.datastructure_to_json())
+    assert isinstance(loaded, DataStreamComponent)
+    assert loaded.datastructure_to_dict() == test_stream.datastructure_to_dict()
+    assert loaded.capacity == 4
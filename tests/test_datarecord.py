@@ -1,3 +1,9 @@
+import pytest
+
+from swecommondm import AllowedTokens, AllowedValues, SWEDataTypes
+from swecommondm.component_implementations import DataArrayComponent, DataRecordComponent
+
+
 def test_add_field(test_comp_datarecord, test_time_comp, test_quantity_comp):
     test_comp_datarecord.add_field(test_time_comp)
     test_comp_datarecord.add_field(test_quantity_comp)
@@ -17,3 +23,125 @@ def test_flat_field_map(test_comp_datarecord, test_time_comp, test_quantity_comp
     field_map = test_comp_datarecord.flat_id_to_field_map()
     assert field_map.keys().__contains__(test_time_comp.get_uuid())
     assert field_map.keys().__contains__(test_quantity_comp.get_uuid())
+
+
+def test_nested_field_paths(test_comp_datarecord, test_comp_vector, test_quantity_comp):
+    test_comp_datarecord.add_field(test_comp_vector)
+    assert test_comp_datarecord.get_field('test-vector.Lat') is test_comp_vector.coordinates['Lat']
+    assert test_comp_datarecord.get_field('test-quantity') is None
+
+    test_comp_datarecord.add_field(test_quantity_comp)
+    test_comp_datarecord.set_value({'test-quantity': 2.5, 'test-vector.Lat': 34.74, 'unknown': 1})
+    assert test_quantity_comp.get_value() == 2.5
+    assert test_comp_datarecord.get_value()['test-vector']['Lat'] == 34.74
+
+
+def test_flat_field_map_invalidation(test_comp_datarecord, test_time_comp, test_quantity_comp):
+    nested = DataRecordComponent(name='nested', label='Nested', definition='www.test.org/test/nested')
+    test_comp_datarecord.add_field(nested)
+    assert test_comp_datarecord.flat_id_to_field_map() == {}
+
+    nested.add_field(test_time_comp)
+    assert test_time_comp.get_uuid() in test_comp_datarecord.flat_id_to_field_map()
+    assert test_comp_datarecord.name_to_field_map() == {'nested': nested}
+
+
+def test_flat_values(test_comp_datarecord, test_comp_vector, test_bool_comp, test_comp_data_array,
+                     test_quantity_comp):
+    test_comp_datarecord.add_field(test_bool_comp)
+    test_comp_datarecord.add_field(test_comp_vector)
+    test_comp_datarecord.add_field(test_comp_data_array)
+    test_comp_datarecord.set_value({'test-bool': True, 'test-vector': {'Lat': 1.0, 'Lon': 2.0, 'Alt': 3.0},
+                                    'test-data-array': [4.0, 5.0, 6.0]})
+    assert test_comp_datarecord.get_flat_values() == (True, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0)
+    assert [entry[0] for entry in test_comp_datarecord.get_flat_plan()][:3] == \
+        ['test-bool', 'test-vector.Lat', 'test-vector.Lon']
+
+    test_comp_datarecord.set_flat_values((False, -1.0, -2.0, -3.0, -4.0, -5.0, -6.0))
+    assert test_comp_datarecord.get_value()['test-vector']['Alt'] == -3.0
+    assert test_comp_data_array.get_value() == [-4.0, -5.0, -6.0]
+    with pytest.raises(ValueError):
+        test_comp_datarecord.set_flat_values((True,))
+
+    test_comp_datarecord.add_field(test_quantity_comp)
+    assert len(test_comp_datarecord.get_flat_values()) == 8
+
+
+def test_flat_values_buffered(test_comp_datarecord, test_bool_comp, test_text_comp, test_quantity_comp):
+    records = DataArrayComponent(name='records', label='Records', definition='www.test.org/test/records')
+    element = DataRecordComponent(name='element', label='Element', definition='www.test.org/test/element')
+    element.add_field(test_bool_comp)
+    element.add_field(test_text_comp)
+    records.set_component_template_and_size(2, element, buffered=True)
+    test_comp_datarecord.add_field(test_quantity_comp)
+    test_comp_datarecord.add_field(records)
+
+    test_comp_datarecord.set_flat_values([1.5, True, 'a', False, 'b'])
+    assert records.get_value() == [{'test-bool': True, 'test-text': 'a'}, {'test-bool': False, 'test-text': 'b'}]
+    assert test_comp_datarecord.get_flat_values() == (1.5, True, 'a', False, 'b')
+    assert test_comp_datarecord.get_flat_plan()[1] == ('records', SWEDataTypes.DATA_ARRAY, 1, 4)
+
+    samples = DataArrayComponent(name='samples', label='Samples', definition='www.test.org/test/samples')
+    samples.set_component_template_and_size(2, records, buffered=True)
+    samples.set_flat_values((True, 'a', False, 'b') * 2)
+    assert samples.get_value()[1][1] == {'test-bool': False, 'test-text': 'b'}
+    assert samples.get_flat_values() == (True, 'a', False, 'b') * 2
+
+
+def test_clone(test_comp_datarecord, test_comp_vector, test_count_comp):
+    test_count_comp.set_allowed_values(AllowedValues(value={1, 2}))
+    test_comp_datarecord.add_field(test_count_comp)
+    test_comp_datarecord.add_field(test_comp_vector)
+    test_comp_datarecord.set_value({'test-count': 1, 'test-vector': {'Lat': 1.0, 'Lon': 2.0, 'Alt': 3.0}})
+
+    clone = test_comp_datarecord.clone()
+    assert clone == test_comp_datarecord
+    assert clone.get_uuid() != test_comp_datarecord.get_uuid()
+    cloned_count = clone.get_field('test-count')
+    assert cloned_count is not test_count_comp
+    assert cloned_count.constraint is not test_count_comp.constraint
+    assert cloned_count.constraint == test_count_comp.constraint
+
+    clone.set_value({'test-vector.Lat': -1.0})
+    assert test_comp_vector.coordinates['Lat'].get_value() == 1.0
+    cloned_count.label = 'Changed'
+    assert test_count_comp.label != 'Changed'
+    cloned_count.add_allowed_value(3)
+    assert cloned_count.constraint.is_valid(3)
+    assert not test_count_comp.constraint.is_valid(3)
+
+
+def test_clone_constraints(test_category_comp, test_count_comp):
+    test_category_comp.set_allowed_values(AllowedTokens(value={'A'}))
+    test_category_comp.codespace = {'href': 'www.test.org/test/codes'}
+    clone = test_category_comp.clone()
+    clone.constraint.add_value('B')
+    clone.codespace['href'] = 'www.test.org/test/other-codes'
+    assert test_category_comp.constraint.value == {'A'}
+    assert test_category_comp.codespace == {'href': 'www.test.org/test/codes'}
+
+    test_count_comp.set_allowed_values(AllowedValues(interval=range(0, 10)))
+    clone = test_count_comp.clone()
+    clone.constraint.interval = range(0, 20)
+    assert not test_count_comp.constraint.is_valid(15)
+
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(2, test_category_comp)
+    d_arr.components[0].constraint.add_value('Z')
+    assert not test_category_comp.constraint.is_valid('Z')
+    assert not d_arr.components[1].constraint.is_valid('Z')
+
+
+def test_clone_arrays(test_nested_comp_data_array_1, test_quantity_comp):
+    clone = test_nested_comp_data_array_1.create_instance()
+    clone.components[0].set_value({'f1': 'A', 'f2': 1.0})
+    assert test_nested_comp_data_array_1.components[0].get_value() == {'f1': None, 'f2': None}
+    clone.add_component(clone.element_type.clone())
+    assert test_nested_comp_data_array_1.element_count.value == 2
+
+    buffered = DataArrayComponent(name='buffered', label='Buffered', definition='www.test.org/test/buffered')
+    buffered.set_component_template_and_size(2, test_quantity_comp, buffered=True)
+    clone = buffered.clone()
+    clone.components[1].set_value(5.0)
+    assert clone.get_value() == [0.0, 5.0]
+    assert buffered.get_value() == [0.0, 0.0]
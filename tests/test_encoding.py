@@ -0,0 +1,240 @@
+import asyncio
+import base64
+
+import pytest
+
+from swecommondm.component_implementations import BooleanComponent, CountComponent, DataArrayComponent, \
+    DataRecordComponent, QuantityComponent, TimeComponent
+from swecommondm.encoding import BASE64_CHUNK_SIZE, Base64StreamDecoder, BinaryCodec, BinaryDataType, BinaryEncoding, \
+    ByteEncoding, ByteOrder, TextCodec, TextEncoding, iter_base64
+
+
+@pytest.fixture
+def test_text_record(test_text_comp, test_quantity_comp, test_comp_vector):
+    comp = DataRecordComponent(name='test-record', label='Test Record', definition='www.test.org/test/record')
+    comp.add_field(test_text_comp)
+    comp.add_field(test_quantity_comp)
+    comp.add_field(BooleanComponent(name='test-bool', label='Test Bool', definition='www.test.org/test/bool'))
+    comp.add_field(test_comp_vector)
+    samples = DataArrayComponent(name='samples', label='Samples', definition='www.test.org/test/samples')
+    samples.set_component_template_and_size(3, CountComponent(name='sample', label='Sample',
+                                                               definition='www.test.org/test/sample'), buffered=True)
+    comp.add_field(samples)
+    return comp
+
+
+RECORD_VALUE = {'test-text': 'abc', 'test-quantity': 1.5, 'test-bool': True,
+                'test-vector': {'Lat': 34.74, 'Lon': -86.6, 'Alt': 190.0}, 'samples': [1, 2, 3]}
+
+
+def test_text_codec_round_trip(test_text_record):
+    codec = TextCodec(test_text_record, TextEncoding())
+    block = codec.encode(RECORD_VALUE)
+    assert block == 'abc,1.5,true,34.74,-86.6,190.0,1,2,3\n'
+    assert codec.decode(block) == RECORD_VALUE
+
+    test_text_record.set_value(RECORD_VALUE)
+    assert codec.encode() == block
+    assert codec.decode_many(block * 3) == [RECORD_VALUE] * 3
+
+
+def test_text_codec_separators(test_text_record):
+    codec = TextCodec(test_text_record, TextEncoding(token=';', block=';', decimal=',', collapse_white_space=True))
+    text = codec.encode_many([RECORD_VALUE, RECORD_VALUE])
+    assert text.startswith('abc;1,5;true;34,74;')
+    assert codec.decode_many(text.replace(';', '; ')) == [RECORD_VALUE, RECORD_VALUE]
+
+
+def test_text_codec_missing_values(test_text_record):
+    codec = TextCodec(test_text_record, TextEncoding())
+    value = codec.decode(',,,1,2,3,,,')
+    assert value['test-text'] is None
+    assert value['test-vector'] == {'Lat': 1.0, 'Lon': 2.0, 'Alt': 3.0}
+    assert value['samples'] == [None, None, None]
+
+    with pytest.raises(ValueError):
+        codec.decode('abc,1.5')
+
+
+def test_text_codec_escapes_and_strict_tokens(test_text_record, test_text_comp):
+    codec = TextCodec(test_text_record, TextEncoding())
+    value = dict(RECORD_VALUE, **{'test-text': 'a,b\\c\nd'})
+    block = codec.encode(value)
+    assert block.startswith('a\\,b\\\\c\\\nd,1.5,')
+    assert codec.decode(block) == value
+    assert codec.decode_many(block * 2) == [value] * 2
+
+    with pytest.raises(ValueError):
+        codec.decode('abc,1.5,yes,1,2,3,1,2,3')
+    assert codec.decode('abc,1.5,0,1,2,3,1,2,3')['test-bool'] is False
+
+    assert codec.encode(dict(RECORD_VALUE, samples=[1.0, 2, 3])).endswith(',1,2,3\n')
+    with pytest.raises(ValueError):
+        codec.encode(dict(RECORD_VALUE, samples=[1.5, 2, 3]))
+
+    text_codec = TextCodec(test_text_comp, TextEncoding())
+    assert text_codec.decode_many('a\n\nb\n') == ['a', None, 'b']
+
+    # Collapsing white space keeps escaped white space, even at the end of a token or block
+    codec = TextCodec(test_text_record, TextEncoding(collapse_white_space=True))
+    value = dict(RECORD_VALUE, **{'test-text': 'end\n'})
+    assert codec.decode(codec.encode(value)) == value
+    assert codec.decode_many(codec.encode_many([value] * 2)) == [value] * 2
+    text_codec = TextCodec(test_text_comp, TextEncoding(collapse_white_space=True))
+    values = ['end\n', 'end\\', ' \n']
+    assert text_codec.decode_many(text_codec.encode_many(values)) == ['end\n', 'end\\', '\n']
+    assert text_codec.decode(text_codec.encode('end\n')) == 'end\n'
+
+
+def test_text_codec_time_units():
+    comp = DataRecordComponent(name='times', label='Times', definition='www.test.org/test/times')
+    comp.add_field(TimeComponent(name='iso', label='ISO'))
+    comp.add_field(TimeComponent(name='seconds', label='Seconds', uom='s'))
+    comp.add_field(TimeComponent(name='ms', label='Milliseconds', uom='http://www.opengis.net/def/uom/UCUM/0/ms'))
+    value = {'iso': 1718236800_500000000, 'seconds': 1718236800_500000000, 'ms': 1718236800_500000000}
+    codec = TextCodec(comp, TextEncoding())
+    block = codec.encode(value)
+    assert block == '2024-06-13T00:00:00.5Z,1718236800.5,1718236800500\n'
+    assert codec.decode(block) == value
+    assert TextCodec(comp, TextEncoding(decimal=',', token=';')).encode(value).split(';')[1] == '1718236800,5'
+
+    with pytest.raises(ValueError):
+        TextCodec(TimeComponent(name='t', label='T', uom='m'), TextEncoding())
+
+
+def test_text_stream_decoder(test_text_record):
+    codec = TextCodec(test_text_record, TextEncoding())
+    data = codec.encode_many([RECORD_VALUE] * 5).encode()
+    chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+
+    decoder = codec.stream_decoder()
+    values = []
+    for chunk in chunks:
+        values.extend(decoder.feed(chunk))
+    assert values == [RECORD_VALUE] * 5
+    assert decoder.flush() == []
+
+    assert list(codec.iter_decode([data[:-1].decode()])) == [RECORD_VALUE] * 5
+
+
+@pytest.fixture
+def test_binary_record(test_comp_vector):
+    comp = DataRecordComponent(name='test-record', label='Test Record', definition='www.test.org/test/record')
+    comp.add_field(TimeComponent(name='time', label='Time'))
+    comp.add_field(CountComponent(name='count', label='Count', definition='www.test.org/test/count'))
+    comp.add_field(BooleanComponent(name='flag', label='Flag', definition='www.test.org/test/flag'))
+    comp.add_field(test_comp_vector)
+    readings = DataArrayComponent(name='readings', label='Readings', definition='www.test.org/test/readings')
+    reading = DataRecordComponent(name='reading', label='Reading', definition='www.test.org/test/reading')
+    reading.add_field(QuantityComponent(name='value', label='Value', definition='www.test.org/test/value'))
+    reading.add_field(CountComponent(name='quality', label='Quality', definition='www.test.org/test/quality'))
+    readings.set_component_template_and_size(2, reading, buffered=True)
+    comp.add_field(readings)
+    return comp
+
+
+BINARY_VALUE = {'time': 1718236800_500000000, 'count': 7, 'flag': True,
+                'test-vector': {'Lat': 34.74, 'Lon': -86.6, 'Alt': 190.0},
+                'readings': [{'value': 1.25, 'quality': 1}, {'value': -2.5, 'quality': 0}]}
+
+
+def test_binary_codec_round_trip(test_binary_record):
+    codec = BinaryCodec(test_binary_record, BinaryEncoding())
+    assert codec.block_size == 8 + 8 + 1 + 3 * 8 + 2 * (8 + 8)
+
+    data = codec.encode(BINARY_VALUE)
+    assert codec.decode(data) == BINARY_VALUE
+    assert codec.decode(memoryview(b'\0' * 3 + data), 3) == BINARY_VALUE
+    assert codec.decode_many(codec.encode_many([BINARY_VALUE] * 3)) == [BINARY_VALUE] * 3
+
+
+def test_binary_codec_members(test_binary_record):
+    encoding = BinaryEncoding(byte_order=ByteOrder.BIG_ENDIAN)
+    encoding.add_member('count', BinaryDataType.UNSIGNED_SHORT)
+    encoding.add_member('readings.value', BinaryDataType.FLOAT32)
+    codec = BinaryCodec(test_binary_record, encoding)
+    assert codec.block_size == 8 + 2 + 1 + 3 * 8 + 2 * (4 + 8)
+
+    data = codec.encode(BINARY_VALUE)
+    assert data[8:10] == b'\x00\x07'
+    assert codec.decode(data) == BINARY_VALUE
+
+    # Times are integer epoch nanoseconds, they cannot be packed as floats
+    encoding.add_member('time', BinaryDataType.FLOAT64)
+    with pytest.raises(ValueError, match='integer'):
+        BinaryCodec(test_binary_record, encoding)
+
+
+def test_binary_codec_unsupported(test_text_comp):
+    with pytest.raises(ValueError):
+        BinaryCodec(test_text_comp, BinaryEncoding())
+
+
+def test_binary_codec_base64(test_binary_record):
+    codec = BinaryCodec(test_binary_record, BinaryEncoding(byte_encoding=ByteEncoding.BASE64))
+    data = codec.encode(BINARY_VALUE)
+    assert base64.b64decode(data) == BinaryCodec(test_binary_record, BinaryEncoding()).encode(BINARY_VALUE)
+    assert codec.decode(data) == BINARY_VALUE
+
+    text = b''.join(codec.iter_encode([BINARY_VALUE] * 4, chunk_size=10))
+    assert text == codec.encode_many([BINARY_VALUE] * 4)
+    assert codec.decode_many(text) == [BINARY_VALUE] * 4
+
+    wrapped = b'\n'.join(text[i:i + 76] for i in range(0, len(text), 76)).decode()
+    chunks = [wrapped[i:i + 5] for i in range(0, len(wrapped), 5)]
+    assert list(codec.iter_decode(chunks)) == [BINARY_VALUE] * 4
+
+    # Text payloads spanning several chunks are converted to ASCII chunk by chunk
+    text = codec.encode_many([BINARY_VALUE] * 2000).decode()
+    assert len(text) > 2 * BASE64_CHUNK_SIZE
+    assert codec.decode_many(text) == [BINARY_VALUE] * 2000
+
+
+def test_binary_stream_decoder(test_binary_record):
+    codec = BinaryCodec(test_binary_record, BinaryEncoding())
+    data = codec.encode_many([BINARY_VALUE] * 3)
+    decoder = codec.stream_decoder()
+    assert decoder.feed(data[:10]) == []
+    assert decoder.feed(data[10:codec.block_size * 2 + 1]) == [BINARY_VALUE] * 2
+    with pytest.raises(ValueError):
+        decoder.flush()
+    assert decoder.feed(data[codec.block_size * 2 + 1:]) == [BINARY_VALUE]
+    decoder.flush()
+
+
+def _stream_reader(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+def test_async_decode(test_text_record, test_binary_record):
+    async def collect(codec, data, **kwargs):
+        return [value async for value in codec.aiter_decode(_stream_reader(data), **kwargs)]
+
+    text_codec = TextCodec(test_text_record, TextEncoding())
+    text = text_codec.encode_many([RECORD_VALUE] * 3).encode()
+    assert asyncio.run(collect(text_codec, text, read_size=7)) == [RECORD_VALUE] * 3
+    assert asyncio.run(collect(text_codec, text[:-1])) == [RECORD_VALUE] * 3
+
+    binary_codec = BinaryCodec(test_binary_record, BinaryEncoding())
+    data = binary_codec.encode_many([BINARY_VALUE] * 5)
+    batches = asyncio.run(collect(binary_codec, data, read_size=binary_codec.block_size * 2, batches=True))
+    assert batches == [[BINARY_VALUE] * 2, [BINARY_VALUE] * 2, [BINARY_VALUE]]
+    with pytest.raises(ValueError):
+        asyncio.run(collect(binary_codec, data[:-1]))
+
+
+def test_base64_stream_decoder_preallocated():
+    payload = bytes(range(256)) * 100
+    buffer = bytearray(len(payload))
+    decoder = Base64StreamDecoder(buffer)
+    for chunk in iter_base64(payload, chunk_size=1000):
+        decoder.feed(chunk[:7])
+        decoder.feed(chunk[7:])
+    decoder.flush()
+    assert buffer == payload
+
+    with pytest.raises(ValueError):
+        decoder.feed(base64.b64encode(b'overflow'))
@@ -0,0 +1,52 @@
+import pytest
+
+from swecommondm import instrumentation
+from swecommondm.component_implementations import DataArrayComponent, QuantityComponent
+from swecommondm.encoding import TextEncoding
+
+
+@pytest.fixture
+def instrumented():
+    instrumentation.reset()
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_instrumentation(instrumented, test_comp_datarecord, test_quantity_comp):
+    original = QuantityComponent.set_value
+    test_comp_datarecord.add_field(test_quantity_comp)
+    codec = TextEncoding().create_codec(test_comp_datarecord)
+
+    instrumented.enable()
+    assert instrumented.is_enabled()
+    assert QuantityComponent.set_value is not original
+    test_comp_datarecord.set_value({'test-quantity': 1.0})
+    test_quantity_comp.set_value(2.0)
+    codec.decode_many(codec.encode_many([{'test-quantity': 3.0}] * 2))
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(2, test_quantity_comp)
+
+    metrics = instrumented.snapshot()
+    assert metrics['QuantityComponent.set_value']['count'] == 2
+    assert metrics['DataRecordComponent.set_value']['count'] == 1
+    assert metrics['TextCodec.encode_many']['count'] == 1
+    assert metrics['DataArrayComponent.set_component_template_and_size']['count'] == 1
+    set_value = metrics['QuantityComponent.set_value']
+    assert sum(set_value['histogram'].values()) == 2
+    assert set_value['max'] <= set_value['total']
+
+    instrumented.disable()
+    assert QuantityComponent.set_value is original
+    test_quantity_comp.set_value(4.0)
+    assert instrumented.snapshot(reset=True)['QuantityComponent.set_value']['count'] == 2
+    assert instrumented.snapshot() == {}
+
+
+def test_instrumentation_per_component(instrumented, test_quantity_comp):
+    instrumented.enable(per_component=True)
+    test_quantity_comp.get_value()
+    test_quantity_comp.create_instance().get_value()
+    metrics = instrumented.snapshot()
+    assert metrics['QuantityComponent.get_value[test-quantity]']['count'] == 1
+    assert metrics['ComponentInstance.get_value[test-quantity]']['count'] == 1
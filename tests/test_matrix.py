@@ -0,0 +1,123 @@
+import json
+from array import array
+
+import pytest
+
+from swecommondm import AllowedValues
+from swecommondm.component_implementations import DataArrayComponent, DataRecordComponent, DataStreamComponent, \
+    MatrixComponent, QuantityComponent, TextComponent, TimeComponent, from_json
+from swecommondm.encoding import BinaryCodec, BinaryEncoding, TextCodec, TextEncoding
+
+
+@pytest.fixture
+def test_matrix():
+    element = QuantityComponent(name='cell', label='Cell', definition='www.test.org/test/cell')
+    return MatrixComponent(name='test-matrix', label='Test Matrix', definition='www.test.org/test/matrix',
+                           element_type=element, shape=(3, 4), reference_frame='#SENSOR_FRAME')
+
+
+def test_matrix_set_value(test_matrix):
+    rows = [[float(i * 4 + j) for j in range(4)] for i in range(3)]
+    test_matrix.set_value(rows)
+    assert test_matrix.get_value() == rows
+
+    test_matrix.set_value(array('d', range(12, 0, -1)))
+    assert test_matrix[0, 0] == 12.0
+    test_matrix.set_value(memoryview(array('d', range(12))))
+    assert test_matrix.get_value() == rows
+    test_matrix.set_value(list(range(12)))
+    assert test_matrix.get_value() == rows
+
+    with pytest.raises(ValueError):
+        test_matrix.set_value([[1.0, 2.0]])
+
+
+def test_matrix_validation(test_matrix):
+    test_matrix.element_type.set_allowed_values(AllowedValues(interval=range(0, 10)))
+    test_matrix.set_value(list(range(20, 32)))
+    test_matrix.enable_validation()
+    with pytest.raises(ValueError):
+        test_matrix.set_value(list(range(12)))
+    assert test_matrix[0, 0] == 20.0
+    test_matrix.set_value([0.0] * 12)
+    with pytest.raises(ValueError):
+        test_matrix[1, 2] = 50.0
+    with pytest.raises(ValueError):
+        test_matrix.row(0).set_value([1.0, 2.0, 3.0, 40.0])
+    test_matrix[1, 2] = 5.0
+    assert test_matrix.row(0).tolist() == [0.0] * 4 and test_matrix[1, 2] == 5.0
+
+
+def test_matrix_flat_values(test_matrix):
+    test_matrix.set_flat_values(array('d', range(12)))
+    assert test_matrix.get_flat_values() == tuple(float(i) for i in range(12))
+    assert test_matrix.get_flat_plan() == [('', test_matrix.element_type.swe_type, 0, 12)]
+
+
+def test_matrix_views(test_matrix):
+    test_matrix.set_value(list(range(12)))
+    assert test_matrix.row(1).tolist() == [4.0, 5.0, 6.0, 7.0]
+    assert test_matrix.column(2).tolist() == [2.0, 6.0, 10.0]
+    assert test_matrix[1:, ::-2].tolist() == [[7.0, 5.0], [11.0, 9.0]]
+    assert test_matrix[-1, -1] == 11.0
+
+    test_matrix.column(0).set_value([-1.0, -2.0, -3.0])
+    test_matrix[0, 1:3] = [100.0, 200.0]
+    assert test_matrix.row(0).tolist() == [-1.0, 100.0, 200.0, 3.0]
+    assert test_matrix.get_buffer()[2, 0] == -3.0
+
+    with pytest.raises(IndexError):
+        test_matrix[3, 0]
+
+
+def test_matrix_schema(test_matrix):
+    schema = json.loads(test_matrix.datastructure_to_json())
+    assert schema['elementCount']['value'] == 3
+    assert schema['elementType']['elementCount']['value'] == 4
+    assert schema['elementType']['elementType']['type'] == 'Quantity'
+
+    loaded = from_json(test_matrix.datastructure_to_json())
+    assert loaded.shape == (3, 4)
+    assert loaded.datastructure_to_dict() == test_matrix.datastructure_to_dict()
+
+    with pytest.raises(ValueError):
+        MatrixComponent(name='m', label='M', definition='www.test.org/test/m', shape=(2, 2),
+                        element_type=TextComponent(name='t', label='T', definition='www.test.org/test/t'))
+
+
+@pytest.fixture
+def test_matrix_record(test_matrix):
+    record = DataRecordComponent(name='frame', label='Frame', definition='www.test.org/test/frame')
+    record.add_field(TimeComponent(name='time', label='Time'))
+    record.add_field(test_matrix)
+    return record
+
+
+def test_matrix_in_record_buffers(test_matrix_record):
+    rows = [[float(i * 4 + j) for j in range(4)] for i in range(3)]
+    value = {'time': 5, 'test-matrix': rows}
+
+    d_arr = DataArrayComponent(name='frames', label='Frames', definition='www.test.org/test/frames')
+    d_arr.set_component_template_and_size(2, test_matrix_record, buffered=True)
+    d_arr.set_value([value, value])
+    assert d_arr.get_value() == [value, value]
+    assert d_arr.components[1]['test-matrix'][2].get_value() == rows[2]
+    assert len(d_arr.get_columns()['test-matrix']) == 2 * 12
+
+    stream = DataStreamComponent(name='frames', label='Frames', definition='www.test.org/test/frames',
+                                 element_type=test_matrix_record, encoding=TextEncoding(), capacity=2)
+    stream.append(value)
+    assert stream.get_value() == value
+
+
+def test_matrix_in_record_codecs(test_matrix_record):
+    rows = [[float(i * 4 + j) for j in range(4)] for i in range(3)]
+    value = {'time': 5, 'test-matrix': rows}
+
+    text_codec = TextCodec(test_matrix_record, TextEncoding())
+    assert text_codec.token_count == 13
+    assert text_codec.decode(text_codec.encode(value)) == value
+
+    binary_codec = BinaryCodec(test_matrix_record, BinaryEncoding())
+    assert binary_codec.block_size == 8 + 12 * 8
+    assert binary_codec.decode(binary_codec.encode(value)) == value
@@ -0,0 +1,59 @@
+import pytest
+
+from swecommondm.component_implementations import CountComponent, DataArrayComponent, DataRecordComponent, \
+    QuantityComponent, TextComponent, TimeComponent
+from swecommondm.encoding import BinaryCodec, BinaryEncoding, ByteEncoding, TextCodec, TextEncoding
+from swecommondm.parallel import decode_columns
+
+
+@pytest.fixture
+def test_obs_record():
+    record = DataRecordComponent(name='obs', label='Observation', definition='www.test.org/test/obs')
+    record.add_field(TimeComponent(name='time', label='Time'))
+    record.add_field(QuantityComponent(name='temp', label='Temperature', definition='www.test.org/test/temp'))
+    samples = DataArrayComponent(name='samples', label='Samples', definition='www.test.org/test/samples')
+    samples.set_component_template_and_size(2, CountComponent(name='sample', label='Sample',
+                                                               definition='www.test.org/test/sample'), buffered=True)
+    record.add_field(samples)
+    return record
+
+
+def _values(count):
+    return [{'time': i * 1000, 'temp': i / 4, 'samples': [i, -i]} for i in range(count)]
+
+
+def test_parallel_binary_decode(test_obs_record):
+    codec = BinaryCodec(test_obs_record, BinaryEncoding(ByteEncoding.BASE64))
+    data = codec.encode_many(_values(101))
+    columns = decode_columns(codec, data, workers=3, min_range_size=1)
+    assert columns['time'].tolist() == [i * 1000 for i in range(101)]
+    assert columns['samples'][-2:].tolist() == [100, -100]
+    assert columns == decode_columns(codec, data)
+
+    with pytest.raises(ValueError):
+        decode_columns(BinaryCodec(test_obs_record, BinaryEncoding()), b'\0' * 3)
+
+
+def test_parallel_text_decode(test_obs_record):
+    test_obs_record.add_field(TextComponent(name='note', label='Note', definition='www.test.org/test/note'))
+    values = [dict(value, note=f'n{i}') for i, value in enumerate(_values(50))]
+    codec = TextCodec(test_obs_record, TextEncoding())
+    data = codec.encode_many(values).rstrip('\n')
+    columns = decode_columns(codec, data, workers=4, min_range_size=1)
+    assert columns['temp'].tolist() == [i / 4 for i in range(50)]
+    assert columns['note'] == [f'n{i}' for i in range(50)]
+
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(50, test_obs_record, buffered=True)
+    d_arr.set_columns(columns)
+    assert d_arr.get_value() == values
+
+
+def test_parallel_text_decode_escapes(test_obs_record):
+    test_obs_record.add_field(TextComponent(name='note', label='Note', definition='www.test.org/test/note'))
+    values = [dict(value, note='line\nbreak\\' if i % 2 else 'a,b') for i, value in enumerate(_values(2000))]
+    codec = TextCodec(test_obs_record, TextEncoding())
+    data = codec.encode_many(values)
+    columns = decode_columns(codec, data, workers=4, min_range_size=100)
+    assert columns['note'] == [value['note'] for value in values]
+    assert columns == decode_columns(codec, data, workers=1)
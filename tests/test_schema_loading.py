@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from swecommondm import AllowedTokens, AllowedValues
+from swecommondm.component_implementations import CountComponent, DataArrayComponent, DataRecordComponent, \
+    QuantityComponent, TextComponent, VectorComponent, from_dict, from_json
+
+
+def test_round_trip(test_comp_datarecord, test_time_comp, test_comp_vector):
+    record = test_comp_datarecord
+    record.add_field(test_time_comp)
+    record.add_field(test_comp_vector)
+    record.add_field(TextComponent(name='status', label='Status', definition='www.test.org/test/status',
+                                   constraint=AllowedTokens(value={'ok', 'fault'})))
+    record.add_field(CountComponent(name='count', label='Count', definition='www.test.org/test/count',
+                                    constraint=AllowedValues(interval=range(0, 11))))
+    samples = DataArrayComponent(name='samples', label='Samples', definition='www.test.org/test/samples')
+    samples.set_component_template_and_size(4, QuantityComponent(name='sample', label='sample',
+                                                                 definition='www.test.org/test/sample'))
+    record.add_field(samples)
+
+    loaded = from_json(record.datastructure_to_json())
+    assert isinstance(loaded, DataRecordComponent)
+    assert isinstance(loaded.get_field('test-vector'), VectorComponent)
+    assert loaded.get_field('count').constraint.interval == range(0, 11)
+    assert loaded.get_field('samples').element_count.value == 4
+    assert json.loads(loaded.datastructure_to_json()) == json.loads(record.datastructure_to_json())
+
+
+def test_round_trip_array_of_records(test_comp_vector):
+    element = DataRecordComponent(name='fix', label='Fix', definition='www.test.org/test/fix')
+    element.add_field(CountComponent(name='count', label='Count', definition='www.test.org/test/count'))
+    element.add_field(test_comp_vector)
+    track = DataArrayComponent(name='track', label='Track', definition='www.test.org/test/track')
+    track.set_component_template_and_size(2, element, buffered=True)
+
+    loaded = from_dict(track.datastructure_to_dict(), buffered=True)
+    assert [f.name for f in loaded.element_type.fields] == ['count', 'test-vector']
+    assert list(loaded.element_type.get_field('test-vector').coordinates) == ['Lat', 'Lon', 'Alt']
+    assert loaded.get_value() == track.get_value()
+    assert loaded.datastructure_to_dict() == track.datastructure_to_dict()
+
+
+def test_from_dict_cache(test_comp_vector):
+    schema = test_comp_vector.datastructure_to_dict()
+    first = from_dict(schema)
+    second = from_dict(json.loads(json.dumps(schema)))
+    assert first is not second
+    assert first.coordinates['Lat'] is not second.coordinates['Lat']
+    assert first.get_uuid() != second.get_uuid()
+
+    first.set_value({'Lat': 1.0, 'Lon': 2.0, 'Alt': 3.0})
+    assert second.get_value() == {'Lat': None, 'Lon': None, 'Alt': None}
+
+
+def test_from_dict_buffered():
+    schema = {'type': 'DataArray', 'name': 'frame', 'elementCount': {'value': 3},
+              'elementType': {'type': 'Count', 'name': 'pixel'}}
+    data_array = from_dict(schema, buffered=True)
+    assert data_array.is_buffered()
+    assert data_array.get_value() == [0, 0, 0]
+
+
+def test_from_dict_unknown_type():
+    with pytest.raises(ValueError):
+        from_dict({'type': 'Geometry', 'name': 'geom'})
@@ -0,0 +1,122 @@
+import copy
+from array import array
+
+import pytest
+
+from swecommondm.buffers import BufferLayout
+from swecommondm.component_implementations import DataArrayComponent, DataRecordComponent, DataStreamComponent, \
+    QuantityComponent, TextComponent, TimeComponent
+from swecommondm.encoding import BinaryDataType, BinaryEncoding, ByteEncoding, TextEncoding
+from swecommondm.storage import MappedColumns, MappedRecordFile
+
+
+@pytest.fixture
+def test_obs_record():
+    record = DataRecordComponent(name='obs', label='Observation', definition='www.test.org/test/obs')
+    record.add_field(TimeComponent(name='time', label='Time'))
+    record.add_field(QuantityComponent(name='temp', label='Temperature', definition='www.test.org/test/temp',
+                                       uom='Cel'))
+    return record
+
+
+def test_mapped_records(tmp_path, test_obs_record):
+    path = tmp_path / 'obs.bin'
+    with MappedRecordFile.create(path, test_obs_record) as records:
+        assert len(records) == 0
+        assert records[:] == []
+        records.extend({'time': i, 'temp': i * 10.0} for i in range(10))
+        records.append({'time': 10, 'temp': 100.0})
+        records[0] = {'time': -1, 'temp': -10.0}
+
+    assert path.stat().st_size == 11 * 16
+    with MappedRecordFile(path, test_obs_record) as records:
+        assert len(records) == 11
+        assert records[0] == {'time': -1, 'temp': -10.0}
+        assert records[-1] == {'time': 10, 'temp': 100.0}
+        assert [r['time'] for r in records[2:8:3]] == [2, 5]
+        assert [r['temp'] for r in records][1:3] == [10.0, 20.0]
+        with pytest.raises(IndexError):
+            records[11]
+        with pytest.raises(ValueError):
+            records[1] = {'time': 0, 'temp': 0.0}
+
+
+def test_mapped_records_encoding(tmp_path, test_obs_record):
+    encoding = BinaryEncoding()
+    encoding.add_member('temp', BinaryDataType.FLOAT32)
+    path = tmp_path / 'obs.bin'
+    MappedRecordFile.create(path, test_obs_record, encoding).close()
+    path.write_bytes(b'\0' * 13)
+    with pytest.raises(ValueError):
+        MappedRecordFile(path, test_obs_record, encoding)
+    with pytest.raises(ValueError):
+        MappedRecordFile(path, test_obs_record, BinaryEncoding(ByteEncoding.BASE64))
+
+
+def test_mapped_records_from_components(tmp_path, test_obs_record, test_quantity_comp):
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    d_arr.set_component_template_and_size(5, test_quantity_comp, buffered=True)
+    d_arr.set_value([1.0, 2.0, 3.0, 4.0, 5.0])
+    with MappedRecordFile.from_array(tmp_path / 'array.bin', d_arr) as records:
+        assert records[:] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+    stream = DataStreamComponent(name='test-stream', label='Test Stream', definition='www.test.org/test/stream',
+                                 element_type=test_obs_record, encoding=TextEncoding(), capacity=3)
+    stream.extend({'time': i, 'temp': 0.0} for i in range(5))
+    with MappedRecordFile.from_stream(tmp_path / 'stream.bin', stream) as records:
+        assert [r['time'] for r in records] == [2, 3, 4]
+
+
+def test_mapped_columns_array(tmp_path, test_obs_record):
+    path = tmp_path / 'array.col'
+    d_arr = DataArrayComponent(name='test-data-array', label='Test DataArray', definition='www.test.org/test/data-array')
+    storage = MappedColumns(path)
+    d_arr.set_component_template_and_size(1000, test_obs_record, storage=storage)
+    assert d_arr.is_buffered()
+    assert isinstance(d_arr.get_columns()['time'], array)
+    d_arr.set_columns({'time': range(1000)})
+    d_arr.components[3].set_value({'time': -3, 'temp': 30.0})
+    assert copy.deepcopy(d_arr).components[3].get_value() == {'time': -3, 'temp': 30.0}
+    with pytest.raises(TypeError):
+        d_arr.add_component(test_obs_record.clone())
+    storage.close()
+
+    reopened = DataArrayComponent(name='test-data-array', label='Test DataArray',
+                                  definition='www.test.org/test/data-array')
+    with MappedColumns(path, writable=False) as storage:
+        reopened.set_component_template_and_size(None, test_obs_record, storage=storage)
+        assert reopened.element_count.value == 1000
+        assert reopened.components[3].get_value() == {'time': -3, 'temp': 30.0}
+        assert reopened.components[999].get_value() == {'time': 999, 'temp': 0.0}
+        with pytest.raises(TypeError):
+            reopened.components[0].set_value({'time': 1})
+
+    with pytest.raises(ValueError):
+        MappedColumns(path).open(BufferLayout(test_obs_record), 10)
+    with pytest.raises(FileNotFoundError):
+        MappedColumns(tmp_path / 'missing.col').open(BufferLayout(test_obs_record))
+
+    text_record = DataRecordComponent(name='notes', label='Notes', definition='www.test.org/test/notes')
+    text_record.add_field(TextComponent(name='note', label='Note', definition='www.test.org/test/note'))
+    with pytest.raises(ValueError):
+        d_arr.set_component_template_and_size(10, text_record, storage=MappedColumns(tmp_path / 'text.col'))
+
+
+def test_mapped_columns_stream(tmp_path, test_obs_record):
+    path = tmp_path / 'stream.col'
+    storage = MappedColumns(path)
+    stream = DataStreamComponent(name='test-stream', label='Test Stream', definition='www.test.org/test/stream',
+                                 element_type=test_obs_record, encoding=TextEncoding(), capacity=3, storage=storage)
+    stream.extend({'time': i, 'temp': i * 10.0} for i in range(5))
+    assert stream.get_columns()['time'].tolist() == [2, 3, 4]
+    storage.close()
+
+    reopened = DataStreamComponent(name='test-stream', label='Test Stream', definition='www.test.org/test/stream',
+                                   element_type=test_obs_record, encoding=TextEncoding(), capacity=3,
+                                   storage=MappedColumns(path))
+    assert len(reopened) == 3
+    assert reopened.get_window() == [{'time': i, 'temp': i * 10.0} for i in range(2, 5)]
+    reopened.clear()
+    assert len(reopened) == 0
+    reopened.append({'time': 9, 'temp': 90.0})
+    assert reopened.get_value() == {'time': 9, 'temp': 90.0}
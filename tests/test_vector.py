@@ -1,4 +1,9 @@
 import json
+from collections import OrderedDict
+
+import pytest
+
+from swecommondm.component_implementations import DataArrayComponent, DataRecordComponent
 
 
 def test_vector_json(test_comp_vector):
@@ -6,3 +11,67 @@ def test_vector_json(test_comp_vector):
     vec_json = vec.datastructure_to_dict()
     print(f'\n{json.dumps(vec_json)}')
     assert True
+
+
+def test_vector_coordinates(test_comp_vector):
+    vec = test_comp_vector
+    vec.set_value((34.7, -86.6, 190.0))
+    assert vec.get_value() == {'Lat': 34.7, 'Lon': -86.6, 'Alt': 190.0}
+    assert vec.get_coordinates() == (34.7, -86.6, 190.0)
+    with pytest.raises(ValueError):
+        vec.set_value((34.7, -86.6))
+
+
+def test_vector_array_coordinates(test_comp_vector):
+    track = DataArrayComponent(name='track', label='Track', definition='www.test.org/test/track')
+    track.set_component_template_and_size(3, test_comp_vector, buffered=True)
+    track.set_coordinates([(1.0, 2.0, 3.0), (4.0, 5.0, 6.0), (7.0, 8.0, 9.0)])
+    assert track.get_value()[1] == {'Lat': 4.0, 'Lon': 5.0, 'Alt': 6.0}
+    assert track.get_coordinates(1) == [(4.0, 5.0, 6.0), (7.0, 8.0, 9.0)]
+    assert track.components[2].get_coordinates() == (7.0, 8.0, 9.0)
+    track.components[0].set_value((0.0, 0.0, 0.0))
+    assert track.get_columns()['Alt'].tolist() == [0.0, 6.0, 9.0]
+    with pytest.raises(ValueError):
+        track.set_coordinates([(1.0, 2.0)] * 3)
+    with pytest.raises(ValueError):
+        track.components[0].set_value((1.0, 2.0))
+    track.components[0].set_value(OrderedDict(Lat=1.0, Lon=2.0, Alt=3.0))
+    assert track.get_coordinates(0, 1) == [(1.0, 2.0, 3.0)]
+
+    unbuffered = DataArrayComponent(name='track', label='Track', definition='www.test.org/test/track')
+    unbuffered.set_component_template_and_size(3, test_comp_vector)
+    with pytest.raises(TypeError):
+        unbuffered.get_coordinates()
+
+
+def test_vector_array_numpy(test_comp_vector):
+    np = pytest.importorskip('numpy')
+    track = DataArrayComponent(name='track', label='Track', definition='www.test.org/test/track')
+    track.set_component_template_and_size(4, test_comp_vector, buffered=True)
+    positions = np.arange(12, dtype=np.int32).reshape(4, 3)
+    track.set_coordinates(positions)
+    assert track.get_value()[3] == {'Lat': 9.0, 'Lon': 10.0, 'Alt': 11.0}
+    result = track.to_coordinate_array()
+    assert result.shape == (4, 3) and result.dtype == np.float64
+    assert (result == positions).all()
+    with pytest.raises(ValueError):
+        track.set_coordinates(positions[:, :2])
+
+
+def test_vector_field_coordinates(test_time_comp, test_comp_vector):
+    record = DataRecordComponent(name='fix', label='Fix', definition='www.test.org/test/fix')
+    record.add_field(test_time_comp)
+    test_comp_vector.name = 'location'
+    record.add_field(test_comp_vector)
+    track = DataArrayComponent(name='track', label='Track', definition='www.test.org/test/track')
+    track.set_component_template_and_size(2, record, buffered=True)
+
+    track.set_coordinates([(1.0, 2.0, 3.0), (4.0, 5.0, 6.0)], path='location')
+    assert track.get_value()[1]['location'] == {'Lat': 4.0, 'Lon': 5.0, 'Alt': 6.0}
+    assert track.get_coordinates(path='location') == [(1.0, 2.0, 3.0), (4.0, 5.0, 6.0)]
+    with pytest.raises(ValueError):
+        track.get_coordinates()
+    with pytest.raises(ValueError):
+        track.get_coordinates(path='test-time')
+    with pytest.raises(KeyError):
+        track.get_coordinates(path='heading')